@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from apps.gallery.models import Design, Review
+from apps.bookings.models import Notification
+from apps.core.response_cache import invalidate_tags
+from .moderation import release_leases
+from .stats import apply_deltas, transition_deltas
+
+User = get_user_model()
+
+
+def _lock(queryset):
+    # Row locks are a no-op on SQLite, which serializes writers anyway
+    return queryset.select_for_update()
+
+
+def set_design_status(ids, new_status):
+    """
+    Move designs to `new_status` with a single UPDATE.
+    Returns {id: outcome} with outcome one of new_status, 'unchanged', 'not_found'.
+    """
+    with transaction.atomic():
+        rows = _lock(Design.objects.filter(pk__in=ids)).values_list('pk', 'status', 'designer_id')
+        current = {pk: (old_status, designer_id) for pk, old_status, designer_id in rows}
+        changed = [pk for pk, (old_status, _) in current.items() if old_status != new_status]
+        if changed:
+            Design.objects.filter(pk__in=changed).update(status=new_status, updated_at=timezone.now())
+            apply_deltas(transition_deltas(
+                Design, [{'status': current[pk][0]} for pk in changed], {'status': new_status}
+            ))
+        release_leases('design', list(current))
+    
+    # queryset.update() skips the post_save cache invalidation
+    if changed:
+        invalidate_tags(
+            'design-list', 'design-counts',
+            *{f'designer:{current[pk][1]}' for pk in changed},
+            *(f'design:{pk}' for pk in changed),
+        )
+
+    return {
+        pk: new_status if pk in changed else ('unchanged' if pk in current else 'not_found')
+        for pk in ids
+    }
+
+
+def approve_designers(ids):
+    """
+    Approve designers with a single UPDATE and notify them with one bulk insert.
+    Returns {id: outcome} with outcome one of 'approved', 'unchanged', 'not_found'.
+    """
+    with transaction.atomic():
+        current = dict(_lock(User.objects.filter(pk__in=ids, role='designer')).values_list('pk', 'is_approved'))
+        changed = [pk for pk, is_approved in current.items() if not is_approved]
+        if changed:
+            User.objects.filter(pk__in=changed).update(is_approved=True, updated_at=timezone.now())
+            apply_deltas(transition_deltas(
+                User, [{'role': 'designer', 'is_approved': False}] * len(changed), {'is_approved': True}
+            ))
+            Notification.objects.bulk_create([
+                Notification(
+                    user_id=pk,
+                    notification_type='designer_approved',
+                    title='Account Approved',
+                    message='Your designer account has been approved!'
+                )
+                for pk in changed
+            ])
+        release_leases('designer', list(current))
+    
+    if changed:
+        invalidate_tags('designer-list', *(f'designer:{pk}' for pk in changed))
+
+    return {
+        pk: 'approved' if pk in changed else ('unchanged' if pk in current else 'not_found')
+        for pk in ids
+    }
+
+
+def handle_review_reports(ids, action):
+    """
+    Clear the report flag ('approve') or hide reviews ('reject') with a single UPDATE.
+    Returns {id: outcome} with outcome one of 'approved', 'hidden', 'not_found'.
+    """
+    with transaction.atomic():
+        rows = list(_lock(Review.objects.filter(pk__in=ids)).values_list('pk', 'is_reported', 'designer_id'))
+        current = {pk: is_reported for pk, is_reported, _ in rows}
+        designer_ids = {designer_id for _, _, designer_id in rows}
+        reviews = Review.objects.filter(pk__in=list(current))
+        if action == 'approve':
+            outcome = 'approved'
+            reviews.update(is_reported=False, updated_at=timezone.now())
+            apply_deltas(transition_deltas(
+                Review, [{'is_reported': is_reported} for is_reported in current.values()], {'is_reported': False}
+            ))
+        else:
+            outcome = 'hidden'
+            reviews.update(is_approved=False, updated_at=timezone.now())
+    
+    invalidate_tags(*(f'designer:{designer_id}' for designer_id in designer_ids))
+
+    return {pk: outcome if pk in current else 'not_found' for pk in ids}
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from apps.admin_panel.stats import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recount platform stats from source tables and record today's snapshot (run periodically, e.g. hourly cron)"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--no-snapshot', action='store_true', help="Don't write the daily history row")
+    
+    def handle(self, *args, **options):
+        stats = reconcile(snapshot=not options['no_snapshot'])
+        self.stdout.write(self.style.SUCCESS(f'Platform stats reconciled at {stats.reconciled_at}'))
@@ -0,0 +1,67 @@
+# Generated by Django 4.2 on 2026-10-19 14:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyPlatformStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_users', models.IntegerField(default=0)),
+                ('designers', models.IntegerField(default=0)),
+                ('customers', models.IntegerField(default=0)),
+                ('admins', models.IntegerField(default=0)),
+                ('pending_designers', models.IntegerField(default=0)),
+                ('total_designs', models.IntegerField(default=0)),
+                ('pending_designs', models.IntegerField(default=0)),
+                ('approved_designs', models.IntegerField(default=0)),
+                ('rejected_designs', models.IntegerField(default=0)),
+                ('total_bookings', models.IntegerField(default=0)),
+                ('pending_bookings', models.IntegerField(default=0)),
+                ('confirmed_bookings', models.IntegerField(default=0)),
+                ('completed_bookings', models.IntegerField(default=0)),
+                ('cancelled_bookings', models.IntegerField(default=0)),
+                ('reported_reviews', models.IntegerField(default=0)),
+                ('date', models.DateField(unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily platform stats',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PlatformStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_users', models.IntegerField(default=0)),
+                ('designers', models.IntegerField(default=0)),
+                ('customers', models.IntegerField(default=0)),
+                ('admins', models.IntegerField(default=0)),
+                ('pending_designers', models.IntegerField(default=0)),
+                ('total_designs', models.IntegerField(default=0)),
+                ('pending_designs', models.IntegerField(default=0)),
+                ('approved_designs', models.IntegerField(default=0)),
+                ('rejected_designs', models.IntegerField(default=0)),
+                ('total_bookings', models.IntegerField(default=0)),
+                ('pending_bookings', models.IntegerField(default=0)),
+                ('confirmed_bookings', models.IntegerField(default=0)),
+                ('completed_bookings', models.IntegerField(default=0)),
+                ('cancelled_bookings', models.IntegerField(default=0)),
+                ('reported_reviews', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Platform stats',
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+from django.db import models
+from django.conf import settings
+
+
+class PlatformCounters(models.Model):
+    """
+    Platform-wide counters shared by the live stats row and daily snapshots
+    """
+    total_users = models.IntegerField(default=0)
+    designers = models.IntegerField(default=0)
+    customers = models.IntegerField(default=0)
+    admins = models.IntegerField(default=0)
+    pending_designers = models.IntegerField(default=0)
+    
+    total_designs = models.IntegerField(default=0)
+    pending_designs = models.IntegerField(default=0)
+    approved_designs = models.IntegerField(default=0)
+    rejected_designs = models.IntegerField(default=0)
+    
+    total_bookings = models.IntegerField(default=0)
+    pending_bookings = models.IntegerField(default=0)
+    confirmed_bookings = models.IntegerField(default=0)
+    completed_bookings = models.IntegerField(default=0)
+    cancelled_bookings = models.IntegerField(default=0)
+    
+    reported_reviews = models.IntegerField(default=0)
+    
+    class Meta:
+        abstract = True
+
+
+class PlatformStats(PlatformCounters):
+    """
+    Single-row table of live platform counters.
+    Kept current by atomic deltas on state transitions (see signals.py)
+    and corrected by the reconcile_platform_stats command.
+    """
+    updated_at = models.DateTimeField(auto_now=True)
+    reconciled_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        verbose_name_plural = 'Platform stats'
+    
+    def __str__(self):
+        return f"Platform stats (updated {self.updated_at})"
+
+
+class DailyPlatformStats(PlatformCounters):
+    """
+    End-of-day snapshot of the platform counters, used for trend charts
+    """
+    date = models.DateField(unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-date']
+        verbose_name_plural = 'Daily platform stats'
+    
+    def __str__(self):
+        return f"Platform stats for {self.date}"
+
+
+
+class ModerationLease(models.Model):
+    """
+    Time-limited claim by a moderator on a pending design or designer,
+    so concurrent moderators work on disjoint batches
+    """
+    ITEM_TYPES = (
+        ('design', 'Design'),
+        ('designer', 'Designer'),
+    )
+    
+    item_type = models.CharField(max_length=20, choices=ITEM_TYPES)
+    object_id = models.BigIntegerField()
+    moderator = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='moderation_leases')
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ('item_type', 'object_id')
+    
+    def __str__(self):
+        return f"{self.item_type} #{self.object_id} leased to {self.moderator_id} until {self.expires_at}"
@@ -0,0 +1,82 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.gallery.models import Design
+from .models import ModerationLease
+from .serializers import ModerationDesignSerializer, ModerationDesignerSerializer
+
+User = get_user_model()
+
+# Queue name -> lease item type, pending queryset and serializer
+QUEUES = {
+    'designs': {
+        'item_type': 'design',
+        'queryset': lambda: Design.objects.filter(status='pending').select_related('designer', 'category'),
+        'serializer': ModerationDesignSerializer,
+    },
+    'designers': {
+        'item_type': 'designer',
+        'queryset': lambda: User.objects.filter(role='designer', is_approved=False),
+        'serializer': ModerationDesignerSerializer,
+    },
+}
+
+
+def release_expired_leases():
+    """Drop leases whose time is up so their items return to the queue"""
+    ModerationLease.objects.filter(expires_at__lte=timezone.now()).delete()
+
+
+def release_leases(item_type, object_ids, moderator=None):
+    """Release leases on the given items (only the moderator's own, if given)"""
+    leases = ModerationLease.objects.filter(item_type=item_type, object_id__in=object_ids)
+    if moderator is not None:
+        leases = leases.filter(moderator=moderator)
+    return leases.delete()[0]
+
+
+def pending_items(queue, moderator):
+    """Oldest-first pending items, hiding those leased to other moderators"""
+    config = QUEUES[queue]
+    leased_to_others = ModerationLease.objects.filter(
+        item_type=config['item_type'], expires_at__gt=timezone.now()
+    ).exclude(moderator=moderator).values('object_id')
+    return config['queryset']().exclude(pk__in=leased_to_others).order_by('created_at', 'pk')
+
+
+def claim_batch(queue, moderator, batch_size, lease_seconds):
+    """
+    Lease up to `batch_size` of the oldest unclaimed items to `moderator`.
+
+    On PostgreSQL candidate rows are locked with FOR UPDATE SKIP LOCKED so
+    concurrent claimers skip each other's batches instead of waiting. SQLite
+    already serializes writers; there the unique (item_type, object_id)
+    constraint makes the lease insert the atomic claim, and rows that lost a
+    race are simply dropped from the batch.
+    """
+    config = QUEUES[queue]
+    item_type = config['item_type']
+    release_expired_leases()
+    expires_at = timezone.now() + timedelta(seconds=lease_seconds)
+
+    with transaction.atomic():
+        leased = ModerationLease.objects.filter(item_type=item_type).values('object_id')
+        candidates = config['queryset']().select_related(None).exclude(pk__in=leased).order_by('created_at', 'pk')
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        ids = list(candidates.values_list('pk', flat=True)[:batch_size])
+
+        ModerationLease.objects.bulk_create(
+            [
+                ModerationLease(item_type=item_type, object_id=pk, moderator=moderator, expires_at=expires_at)
+                for pk in ids
+            ],
+            ignore_conflicts=True,
+        )
+        claimed = set(ModerationLease.objects.filter(
+            item_type=item_type, object_id__in=ids, moderator=moderator
+        ).values_list('object_id', flat=True))
+
+    items = config['queryset']().filter(pk__in=claimed).order_by('created_at', 'pk')
+    return items, expires_at
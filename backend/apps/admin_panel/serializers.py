@@ -0,0 +1,79 @@
+from rest_framework import serializers
+from django.contrib.auth import get_user_model
+from apps.gallery.imports import throughput
+from apps.gallery.models import Design, DesignImport
+from apps.gallery.serializers import DesignImageMixin
+from .models import DailyPlatformStats
+
+User = get_user_model()
+
+
+class DashboardDesignerSerializer(serializers.ModelSerializer):
+    """
+    Compact designer summary for the admin dashboard
+    """
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name', 'profile_picture', 'average_rating']
+
+
+class DashboardDesignSerializer(serializers.ModelSerializer):
+    """
+    Compact design summary for the admin dashboard
+    """
+    class Meta:
+        model = Design
+        fields = ['id', 'title', 'image', 'designer', 'likes_count', 'views_count']
+
+
+class DailyPlatformStatsSerializer(serializers.ModelSerializer):
+    """
+    Daily platform counters for dashboard trend charts
+    """
+    class Meta:
+        model = DailyPlatformStats
+        exclude = ['id', 'created_at']
+
+
+class ModerationDesignSerializer(DesignImageMixin, serializers.ModelSerializer):
+    """
+    What a moderator needs to review a pending design
+    """
+    designer_name = serializers.CharField(source='designer.username', read_only=True)
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    
+    class Meta:
+        model = Design
+        fields = [
+            'id', 'title', 'description', 'image', 'tags', 'price_range',
+            'category', 'category_name', 'designer', 'designer_name', 'status', 'created_at'
+        ]
+
+
+class ModerationDesignerSerializer(serializers.ModelSerializer):
+    """
+    What a moderator needs to review a pending designer
+    """
+    class Meta:
+        model = User
+        fields = [
+            'id', 'username', 'email', 'first_name', 'last_name', 'profile_picture',
+            'bio', 'location', 'years_of_experience', 'specialization', 'portfolio_url', 'created_at'
+        ]
+
+
+class DesignImportSerializer(serializers.ModelSerializer):
+    """
+    Bulk design import progress, with images processed per second
+    """
+    throughput = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = DesignImport
+        fields = [
+            'id', 'designer', 'created_by', 'design_status', 'status', 'total', 'imported',
+            'skipped', 'failed', 'errors', 'throughput', 'started_at', 'finished_at', 'created_at'
+        ]
+    
+    def get_throughput(self, obj):
+        return throughput(obj)
@@ -0,0 +1,37 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from .stats import TRACKED_FIELDS, counters_for, diff_counters, apply_deltas
+
+
+def _touches_tracked_fields(sender, update_fields):
+    return update_fields is None or bool(set(update_fields) & set(TRACKED_FIELDS[sender]))
+
+
+def remember_counters(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Capture the row's counter contributions before it is saved"""
+    instance._stats_counters = {}
+    if raw or not instance.pk or not _touches_tracked_fields(sender, update_fields):
+        return
+    old = sender._default_manager.filter(pk=instance.pk).values(*TRACKED_FIELDS[sender]).first()
+    if old is not None:
+        instance._stats_counters = counters_for(sender, old)
+
+
+def apply_save_deltas(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Move the row between counters after a create or state transition"""
+    if raw or not (created or _touches_tracked_fields(sender, update_fields)):
+        return
+    old = {} if created else getattr(instance, '_stats_counters', {})
+    new = counters_for(sender, {field: getattr(instance, field) for field in TRACKED_FIELDS[sender]})
+    apply_deltas(diff_counters(old, new))
+
+
+def apply_delete_deltas(sender, instance, **kwargs):
+    """Remove a deleted row's contributions from the counters"""
+    new = counters_for(sender, {field: getattr(instance, field) for field in TRACKED_FIELDS[sender]})
+    apply_deltas(diff_counters(new, {}))
+
+
+for model in TRACKED_FIELDS:
+    pre_save.connect(remember_counters, sender=model, dispatch_uid=f'stats-pre-save-{model.__name__}')
+    post_save.connect(apply_save_deltas, sender=model, dispatch_uid=f'stats-post-save-{model.__name__}')
+    post_delete.connect(apply_delete_deltas, sender=model, dispatch_uid=f'stats-post-delete-{model.__name__}')
@@ -0,0 +1,142 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from apps.gallery.models import Design, Review
+from apps.bookings.models import Booking
+from .models import PlatformStats, DailyPlatformStats
+
+User = get_user_model()
+
+STATS_PK = 1
+
+# Fields whose changes move a row between counters; saves that touch none of
+# them (e.g. last_login updates) skip the stats bookkeeping entirely.
+TRACKED_FIELDS = {
+    User: ('role', 'is_approved'),
+    Design: ('status',),
+    Booking: ('status',),
+    Review: ('is_reported',),
+}
+
+
+def user_counters(role, is_approved):
+    return {
+        'total_users': 1,
+        'designers': int(role == 'designer'),
+        'customers': int(role == 'customer'),
+        'admins': int(role == 'admin'),
+        'pending_designers': int(role == 'designer' and not is_approved),
+    }
+
+
+def design_counters(status):
+    return {
+        'total_designs': 1,
+        'pending_designs': int(status == 'pending'),
+        'approved_designs': int(status == 'approved'),
+        'rejected_designs': int(status == 'rejected'),
+    }
+
+
+def booking_counters(status):
+    return {
+        'total_bookings': 1,
+        'pending_bookings': int(status == 'pending'),
+        'confirmed_bookings': int(status == 'confirmed'),
+        'completed_bookings': int(status == 'completed'),
+        'cancelled_bookings': int(status == 'cancelled'),
+    }
+
+
+def review_counters(is_reported):
+    return {'reported_reviews': int(bool(is_reported))}
+
+
+COUNTER_BUILDERS = {
+    User: user_counters,
+    Design: design_counters,
+    Booking: booking_counters,
+    Review: review_counters,
+}
+
+
+def counters_for(model, values):
+    """Counter contributions of a row, given its tracked field values"""
+    fields = TRACKED_FIELDS[model]
+    return COUNTER_BUILDERS[model](*(values[field] for field in fields))
+
+
+def diff_counters(old, new):
+    """Per-counter change when a row moves from `old` to `new` contributions"""
+    keys = set(old) | set(new)
+    return {key: new.get(key, 0) - old.get(key, 0) for key in keys}
+
+
+def transition_deltas(model, old_rows, new_values):
+    """
+    Summed counter deltas for moving `old_rows` (dicts of tracked field values)
+    to `new_values`. Used by queryset.update() callers, which bypass signals.
+    """
+    totals = {}
+    for old in old_rows:
+        new = {**old, **new_values}
+        for field, delta in diff_counters(counters_for(model, old), counters_for(model, new)).items():
+            totals[field] = totals.get(field, 0) + delta
+    return totals
+
+
+def apply_deltas(deltas):
+    """Atomically add `deltas` to the live stats row"""
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if changes:
+        PlatformStats.objects.filter(pk=STATS_PK).update(updated_at=timezone.now(), **changes)
+
+
+def compute_counters():
+    """Recount every counter from the source tables (one query per table)"""
+    counters = User.objects.aggregate(
+        total_users=Count('id'),
+        designers=Count('id', filter=Q(role='designer')),
+        customers=Count('id', filter=Q(role='customer')),
+        admins=Count('id', filter=Q(role='admin')),
+        pending_designers=Count('id', filter=Q(role='designer', is_approved=False)),
+    )
+    counters.update(Design.objects.aggregate(
+        total_designs=Count('id'),
+        pending_designs=Count('id', filter=Q(status='pending')),
+        approved_designs=Count('id', filter=Q(status='approved')),
+        rejected_designs=Count('id', filter=Q(status='rejected')),
+    ))
+    counters.update(Booking.objects.aggregate(
+        total_bookings=Count('id'),
+        pending_bookings=Count('id', filter=Q(status='pending')),
+        confirmed_bookings=Count('id', filter=Q(status='confirmed')),
+        completed_bookings=Count('id', filter=Q(status='completed')),
+        cancelled_bookings=Count('id', filter=Q(status='cancelled')),
+    ))
+    counters.update(Review.objects.aggregate(
+        reported_reviews=Count('id', filter=Q(is_reported=True)),
+    ))
+    return counters
+
+
+def reconcile(snapshot=True):
+    """Rewrite the live stats row from source tables and record today's snapshot"""
+    counters = compute_counters()
+    now = timezone.now()
+    stats, _ = PlatformStats.objects.update_or_create(
+        pk=STATS_PK, defaults={**counters, 'reconciled_at': now}
+    )
+    if snapshot:
+        DailyPlatformStats.objects.update_or_create(
+            date=timezone.localdate(now), defaults=counters
+        )
+    return stats
+
+
+def get_stats():
+    """Return the live stats row, building it on first use"""
+    stats = PlatformStats.objects.filter(pk=STATS_PK).first()
+    if stats is None:
+        stats = reconcile(snapshot=False)
+    return stats
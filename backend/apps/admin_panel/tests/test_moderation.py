@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.admin_panel.models import ModerationLease
+from apps.core.testing import QueryBudgetMixin, clear_caches
+from apps.gallery.models import Design
+
+User = get_user_model()
+
+
+@override_settings(THROTTLING={**settings.THROTTLING, 'ENABLED': False})
+class ModerationLeaseTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        designer = User.objects.create_user('designer', 'd@example.com', 'pw', role='designer', is_approved=True)
+        cls.designs = [
+            Design.objects.create(designer=designer, title=f'Design {i}', image=f'designs/{i}.jpg', status='pending')
+            for i in range(5)
+        ]
+        cls.admins = [
+            User.objects.create_user(f'admin{i}', f'a{i}@example.com', 'pw', role='admin', is_staff=True)
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        clear_caches()
+        self.first, self.second = APIClient(), APIClient()
+        self.first.force_authenticate(self.admins[0])
+        self.second.force_authenticate(self.admins[1])
+
+    def claim(self, client, **data):
+        response = client.post('/api/admin-panel/moderation/designs/claim/', data, format='json')
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()['results']]
+
+    def queue(self, client):
+        return [item['id'] for item in client.get('/api/admin-panel/moderation/designs/').json()['results']]
+
+    def release(self, client, **data):
+        return client.post('/api/admin-panel/moderation/designs/release/', data, format='json')
+
+    def test_claims_are_disjoint(self):
+        ids = [design.pk for design in self.designs]
+        self.assertEqual(self.claim(self.first, batch_size=3), ids[:3])
+        self.assertEqual(self.claim(self.second, batch_size=3), ids[3:])
+        # Nothing left for anyone
+        self.assertEqual(self.claim(self.first, batch_size=3), [])
+
+    def test_queue_hides_other_moderators_leases(self):
+        ids = [design.pk for design in self.designs]
+        self.claim(self.first, batch_size=2)
+        self.assertEqual(self.queue(self.first), ids)
+        self.assertEqual(self.queue(self.second), ids[2:])
+
+    def test_release(self):
+        ids = [design.pk for design in self.designs]
+        self.claim(self.first, batch_size=3)
+        # Only your own leases are released
+        self.assertEqual(self.release(self.second, ids=ids).json(), {'released': 0})
+        self.assertEqual(self.release(self.first, ids=[ids[0]]).json(), {'released': 1})
+        self.assertEqual(self.queue(self.second), [ids[0], *ids[3:]])
+        self.assertEqual(self.release(self.first).json(), {'released': 2})
+        self.assertEqual(self.queue(self.second), ids)
+
+    def test_release_rejects_bad_ids(self):
+        self.claim(self.first, batch_size=3)
+        for ids in ([], 'all', ['x'], [None], {'id': 1}):
+            with self.subTest(ids=ids):
+                self.assertEqual(self.release(self.first, ids=ids).status_code, 400)
+        self.assertEqual(ModerationLease.objects.count(), 3)
+
+    def test_expired_leases_return_to_the_queue(self):
+        ids = [design.pk for design in self.designs]
+        self.claim(self.first, batch_size=3)
+        ModerationLease.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.queue(self.second), ids)
+        self.assertEqual(self.claim(self.second, batch_size=2), ids[:2])
+
+    def test_moderation_is_decided_once(self):
+        self.claim(self.first, batch_size=1)
+        response = self.first.post(f'/api/admin-panel/designs/{self.designs[0].pk}/approve/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ModerationLease.objects.exists())
+
+    def test_bad_claim_parameters(self):
+        response = self.first.post('/api/admin-panel/moderation/designs/claim/', {'batch_size': 'many'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_queue_query_budget(self):
+        self.claim(self.second, batch_size=1)
+        self.assertQueryBudget(3, 'get', '/api/admin-panel/moderation/designs/', client=self.first)
+
+    def test_legacy_pending_lists_keep_their_shape(self):
+        self.claim(self.second, batch_size=2)
+        designs = self.first.get('/api/admin-panel/designs/pending/').json()
+        # Still a plain list of every pending design, claimed or not
+        self.assertIsInstance(designs, list)
+        self.assertEqual({design['id'] for design in designs}, {design.pk for design in self.designs})
+        self.assertIn('views_count', designs[0])
+        designers = self.first.get('/api/admin-panel/designers/pending/').json()
+        self.assertEqual(designers, [])
@@ -2,7 +2,11 @@ from django.urls import path
 from .views import (
     admin_dashboard, pending_designers, approve_designer,
     pending_designs, approve_design, reject_design,
-    reported_reviews, handle_review_report
+    reported_reviews, handle_review_report,
+    moderation_queue, claim_moderation_batch, release_moderation_batch,
+    bulk_approve_designers, bulk_approve_designs, bulk_reject_designs,
+    bulk_handle_review_reports, throttling_stats, profiles, download_profile,
+    design_imports, design_import_detail, resume_design_import, designer_portfolio
 )
 
 urlpatterns = [
@@ -12,13 +16,33 @@ urlpatterns = [
     # Designer Management
     path('designers/pending/', pending_designers, name='pending-designers'),
     path('designers/<int:user_id>/approve/', approve_designer, name='approve-designer'),
+    path('designers/bulk/approve/', bulk_approve_designers, name='bulk-approve-designers'),
+    path('designers/<int:user_id>/portfolio/', designer_portfolio, name='designer-portfolio'),
     
     # Design Management
     path('designs/pending/', pending_designs, name='pending-designs'),
     path('designs/<int:design_id>/approve/', approve_design, name='approve-design'),
     path('designs/<int:design_id>/reject/', reject_design, name='reject-design'),
+    path('designs/bulk/approve/', bulk_approve_designs, name='bulk-approve-designs'),
+    path('designs/bulk/reject/', bulk_reject_designs, name='bulk-reject-designs'),
+    path('designs/import/', design_imports, name='design-imports'),
+    path('designs/import/<int:import_id>/', design_import_detail, name='design-import-detail'),
+    path('designs/import/<int:import_id>/resume/', resume_design_import, name='resume-design-import'),
+    
+    # Moderation Queue (queue: designs or designers)
+    path('moderation/<str:queue>/', moderation_queue, name='moderation-queue'),
+    path('moderation/<str:queue>/claim/', claim_moderation_batch, name='moderation-claim'),
+    path('moderation/<str:queue>/release/', release_moderation_batch, name='moderation-release'),
     
     # Review Moderation
     path('reviews/reported/', reported_reviews, name='reported-reviews'),
     path('reviews/<int:review_id>/handle/', handle_review_report, name='handle-review'),
+    path('reviews/bulk/handle/', bulk_handle_review_reports, name='bulk-handle-reviews'),
+    
+    # Throttling
+    path('throttling/', throttling_stats, name='throttling-stats'),
+    
+    # Profiling
+    path('profiles/', profiles, name='profiles'),
+    path('profiles/<str:profile_id>/', download_profile, name='download-profile'),
 ]
\ No newline at end of file
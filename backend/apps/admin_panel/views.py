@@ -1,11 +1,31 @@
+import json
+import os
+import zipfile
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
 from django.contrib.auth import get_user_model
-from apps.gallery.models import Design, Review
+from django.utils import timezone
+from apps.core.cache import get_or_refresh
+from apps.core.profiling import list_profiles, profile_path, to_collapsed
+from apps.core.throttling import rejection_counts
+from apps.gallery.imports import is_stalled, start_import
+from apps.gallery.models import Design, DesignImport, Review
+from apps.gallery.portfolio import portfolio_response
 from apps.bookings.models import Booking
-from apps.users.serializers import UserSerializer
 from apps.gallery.serializers import DesignSerializer, ReviewSerializer
+from apps.users.serializers import UserSerializer
+from .models import DailyPlatformStats, ModerationLease
+from .moderation import QUEUES, pending_items, claim_batch, release_leases
+from . import bulk
+from .serializers import (
+    DashboardDesignerSerializer, DashboardDesignSerializer, DailyPlatformStatsSerializer,
+    DesignImportSerializer
+)
+from .stats import get_stats
 
 User = get_user_model()
 
@@ -18,57 +38,138 @@ class IsAdminUser(permissions.BasePermission):
         )
 
 
-@api_view(['GET'])
-@permission_classes([IsAdminUser])
-def admin_dashboard(request):
-    """Admin dashboard statistics"""
-    total_users = User.objects.count()
-    total_designers = User.objects.filter(role='designer').count()
-    total_customers = User.objects.filter(role='customer').count()
-    pending_designers = User.objects.filter(role='designer', is_approved=False).count()
-    
-    total_designs = Design.objects.count()
-    pending_designs = Design.objects.filter(status='pending').count()
-    approved_designs = Design.objects.filter(status='approved').count()
+def build_dashboard_stats():
+    """Build admin dashboard statistics from the maintained platform stats row"""
+    stats = get_stats()
     
-    total_bookings = Booking.objects.count()
-    pending_bookings = Booking.objects.filter(status='pending').count()
-    completed_bookings = Booking.objects.filter(status='completed').count()
+    top_designers = User.objects.filter(role='designer', is_approved=True).only(
+        'id', 'username', 'first_name', 'last_name', 'profile_picture', 'average_rating'
+    ).order_by('-average_rating')[:5]
+    popular_designs = Design.objects.filter(status='approved').only(
+        'id', 'title', 'image', 'designer_id', 'likes_count', 'views_count'
+    ).order_by('-likes_count')[:5]
     
-    reported_reviews = Review.objects.filter(is_reported=True).count()
-    
-    top_designers = User.objects.filter(role='designer', is_approved=True).order_by('-average_rating')[:5]
-    popular_designs = Design.objects.filter(status='approved').order_by('-likes_count')[:5]
-    
-    return Response({
+    return {
         'users': {
-            'total': total_users,
-            'designers': total_designers,
-            'customers': total_customers,
-            'pending_designers': pending_designers,
+            'total': stats.total_users,
+            'designers': stats.designers,
+            'customers': stats.customers,
+            'pending_designers': stats.pending_designers,
         },
         'designs': {
-            'total': total_designs,
-            'pending': pending_designs,
-            'approved': approved_designs,
+            'total': stats.total_designs,
+            'pending': stats.pending_designs,
+            'approved': stats.approved_designs,
         },
         'bookings': {
-            'total': total_bookings,
-            'pending': pending_bookings,
-            'completed': completed_bookings,
+            'total': stats.total_bookings,
+            'pending': stats.pending_bookings,
+            'completed': stats.completed_bookings,
         },
         'moderation': {
-            'reported_reviews': reported_reviews,
+            'reported_reviews': stats.reported_reviews,
         },
-        'top_designers': UserSerializer(top_designers, many=True).data,
-        'popular_designs': DesignSerializer(popular_designs, many=True).data,
+        'top_designers': DashboardDesignerSerializer(top_designers, many=True).data,
+        'popular_designs': DashboardDesignSerializer(popular_designs, many=True).data,
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def admin_dashboard(request):
+    """Admin dashboard statistics"""
+    # ?refresh=1 bypasses the cached snapshot
+    if request.query_params.get('refresh'):
+        stats = build_dashboard_stats()
+    else:
+        stats = get_or_refresh(
+            'admin-dashboard-stats',
+            build_dashboard_stats,
+            ttl=settings.DASHBOARD_CACHE_TTL,
+            stale_ttl=settings.DASHBOARD_CACHE_STALE_TTL,
+        )
+    
+    # ?history_days=30 adds daily snapshots for trend charts
+    try:
+        history_days = min(int(request.query_params.get('history_days', 0)), 366)
+    except ValueError:
+        history_days = 0
+    if history_days > 0:
+        history = DailyPlatformStats.objects.all()[:history_days]
+        stats = {**stats, 'history': DailyPlatformStatsSerializer(history, many=True).data}
+    
+    return Response(stats)
+
+
+class ModerationPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def _paginated_queue(request, queue):
+    items = pending_items(queue, request.user)
+    paginator = ModerationPagination()
+    page = paginator.paginate_queryset(items, request)
+    serializer = QUEUES[queue]['serializer'](page, many=True, context={'request': request})
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def moderation_queue(request, queue):
+    """Oldest-first page of pending items, excluding those leased to other moderators"""
+    if queue not in QUEUES:
+        return Response({'error': 'Unknown queue'}, status=status.HTTP_404_NOT_FOUND)
+    return _paginated_queue(request, queue)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def claim_moderation_batch(request, queue):
+    """Lease a batch of the oldest unclaimed items to the current moderator"""
+    if queue not in QUEUES:
+        return Response({'error': 'Unknown queue'}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        batch_size = int(request.data.get('batch_size', ModerationPagination.page_size))
+        lease_seconds = int(request.data.get('lease_seconds', settings.MODERATION_LEASE_SECONDS))
+    except (TypeError, ValueError):
+        return Response({'error': 'batch_size and lease_seconds must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    batch_size = max(1, min(batch_size, ModerationPagination.max_page_size))
+    lease_seconds = max(1, min(lease_seconds, settings.MODERATION_LEASE_MAX_SECONDS))
+    
+    items, expires_at = claim_batch(queue, request.user, batch_size, lease_seconds)
+    serializer = QUEUES[queue]['serializer'](items, many=True, context={'request': request})
+    return Response({
+        'lease_expires_at': expires_at,
+        'results': serializer.data,
     })
 
 
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def release_moderation_batch(request, queue):
+    """Release the current moderator's leases (all of them, or just `ids`)"""
+    if queue not in QUEUES:
+        return Response({'error': 'Unknown queue'}, status=status.HTTP_404_NOT_FOUND)
+    item_type = QUEUES[queue]['item_type']
+    if request.data.get('ids') is None:
+        released = ModerationLease.objects.filter(item_type=item_type, moderator=request.user).delete()[0]
+    else:
+        ids, error = _bulk_ids(request)
+        if error:
+            return error
+        released = release_leases(item_type, ids, moderator=request.user)
+    return Response({'released': released})
+
+
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def pending_designers(request):
-    """List designers pending approval"""
+    """
+    List designers pending approval, as a plain list. Kept as it was for
+    existing clients; moderation_queue pages the same items and honours leases.
+    """
     designers = User.objects.filter(role='designer', is_approved=False)
     serializer = UserSerializer(designers, many=True)
     return Response(serializer.data)
@@ -82,6 +183,7 @@ def approve_designer(request, user_id):
         user = User.objects.get(id=user_id, role='designer')
         user.is_approved = True
         user.save()
+        release_leases('designer', [user.id])
         
         from apps.bookings.models import Notification
         Notification.objects.create(
@@ -99,7 +201,10 @@ def approve_designer(request, user_id):
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def pending_designs(request):
-    """List designs pending approval"""
+    """
+    List designs pending approval, as a plain list. Kept as it was for
+    existing clients; moderation_queue pages the same items and honours leases.
+    """
     designs = Design.objects.filter(status='pending')
     serializer = DesignSerializer(designs, many=True)
     return Response(serializer.data)
@@ -113,6 +218,7 @@ def approve_design(request, design_id):
         design = Design.objects.get(id=design_id)
         design.status = 'approved'
         design.save()
+        release_leases('design', [design.id])
         return Response({'message': 'Design approved successfully'})
     except Design.DoesNotExist:
         return Response({'error': 'Design not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -126,11 +232,79 @@ def reject_design(request, design_id):
         design = Design.objects.get(id=design_id)
         design.status = 'rejected'
         design.save()
+        release_leases('design', [design.id])
         return Response({'message': 'Design rejected'})
     except Design.DoesNotExist:
         return Response({'error': 'Design not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+# Upper bound on ids per bulk request, keeps the IN (...) list and transaction bounded
+BULK_MAX_IDS = 5000
+
+
+def _bulk_ids(request):
+    """Parse and de-duplicate the `ids` list of a bulk request, or return an error Response"""
+    ids = request.data.get('ids')
+    if not isinstance(ids, list) or not ids:
+        return None, Response({'error': 'ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > BULK_MAX_IDS:
+        return None, Response({'error': f'At most {BULK_MAX_IDS} ids per request'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        return list(dict.fromkeys(int(pk) for pk in ids)), None
+    except (TypeError, ValueError):
+        return None, Response({'error': 'ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _bulk_response(results):
+    return Response({
+        'results': results,
+        'updated': sum(outcome not in ('unchanged', 'not_found') for outcome in results.values()),
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def bulk_approve_designers(request):
+    """Approve many designers at once"""
+    ids, error = _bulk_ids(request)
+    if error:
+        return error
+    return _bulk_response(bulk.approve_designers(ids))
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def bulk_approve_designs(request):
+    """Approve many designs at once"""
+    ids, error = _bulk_ids(request)
+    if error:
+        return error
+    return _bulk_response(bulk.set_design_status(ids, 'approved'))
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def bulk_reject_designs(request):
+    """Reject many designs at once"""
+    ids, error = _bulk_ids(request)
+    if error:
+        return error
+    return _bulk_response(bulk.set_design_status(ids, 'rejected'))
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def bulk_handle_review_reports(request):
+    """Approve or hide many reported reviews at once"""
+    ids, error = _bulk_ids(request)
+    if error:
+        return error
+    action = request.data.get('action')
+    if action not in ('approve', 'reject'):
+        return Response({'error': 'Invalid action'}, status=status.HTTP_400_BAD_REQUEST)
+    return _bulk_response(bulk.handle_review_reports(ids, action))
+
+
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def reported_reviews(request):
@@ -160,3 +334,134 @@ def handle_review_report(request, review_id):
             return Response({'error': 'Invalid action'}, status=status.HTTP_400_BAD_REQUEST)
     except Review.DoesNotExist:
         return Response({'error': 'Review not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def throttling_stats(request):
+    """Configured throttle rates and rejected request counts per scope"""
+    return Response({
+        'enabled': settings.THROTTLING['ENABLED'],
+        'rates': settings.THROTTLING['RATES'],
+        'rejected': rejection_counts(),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profiles(request):
+    """Captured request profiles, newest first (?view=design-list to filter)"""
+    return Response({
+        'enabled': settings.PROFILING['ENABLED'],
+        'sample_rate': settings.PROFILING['SAMPLE_RATE'],
+        'results': list_profiles(request.query_params.get('view') or None),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def download_profile(request, profile_id):
+    """Download a profile as speedscope JSON, or ?output=collapsed for flamegraph.pl"""
+    path = profile_path(profile_id)
+    if path is None:
+        return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if request.query_params.get('output') == 'collapsed':
+        with open(path) as f:
+            collapsed = to_collapsed(json.load(f))
+        response = HttpResponse(collapsed, content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{profile_id}.collapsed.txt"'
+        return response
+    return FileResponse(
+        open(path, 'rb'), as_attachment=True,
+        filename=f'{profile_id}.speedscope.json', content_type='application/json'
+    )
+
+
+def _spool(upload, name):
+    """Copy an uploaded file into the import spool directory"""
+    directory = settings.DESIGN_IMPORT['SPOOL_DIR']
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        for chunk in upload.chunks():
+            f.write(chunk)
+    return path
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAdminUser])
+def design_imports(request):
+    """
+    GET: recent bulk imports. POST (multipart): start importing `archive` (ZIP
+    of images) for `designer`, with an optional `manifest` file (otherwise
+    manifest.csv/.json inside the ZIP) and `status` (pending/approved)
+    """
+    if request.method == 'GET':
+        imports = DesignImport.objects.all()[:20]
+        return Response(DesignImportSerializer(imports, many=True).data)
+    
+    archive = request.FILES.get('archive')
+    manifest = request.FILES.get('manifest')
+    if archive is None or not zipfile.is_zipfile(archive):
+        return Response({'error': 'archive must be a ZIP file'}, status=status.HTTP_400_BAD_REQUEST)
+    if manifest is not None and not manifest.name.lower().endswith(('.csv', '.json')):
+        return Response({'error': 'manifest must be a .csv or .json file'}, status=status.HTTP_400_BAD_REQUEST)
+    designer_id = str(request.data.get('designer', ''))
+    designer = User.objects.filter(pk=designer_id, role='designer').first() if designer_id.isdigit() else None
+    if designer is None:
+        return Response({'error': 'designer must be the id of a designer'}, status=status.HTTP_400_BAD_REQUEST)
+    design_status = request.data.get('status', 'pending')
+    if design_status not in ('pending', 'approved'):
+        return Response({'error': 'status must be pending or approved'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    job = DesignImport.objects.create(designer=designer, created_by=request.user, design_status=design_status)
+    job.source = _spool(archive, f'import-{job.pk}.zip')
+    if manifest is not None:
+        job.manifest = _spool(manifest, f'import-{job.pk}-manifest{os.path.splitext(manifest.name)[1].lower()}')
+    job.save(update_fields=['source', 'manifest'])
+    start_import(job)
+    return Response(DesignImportSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def design_import_detail(request, import_id):
+    """Progress and errors of a bulk import"""
+    job = DesignImport.objects.filter(pk=import_id).first()
+    if job is None:
+        return Response({'error': 'Import not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(DesignImportSerializer(job).data)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def resume_design_import(request, import_id):
+    """Re-run a failed or stalled import; rows already imported are skipped"""
+    job = DesignImport.objects.filter(pk=import_id).first()
+    if job is None:
+        return Response({'error': 'Import not found'}, status=status.HTTP_404_NOT_FOUND)
+    if job.status == 'completed' or (job.status in ('pending', 'running') and not is_stalled(job)):
+        return Response({'error': f'Import is {job.status}'}, status=status.HTTP_409_CONFLICT)
+    if not os.path.exists(job.source):
+        return Response({'error': 'The import source no longer exists'}, status=status.HTTP_409_CONFLICT)
+    # Claim it, so concurrent resume requests start only one run
+    claimed = DesignImport.objects.filter(pk=job.pk, status=job.status, updated_at=job.updated_at).update(
+        status='pending', updated_at=timezone.now()
+    )
+    if not claimed:
+        return Response({'error': 'Import was resumed already'}, status=status.HTTP_409_CONFLICT)
+    
+    job.refresh_from_db()
+    start_import(job)
+    return Response(DesignImportSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def designer_portfolio(request, user_id):
+    """Download a designer's designs as a streamed ZIP (?manifest=false to leave out manifest.json)"""
+    designer = User.objects.filter(pk=user_id, role='designer').first()
+    if designer is None:
+        return Response({'error': 'Designer not found'}, status=status.HTTP_404_NOT_FOUND)
+    return portfolio_response(request, designer)
@@ -0,0 +1,57 @@
+# Generated by Django 4.2 on 2026-10-19 14:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('gallery', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DesignDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.IntegerField(default=0)),
+                ('likes', models.IntegerField(default=0)),
+                ('dislikes', models.IntegerField(default=0)),
+                ('design', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='gallery.design')),
+                ('designer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='design_daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DesignerDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.IntegerField(default=0)),
+                ('likes', models.IntegerField(default=0)),
+                ('dislikes', models.IntegerField(default=0)),
+                ('bookings', models.IntegerField(default=0)),
+                ('designer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+                'unique_together': {('designer', 'date')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='designdailystats',
+            index=models.Index(fields=['designer', 'date'], name='analytics_d_designe_44ca83_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='designdailystats',
+            unique_together={('design', 'date')},
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import models
+from django.conf import settings
+
+
+class DesignDailyStats(models.Model):
+    """
+    Per-design activity rolled up by day
+    """
+    design = models.ForeignKey('gallery.Design', on_delete=models.CASCADE, related_name='daily_stats')
+    designer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='design_daily_stats')
+    date = models.DateField()
+    
+    views = models.IntegerField(default=0)
+    likes = models.IntegerField(default=0)
+    dislikes = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-date']
+        unique_together = ('design', 'date')
+        indexes = [
+            models.Index(fields=['designer', 'date']),
+        ]
+    
+    def __str__(self):
+        return f"Design #{self.design_id} on {self.date}"
+
+
+class DesignerDailyStats(models.Model):
+    """
+    Per-designer activity rolled up by day (sum over their designs, plus bookings)
+    """
+    designer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    
+    views = models.IntegerField(default=0)
+    likes = models.IntegerField(default=0)
+    dislikes = models.IntegerField(default=0)
+    bookings = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-date']
+        unique_together = ('designer', 'date')
+    
+    def __str__(self):
+        return f"Designer #{self.designer_id} on {self.date}"
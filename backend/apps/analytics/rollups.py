@@ -0,0 +1,32 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import DesignDailyStats, DesignerDailyStats
+
+
+def _bump(model, lookup, deltas):
+    """Add `deltas` to the row matching `lookup`, creating it if needed"""
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if not changes:
+        return
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another request created today's row first
+        model.objects.filter(**lookup).update(**changes)
+
+
+def record_design_activity(design_id, designer_id, views=0, likes=0, dislikes=0):
+    """Record views/reactions on a design into today's design and designer rollups"""
+    today = timezone.localdate()
+    deltas = {'views': views, 'likes': likes, 'dislikes': dislikes}
+    _bump(DesignDailyStats, {'design_id': design_id, 'designer_id': designer_id, 'date': today}, deltas)
+    _bump(DesignerDailyStats, {'designer_id': designer_id, 'date': today}, deltas)
+
+
+def record_booking(designer_id):
+    """Record a new booking request into today's designer rollup"""
+    _bump(DesignerDailyStats, {'designer_id': designer_id, 'date': timezone.localdate()}, {'bookings': 1})
@@ -0,0 +1,88 @@
+from datetime import timedelta
+from rest_framework import status, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .models import DesignDailyStats, DesignerDailyStats
+
+GRANULARITIES = {
+    'day': None,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+MAX_RANGE_DAYS = 366 * 2
+
+
+def _date_param(request, name, default):
+    value = request.query_params.get(name)
+    if not value:
+        return default
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def designer_analytics(request):
+    """Views, likes and bookings over time for the current designer, served from daily rollups"""
+    user = request.user
+    if user.role != 'designer':
+        return Response({'error': 'Only designers have analytics'}, status=status.HTTP_403_FORBIDDEN)
+    
+    granularity = request.query_params.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        return Response(
+            {'error': f"granularity must be one of: {', '.join(GRANULARITIES)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    date_to = _date_param(request, 'to', timezone.localdate())
+    date_from = _date_param(request, 'from', date_to and date_to - timedelta(days=29))
+    if date_from is None or date_to is None:
+        return Response({'error': 'from and to must be dates (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
+    if date_from > date_to or (date_to - date_from).days > MAX_RANGE_DAYS:
+        return Response({'error': 'Invalid date range'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    metrics = {
+        'views': Sum('views'),
+        'likes': Sum('likes'),
+        'dislikes': Sum('dislikes'),
+        'bookings': Sum('bookings'),
+    }
+    rows = DesignerDailyStats.objects.filter(designer=user, date__range=(date_from, date_to))
+    
+    # Weekly/monthly series are re-aggregated from the daily rows
+    trunc = GRANULARITIES[granularity]
+    period = trunc('date') if trunc else F('date')
+    series = rows.annotate(period=period).values('period').annotate(**metrics).order_by('period')
+    totals = rows.aggregate(**metrics)
+    
+    top_designs = DesignDailyStats.objects.filter(
+        designer=user, date__range=(date_from, date_to)
+    ).values('design_id', 'design__title').annotate(
+        views=Sum('views'), likes=Sum('likes'), dislikes=Sum('dislikes')
+    ).order_by('-views')[:10]
+    
+    return Response({
+        'from': date_from,
+        'to': date_to,
+        'granularity': granularity,
+        'totals': {key: value or 0 for key, value in totals.items()},
+        'series': list(series),
+        'top_designs': [
+            {
+                'id': row['design_id'],
+                'title': row['design__title'],
+                'views': row['views'],
+                'likes': row['likes'],
+                'dislikes': row['dislikes'],
+            }
+            for row in top_designs
+        ],
+    })
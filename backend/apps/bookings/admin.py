@@ -1,16 +1,26 @@
 from django.contrib import admin
+from apps.core.paginator import EstimatedCountPaginator
 from .models import Booking, Notification
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
     list_display = ('id', 'customer', 'designer', 'booking_date', 'booking_time', 'status', 'created_at')
+    list_select_related = ('customer', 'designer')
     search_fields = ('customer__username', 'designer__username')
     list_filter = ('status', 'booking_date')
     ordering = ('-booking_date', '-booking_time')
+    autocomplete_fields = ('customer', 'designer', 'cancelled_by')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ('user', 'notification_type', 'title', 'is_read', 'created_at')
+    list_select_related = ('user',)
     list_filter = ('notification_type', 'is_read')
     search_fields = ('user__username', 'title', 'message')
+    ordering = ('-id',)
+    raw_id_fields = ('user', 'booking')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
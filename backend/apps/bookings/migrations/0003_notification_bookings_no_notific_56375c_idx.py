@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['notification_type', 'is_read'], name='bookings_no_notific_56375c_idx'),
+        ),
+    ]
@@ -87,6 +87,9 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['notification_type', 'is_read']),
+        ]
     
     def __str__(self):
         return f"{self.notification_type} for {self.user.username}"
\ No newline at end of file
@@ -1,11 +1,13 @@
 from rest_framework import serializers
 from .models import Booking, Notification
 from django.contrib.auth import get_user_model
+from apps.core.fast_serializers import ValuesSerializer
+from apps.core.fieldsets import SparseFieldsetMixin
 
 User = get_user_model()
 
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.username', read_only=True)
     designer_name = serializers.CharField(source='designer.username', read_only=True)
     designer_phone = serializers.CharField(source='designer.phone', read_only=True)
@@ -38,8 +40,12 @@ class BookingSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = '__all__'
         read_only_fields = ['user', 'created_at']
+
+
+fast_booking_list = ValuesSerializer(BookingSerializer)
+fast_notification_list = ValuesSerializer(NotificationSerializer)
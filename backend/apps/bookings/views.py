@@ -2,25 +2,36 @@ from rest_framework import generics, status, permissions, viewsets
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Q
+from django.db.models import Count, Q
+from apps.analytics.rollups import record_booking
+from apps.core.fast_serializers import FastListMixin
+from apps.core.fieldsets import SparseQuerysetMixin
 from .models import Booking, Notification
-from .serializers import BookingSerializer, NotificationSerializer
+from .serializers import BookingSerializer, NotificationSerializer, fast_booking_list, fast_notification_list
 
 
-class BookingViewSet(viewsets.ModelViewSet):
+class BookingViewSet(FastListMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """Manage bookings"""
     serializer_class = BookingSerializer
+    fast_serializer = fast_booking_list
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
         user = self.request.user
+        bookings = Booking.objects.select_related('customer', 'designer')
         if user.role == 'designer':
-            return Booking.objects.filter(designer=user)
+            return bookings.filter(designer=user)
         else:
-            return Booking.objects.filter(customer=user)
+            return bookings.filter(customer=user)
+    
+    def get_throttles(self):
+        if self.action == 'create':
+            self.throttle_scope = 'booking'
+        return super().get_throttles()
     
     def perform_create(self, serializer):
         booking = serializer.save(customer=self.request.user)
+        record_booking(booking.designer_id)
         
         # Create notification for designer
         Notification.objects.create(
@@ -72,9 +83,10 @@ class BookingViewSet(viewsets.ModelViewSet):
         return Response(BookingSerializer(booking).data)
 
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(FastListMixin, SparseQuerysetMixin, generics.ListAPIView):
     """List user notifications"""
     serializer_class = NotificationSerializer
+    fast_serializer = fast_notification_list
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -101,18 +113,15 @@ def dashboard_stats(request):
     user = request.user
     
     if user.role == 'designer':
-        total_bookings = Booking.objects.filter(designer=user).count()
-        pending_bookings = Booking.objects.filter(designer=user, status='pending').count()
-        completed_bookings = Booking.objects.filter(designer=user, status='completed').count()
-        total_designs = user.designs.filter(status='approved').count()
+        stats = Booking.objects.filter(designer=user).aggregate(
+            total_bookings=Count('id'),
+            pending_bookings=Count('id', filter=Q(status='pending')),
+            completed_bookings=Count('id', filter=Q(status='completed')),
+        )
+        stats['total_designs'] = user.designs.filter(status='approved').count()
+        stats['average_rating'] = float(user.average_rating)
         
-        return Response({
-            'total_bookings': total_bookings,
-            'pending_bookings': pending_bookings,
-            'completed_bookings': completed_bookings,
-            'total_designs': total_designs,
-            'average_rating': float(user.average_rating),
-        })
+        return Response(stats)
     else:
         total_bookings = Booking.objects.filter(customer=user).count()
         favorites_count = user.favorites.count()
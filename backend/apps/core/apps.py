@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.core'
+    
+    def ready(self):
+        from django.db.models.signals import post_delete
+        from .storage import blob_fields, release_deleted_files
+        from . import checks  # noqa: F401 (registers the system checks)
+        
+        # Per model: a receiver for every sender would disable fast deletes everywhere
+        for model in {model for model, _ in blob_fields()}:
+            post_delete.connect(release_deleted_files, sender=model, dispatch_uid=f'release-blobs-{model._meta.label}')
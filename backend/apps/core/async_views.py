@@ -0,0 +1,75 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from .response_cache import aget_or_build, cache_key
+
+
+def is_anonymous(request):
+    """
+    True when the request carries no credentials. Async views only serve
+    these; anything else goes to the sync DRF view, which authenticates
+    (touching the DB) and adds viewer-specific fields.
+    """
+    return (
+        'HTTP_AUTHORIZATION' not in request.META
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+    )
+
+
+async def delegate(view, request, **kwargs):
+    """Run the regular sync DRF view for requests the async path doesn't serve"""
+    return await sync_to_async(view)(request, **kwargs)
+
+
+def _setup(view_class, request, actions, kwargs):
+    view = view_class()
+    if actions:
+        # What ViewSetMixin.as_view() does per request
+        view.action_map = actions
+        for method, action in actions.items():
+            setattr(view, method, getattr(view, action))
+    view.args, view.kwargs = (), kwargs
+    drf_request = view.initialize_request(request, **kwargs)
+    view.request = drf_request
+    view.headers = view.default_response_headers
+    try:
+        view.initial(drf_request, **kwargs)
+    except Exception as exc:
+        return view, drf_request, view.handle_exception(exc)
+    return view, drf_request, None
+
+
+async def _finalize(view, request, response):
+    response = view.finalize_response(request, response, **view.kwargs)
+    if isinstance(response, Response):
+        if isinstance(request.accepted_renderer, JSONRenderer):
+            response.render()
+        else:
+            # The browsable API renders forms from querysets
+            await sync_to_async(response.render)()
+    return response
+
+
+async def serve(view_class, request, handler, actions=None, **kwargs):
+    """
+    Answer `request` through an instance of the DRF view `view_class`, set
+    up the way dispatch() does: initial() (authentication, permissions,
+    throttles, content negotiation) runs in a thread, then `await
+    handler(view, drf_request)` returns the response. Exceptions are
+    handled, and the response finalized and rendered, as in dispatch().
+    """
+    view, drf_request, response = await sync_to_async(_setup)(view_class, request, actions, kwargs)
+    if response is None:
+        try:
+            response = await handler(view, drf_request)
+        except Exception as exc:
+            response = view.handle_exception(exc)
+    return await _finalize(view, drf_request, response)
+
+
+async def cached_data(request, tags, build):
+    """Return `build()` -> (status, data) through the response cache"""
+    if not settings.RESPONSE_CACHE['ENABLED']:
+        return await build()
+    return await aget_or_build(cache_key(request, tags), build)
@@ -0,0 +1,48 @@
+import threading
+import time
+
+from django.core.cache import caches
+from django.db import connections
+from .metrics import cache_lookup
+
+
+def _store(cache, key, value, ttl, stale_ttl):
+    cache.set(key, (time.time() + ttl, value), ttl + stale_ttl)
+
+
+def _refresh(cache, key, builder, ttl, stale_ttl):
+    try:
+        _store(cache, key, builder(), ttl, stale_ttl)
+    finally:
+        cache.delete(f'{key}:refreshing')
+        # Background threads get their own DB connections; don't leak them
+        connections.close_all()
+
+
+def get_or_refresh(key, builder, ttl, stale_ttl=0, alias='default'):
+    """
+    Return a cached snapshot built by `builder`, with stale-while-revalidate.
+
+    Fresh entries are returned as-is. Once an entry is older than `ttl` it is
+    still served for up to `stale_ttl` more seconds while a single background
+    thread rebuilds it. A `ttl` of 0 disables caching entirely.
+    """
+    if not ttl:
+        return builder()
+
+    cache = caches[alias]
+    entry = cache.get(key)
+    cache_lookup(key, entry is not None)
+    if entry is None:
+        value = builder()
+        _store(cache, key, value, ttl, stale_ttl)
+        return value
+
+    fresh_until, value = entry
+    if time.time() >= fresh_until and cache.add(f'{key}:refreshing', True, ttl):
+        threading.Thread(
+            target=_refresh,
+            args=(cache, key, builder, ttl, stale_ttl),
+            daemon=True,
+        ).start()
+    return value
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+from .db_router import is_shared
+
+
+@register(Tags.caches, deploy=True)
+def check_throttle_cache(app_configs, **kwargs):
+    """Local-memory throttle buckets are per process, so limits scale with the worker count"""
+    options = settings.THROTTLING
+    if not options['ENABLED'] or not isinstance(caches[options['CACHE']], LocMemCache):
+        return []
+    return [Warning(
+        f"Throttle buckets are kept in the local-memory '{options['CACHE']}' cache, so every worker "
+        'process enforces the rates separately.',
+        hint='Set THROTTLE_CACHE_BACKEND (and THROTTLE_CACHE_LOCATION) to a Redis or Memcached cache.',
+        id='core.W001',
+    )]
+
+
+@register(Tags.caches, deploy=True)
+def check_pin_cache(app_configs, **kwargs):
+    """Read-your-writes pins in a per-process cache would be missed by the other workers"""
+    alias = settings.DATABASE_ROUTING['PIN_CACHE']
+    if not settings.DATABASE_REPLICAS or is_shared(caches[alias]):
+        return []
+    return [Warning(
+        f"The '{alias}' cache is per process, so token clients are only pinned to the primary "
+        'after a write if they send the pin cookie back.',
+        hint='Set DB_PIN_CACHE_BACKEND (and DB_PIN_CACHE_LOCATION) to a Redis or Memcached cache.',
+        id='core.W002',
+    )]
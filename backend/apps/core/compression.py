@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+# Random gzip padding against BREACH, as in Django's GZipMiddleware
+MAX_RANDOM_BYTES = 100
+
+
+def accepted_encodings(header):
+    """{coding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """Best of br/gzip the client accepts (br wins ties), or None"""
+    accepted = accepted_encodings(header)
+    available = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _brotli_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def _abrotli_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    async for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def _agzip_sequence(sequence):
+    async for chunk in sequence:
+        yield compress_string(chunk, max_random_bytes=MAX_RANDOM_BYTES)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress text/JSON responses with brotli or gzip, whichever the client
+    prefers in Accept-Encoding (brotli only when the `brotli` package is
+    installed). Responses under COMPRESSION['MIN_SIZE'] bytes, already
+    encoded, or served from COMPRESSION['EXCLUDE_PATHS'] are left alone.
+    Streaming responses are compressed chunk by chunk.
+    """
+    def process_response(self, request, response):
+        options = settings.COMPRESSION
+        # A byte range of the original body can't be re-encoded
+        if not options['ENABLED'] or response.has_header('Content-Encoding') or response.status_code == 206:
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if not content_type.startswith(tuple(options['CONTENT_TYPES'])):
+            return response
+        if not response.streaming and len(response.content) < options['MIN_SIZE']:
+            return response
+        if request.path.startswith(tuple(options['EXCLUDE_PATHS'])):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            content = response.streaming_content
+            if encoding == 'br':
+                compress = _abrotli_sequence if response.is_async else _brotli_sequence
+                response.streaming_content = compress(content, options['BROTLI_QUALITY'])
+            elif response.is_async:
+                response.streaming_content = _agzip_sequence(content)
+            else:
+                response.streaming_content = compress_sequence(content, max_random_bytes=MAX_RANDOM_BYTES)
+            del response.headers['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed = brotli.compress(response.content, quality=options['BROTLI_QUALITY'])
+            else:
+                compressed = compress_string(response.content, max_random_bytes=MAX_RANDOM_BYTES)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag must not match a differently-encoded body
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,114 @@
+"""
+Conditional GET for API views. Validators come from cheap queries
+(updated_at, counts) instead of the rendered body, so a request whose
+If-None-Match / If-Modified-Since still holds gets 304 Not Modified before
+anything is serialized. View counts are not part of any validator, which
+is why the ETags are weak.
+"""
+import functools
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .response_cache import aget_or_build, cache_key, get_or_build, is_cacheable, normalized_query
+
+
+def etag(request, parts, format='json', viewer=''):
+    """Weak ETag over `parts` and what else shapes the body: path, query, format and viewer"""
+    raw = '|'.join(str(part) for part in (request.path, normalized_query(request), format, viewer, *parts))
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:24]}"'
+
+
+def _validators_key(request, tags, kwargs):
+    view_tags = tags(**kwargs) if callable(tags) else tags
+    return cache_key(request, view_tags) + ':validators'
+
+
+def _check(request, result, **etag_options):
+    """(ETag, Last-Modified timestamp, 304/412 response or None) for validators `result`"""
+    parts, last_modified = result
+    tag = etag(request, parts, **etag_options)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return tag, timestamp, get_conditional_response(request, etag=tag, last_modified=timestamp)
+
+
+def _set_headers(response, tag, timestamp):
+    response['ETag'] = tag
+    if timestamp:
+        response['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+def conditional(validators, tags=None):
+    """
+    Answer GET/HEAD on a DRF view method with 304 while the client's copy
+    is current.
+
+    `validators(view, request, **kwargs)` returns (parts, last_modified):
+    values that change whenever the body does, and a datetime or None.
+    Only give last_modified when it moves on every change, deletions
+    included. Returning None skips validation (e.g. the object doesn't
+    exist; the view answers). With `tags` (as for cached_response),
+    anonymous requests keep their validators in the response cache, so
+    the cached path stays free of queries.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not settings.CONDITIONAL_GET or request.method not in ('GET', 'HEAD'):
+                return method(self, request, *args, **kwargs)
+
+            if tags is not None and settings.RESPONSE_CACHE['ENABLED'] and is_cacheable(request):
+                def build():
+                    result = validators(self, request, **kwargs)
+                    return (200, result) if result is not None else (404, None)
+
+                result = get_or_build(_validators_key(request, tags, kwargs), build)[1]
+            else:
+                result = validators(self, request, **kwargs)
+            if result is None:
+                return method(self, request, *args, **kwargs)
+
+            renderer = getattr(request, 'accepted_renderer', None)
+            tag, timestamp, response = _check(
+                request, result,
+                format=renderer.format if renderer else '',
+                viewer=request.user.pk if request.user.is_authenticated else '',
+            )
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            return _set_headers(response, tag, timestamp)
+        return wrapper
+    return decorator
+
+
+async def aconditional(request, validators, tags, respond, format='json', **kwargs):
+    """
+    @conditional for the anonymous async views. `validators()` and
+    `respond()` are coroutine functions; validators are shared with the
+    sync views through the response cache, and given the negotiated
+    renderer's `format` the ETags are the same.
+    """
+    if not settings.CONDITIONAL_GET or request.method not in ('GET', 'HEAD'):
+        return await respond()
+
+    if settings.RESPONSE_CACHE['ENABLED']:
+        async def build():
+            result = await validators()
+            return (200, result) if result is not None else (404, None)
+
+        result = (await aget_or_build(_validators_key(request, tags, kwargs), build))[1]
+    else:
+        result = await validators()
+    if result is None:
+        return await respond()
+
+    tag, timestamp, response = _check(request, result, format=format)
+    if response is None:
+        response = await respond()
+        if response.status_code != 200:
+            return response
+    return _set_headers(response, tag, timestamp)
@@ -0,0 +1,185 @@
+import hashlib
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+PIN_COOKIE = 'db_pin'
+PIN_PREFIX = 'db-pin:'
+
+
+class ReplicaReads:
+    """A request's replica, picked on its first read and kept for the rest of it"""
+    __slots__ = ('alias',)
+
+    def __init__(self):
+        self.alias = None
+
+
+# Set per request by ReplicaRoutingMiddleware; everything else (management
+# commands, background threads, unsafe requests) reads from the primary
+_replica_reads = ContextVar('replica_reads', default=None)
+
+# Replica alias -> monotonic time until which it is skipped
+_down_until = {}
+
+
+def healthy_replica():
+    """A random reachable replica alias, or the primary if none is"""
+    now = time.monotonic()
+    candidates = [alias for alias in settings.DATABASE_REPLICAS if _down_until.get(alias, 0) <= now]
+    random.shuffle(candidates)
+    for alias in candidates:
+        connection = connections[alias]
+        try:
+            # Cheap when a persistent connection is already open and checked
+            connection.close_if_health_check_failed()
+            connection.ensure_connection()
+        except DatabaseError:
+            _down_until[alias] = now + settings.DATABASE_ROUTING['RETRY_SECONDS']
+            continue
+        return alias
+    return DEFAULT_DB_ALIAS
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes go to the primary. Reads go to a replica only inside a request
+    ReplicaRoutingMiddleware allowed it for, and never inside a transaction
+    on the primary (it would miss the transaction's own writes).
+    """
+    def db_for_read(self, model, **hints):
+        reads = _replica_reads.get()
+        if not settings.DATABASE_REPLICAS or reads is None:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        # One replica per request, so its queries see one consistent snapshot
+        if reads.alias is None:
+            reads.alias = healthy_replica()
+        return reads.alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside the block, e.g. while building a response cached for everyone"""
+    token = _replica_reads.set(None)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def is_shared(cache):
+    """False for backends that keep entries in (or drop them from) this process only"""
+    return not isinstance(cache, (LocMemCache, DummyCache))
+
+
+def _pin_key(request):
+    """Cache key identifying the client (token user or session), or None"""
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if header.startswith('Bearer '):
+        # Keyed by user rather than token so a refreshed token stays pinned
+        try:
+            return f'{PIN_PREFIX}user:{AccessToken(header[7:])[jwt_settings.USER_ID_CLAIM]}'
+        except (TokenError, KeyError):
+            return None
+    session = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session:
+        return f'{PIN_PREFIX}session:{hashlib.sha1(session.encode()).hexdigest()}'
+    return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Allow replica reads for safe requests under DATABASE_ROUTING['REPLICA_PATHS'].
+
+    Read-your-writes: after an unsafe request the client is pinned to the
+    primary for STICKY_SECONDS, through a cookie for browsers and a cache
+    entry keyed by the token's user (or session) for API clients. The cache
+    entry is only used when PIN_CACHE is shared between workers; a
+    per-process cache would miss the pin whenever another worker answers.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = settings.DATABASE_ROUTING
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _cache(self):
+        cache = caches[self.options['PIN_CACHE']]
+        return cache if is_shared(cache) else None
+
+    def _may_use_replica(self, request):
+        return (
+            bool(settings.DATABASE_REPLICAS)
+            and request.method in ('GET', 'HEAD', 'OPTIONS')
+            and request.path.startswith(tuple(self.options['REPLICA_PATHS']))
+            and PIN_COOKIE not in request.COOKIES
+        )
+
+    def _pin(self, request, response):
+        seconds = self.options['STICKY_SECONDS']
+        response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+        return _pin_key(request), seconds
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        cache = self._cache()
+        use_replica = self._may_use_replica(request)
+        if use_replica and cache and (key := _pin_key(request)):
+            use_replica = cache.get(key) is None
+
+        token = _replica_reads.set(ReplicaReads() if use_replica else None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
+
+        if settings.DATABASE_REPLICAS and request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            key, seconds = self._pin(request, response)
+            if key and cache:
+                cache.set(key, True, seconds)
+        return response
+
+    async def __acall__(self, request):
+        cache = self._cache()
+        use_replica = self._may_use_replica(request)
+        if use_replica and cache and (key := _pin_key(request)):
+            use_replica = await cache.aget(key) is None
+
+        token = _replica_reads.set(ReplicaReads() if use_replica else None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
+
+        if settings.DATABASE_REPLICAS and request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            key, seconds = self._pin(request, response)
+            if key and cache:
+                await cache.aset(key, True, seconds)
+        return response
@@ -0,0 +1,198 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from .fieldsets import sparse_fields, wants_sparse
+from .renderers import render_json
+from .streaming import streaming_response
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for an existing ModelSerializer on list endpoints.
+
+    Fetches exactly the serializer's columns with `.values()` (following
+    dotted sources through joins) and builds each output dict from accessors
+    compiled once per field, reusing the DRF fields' own to_representation so
+    the output is identical. SerializerMethodFields must be given in
+    `method_fields` as {name: (extra_lookups, prepare)}, where
+    `prepare(rows, context)` returns a function mapping a row to the value.
+    """
+    def __init__(self, serializer_class, method_fields=None):
+        self.serializer_class = serializer_class
+        self.method_fields = method_fields or {}
+        self._plan = None
+
+    @property
+    def plan(self):
+        if self._plan is None:
+            self._plan = self._compile()
+        return self._plan
+
+    def _compile(self):
+        """[(name, kind, spec, guard, lookups)] for every readable field"""
+        model = self.serializer_class.Meta.model
+        plan = []
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                if name not in self.method_fields:
+                    raise ImproperlyConfigured(f'{self.serializer_class.__name__}.{name} needs a method_fields entry')
+                extra, prepare = self.method_fields[name]
+                plan.append((name, 'method', prepare, None, tuple(extra)))
+                continue
+            if field.source == '*' or isinstance(field, (serializers.ManyRelatedField, serializers.BaseSerializer)):
+                raise ImproperlyConfigured(f'{self.serializer_class.__name__}.{name} is not supported by ValuesSerializer')
+
+            parts = field.source_attrs
+            lookup = '__'.join(parts)
+            # DRF skips read-only dotted fields whose relation is NULL
+            guard = parts[0] if len(parts) > 1 else None
+            lookups = (lookup, guard) if guard else (lookup,)
+
+            if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+                plan.append((name, 'value', lookup, guard, lookups))
+            elif isinstance(field, serializers.FileField):
+                storage = _model_field(model, parts).storage
+                plan.append((name, 'file', (lookup, storage, field), guard, lookups))
+            else:
+                plan.append((name, 'convert', (lookup, field.to_representation), guard, lookups))
+        return plan
+
+    def fields_for(self, request=None):
+        """The plan entries selected by the request's ?fields= / ?omit="""
+        if request is None or not wants_sparse(request):
+            return self.plan
+        fields, omit = sparse_fields(request.GET)
+        return [
+            entry for entry in self.plan
+            if (fields is None or entry[0] in fields) and entry[0] not in omit
+        ]
+
+    def values(self, queryset, request=None):
+        """The queryset narrowed to the columns the serializer outputs"""
+        # dict as an ordered set
+        lookups = {lookup: None for entry in self.fields_for(request) for lookup in entry[4]}
+        return queryset.values(*lookups)
+
+    def to_representation(self, rows, context=None):
+        context = context or {}
+        rows = list(rows)
+        request = context.get('request')
+        accessors = []
+        for name, kind, spec, guard, _ in self.fields_for(request):
+            if kind == 'method':
+                accessors.append((name, spec(rows, context), guard))
+            elif kind == 'value':
+                accessors.append((name, _getter(spec), guard))
+            elif kind == 'file':
+                accessors.append((name, _file_getter(*spec, request), guard))
+            else:
+                accessors.append((name, _converter(*spec), guard))
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, accessor, guard in accessors:
+                if guard is None or row[guard] is not None:
+                    item[name] = accessor(row)
+            data.append(item)
+        return data
+
+
+def _getter(lookup):
+    return lambda row: row[lookup]
+
+
+def _converter(lookup, to_representation):
+    def convert(row):
+        value = row[lookup]
+        return None if value is None else to_representation(value)
+    return convert
+
+
+def _file_getter(lookup, storage, field, request):
+    # Same result as FileField.to_representation on the FieldFile
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+
+    def file_url(row):
+        name = row[lookup]
+        if not name:
+            return None
+        if not use_url:
+            return name
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return file_url
+
+
+def _model_field(model, parts):
+    for part in parts[:-1]:
+        model = model._meta.get_field(part).related_model
+    return model._meta.get_field(parts[-1])
+
+
+def wants_stream(request):
+    """?stream=true on a FastListMixin list, with JSON_STREAMING enabled"""
+    return settings.JSON_STREAMING['ENABLED'] and request.GET.get('stream') in ('1', 'true')
+
+
+def stream_json(serialize, queryset, chunk_size):
+    """Yield a JSON array of every row, serialized (by `serialize(rows)`) and rendered chunk by chunk"""
+    yield b'['
+    separator = b''
+    batch = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        batch.append(row)
+        if len(batch) == chunk_size:
+            yield separator + render_json(serialize(batch))[1:-1]
+            separator, batch = b',', []
+    if batch:
+        yield separator + render_json(serialize(batch))[1:-1]
+    yield b']'
+
+
+class FastListMixin:
+    """
+    Serve `list` through `fast_serializer` (a ValuesSerializer) instead of
+    instantiating the serializer per object. Honours the view's filtering
+    and pagination. Only used when FAST_SERIALIZERS is on (it is opt-in).
+
+    With `?stream=true` (and JSON_STREAMING enabled) the whole filtered list
+    is streamed as a plain JSON array instead of one page, through the fast
+    serializer when it is in use and the view's own serializer otherwise.
+    Views without a fast serializer can use the mixin just for that.
+    """
+    fast_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        fast = self.fast_serializer is not None and settings.FAST_SERIALIZERS
+        if wants_stream(request):
+            return self.stream_list(request, fast)
+        if not fast:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.fast_serializer.values(self.filter_queryset(self.get_queryset()), request)
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.fast_serializer.to_representation(page, context))
+        return Response(self.fast_serializer.to_representation(queryset, context))
+
+    def stream_list(self, request, fast):
+        queryset = self.filter_queryset(self.get_queryset())
+        if fast:
+            queryset = self.fast_serializer.values(queryset, request)
+            context = self.get_serializer_context()
+
+            def serialize(rows):
+                return self.fast_serializer.to_representation(rows, context)
+        else:
+            def serialize(rows):
+                return self.get_serializer(rows, many=True).data
+        return streaming_response(
+            request, stream_json(serialize, queryset, settings.JSON_STREAMING['CHUNK_SIZE']),
+            content_type='application/json',
+        )
@@ -0,0 +1,110 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+# OPTIONS is left out: its metadata describes the full writable serializer
+READ_METHODS = ('GET', 'HEAD')
+
+
+def sparse_fields(params):
+    """(fields, omit) from ?fields=a,b / ?omit=c; fields is None when not restricted"""
+    fields = params.get('fields')
+    omit = params.get('omit')
+    return (
+        {name.strip() for name in fields.split(',') if name.strip()} if fields is not None else None,
+        {name.strip() for name in omit.split(',') if name.strip()} if omit else set(),
+    )
+
+
+def is_selected(name, params):
+    fields, omit = sparse_fields(params)
+    return (fields is None or name in fields) and name not in omit
+
+
+def wants_sparse(request):
+    return request.method in READ_METHODS and ('fields' in request.GET or 'omit' in request.GET)
+
+
+class SparseFieldsetMixin:
+    """
+    Let GET clients pick output fields with ?fields=a,b or drop them with
+    ?omit=c. Unselected fields are removed before serialization, so their
+    SerializerMethodField queries never run. Only the top-level serializer
+    (the one given the request in its context) is narrowed.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self._context.get('request')
+        if request is not None and wants_sparse(request):
+            fields, omit = sparse_fields(request.GET)
+            for name in list(self.fields):
+                if (fields is not None and name not in fields) or name in omit:
+                    self.fields.pop(name)
+
+
+def narrow_queryset(queryset, serializer):
+    """
+    Restrict `queryset` with only()/select_related() to what `serializer`
+    (already narrowed by SparseFieldsetMixin) reads. Method fields declare
+    their model sources in Meta.method_field_sources, other fields reading
+    more than their source list the rest in an `extra_sources` attribute;
+    anything that can't be mapped to model fields leaves the queryset
+    unchanged. The view's own select_related() and prefetch_related() are
+    dropped: only() can't defer a relation that is being joined, and the
+    narrowed fields read nothing a prefetch would load.
+    """
+    model = queryset.model
+    method_sources = getattr(serializer.Meta, 'method_field_sources', {})
+    only, related = {model._meta.pk.name}, set()
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.SerializerMethodField):
+            if name not in method_sources:
+                return queryset
+            sources = method_sources[name]
+        elif field.source == '*' or isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField)):
+            return queryset
+        else:
+            sources = [field.source, *getattr(field, 'extra_sources', ())]
+
+        for source in sources:
+            parts = source.split('.')
+            if not _is_column_path(model, parts):
+                return queryset
+            for depth in range(1, len(parts)):
+                related.add('__'.join(parts[:depth]))
+                only.add('__'.join(parts[:depth]))
+            only.add('__'.join(parts))
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if related:
+        # select_related() without arguments would follow every foreign key
+        queryset = queryset.select_related(*related)
+    return queryset.only(*only)
+
+
+def _is_column_path(model, parts):
+    """True when `parts` follows forward relations to a concrete field"""
+    for index, part in enumerate(parts):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return False
+        if not field.concrete:
+            return False
+        if index < len(parts) - 1:
+            if not field.many_to_one and not field.one_to_one:
+                return False
+            model = field.related_model
+    return True
+
+
+class SparseQuerysetMixin:
+    """
+    View mixin: when the client asks for a sparse fieldset, narrow the
+    queryset's columns and joins to the fields being returned.
+    """
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if wants_sparse(self.request):
+            queryset = narrow_queryset(queryset, self.get_serializer())
+        return queryset
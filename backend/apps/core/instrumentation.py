@@ -0,0 +1,136 @@
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('apps.core.instrumentation')
+
+# Literals and IN-lists collapse so queries differing only in parameters share a shape
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+
+
+def query_shape(sql):
+    """Normalize SQL so repeated same-shape queries (N+1 patterns) compare equal"""
+    sql = _LITERALS.sub('?', sql)
+    sql = _IN_LISTS.sub('IN (...)', sql)
+    return sql.replace('%s', '?')
+
+
+class QueryRecorder:
+    """
+    Database execute_wrapper that counts, times and (optionally) groups queries by shape
+    """
+    def __init__(self, track_shapes=True):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter() if track_shapes else None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            if self.shapes is not None:
+                self.shapes[query_shape(sql)] += 1
+
+    def repeated_shapes(self, threshold):
+        if self.shapes is None:
+            return []
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+@contextmanager
+def record_queries(track_shapes=True):
+    """Record every query run on any configured database inside the block"""
+    recorder = QueryRecorder(track_shapes=track_shapes)
+    with _wrap_all(recorder):
+        yield recorder
+
+
+@contextmanager
+def _wrap_all(wrapper):
+    stack = [connections[alias].execute_wrapper(wrapper) for alias in connections]
+    for cm in stack:
+        cm.__enter__()
+    try:
+        yield
+    finally:
+        for cm in reversed(stack):
+            cm.__exit__(None, None, None)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Count and time SQL per request, emit a Server-Timing header, and log
+    requests that exceed the query/latency budget or repeat a query shape
+    (N+1). Sampled via SQL_INSTRUMENTATION['SAMPLE_RATE'] so it can stay on
+    in production.
+
+    Under ASGI only the total time is reported: async ORM calls from all
+    concurrent requests share one worker thread, so per-request query
+    counts can't be attributed there.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = settings.SQL_INSTRUMENTATION
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        return self.options['ENABLED'] and random.random() < self.options['SAMPLE_RATE']
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with record_queries(track_shapes=self.options['DETECT_N_PLUS_ONE']) as recorder:
+            response = self.get_response(request)
+        self._report(request, response, (time.perf_counter() - start) * 1000, recorder)
+        return response
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self._report(request, response, (time.perf_counter() - start) * 1000)
+        return response
+
+    def _report(self, request, response, total_ms, recorder=None):
+        options = self.options
+        if recorder is None:
+            response['Server-Timing'] = f'total;dur={total_ms:.1f}'
+            if total_ms > options['LATENCY_BUDGET_MS']:
+                logger.warning('%s %s over budget: %.1fms total', request.method, request.path, total_ms)
+            return
+
+        db_ms = recorder.duration * 1000
+        request.sql_queries = recorder.count
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries", '
+            f'app;dur={total_ms - db_ms:.1f}, total;dur={total_ms:.1f}'
+        )
+
+        if recorder.count > options['QUERY_BUDGET'] or total_ms > options['LATENCY_BUDGET_MS']:
+            logger.warning(
+                '%s %s over budget: %d queries, %.1fms db, %.1fms total',
+                request.method, request.path, recorder.count, db_ms, total_ms,
+            )
+        for shape, n in recorder.repeated_shapes(options['N_PLUS_ONE_THRESHOLD']):
+            logger.warning('%s %s possible N+1: %d x %s', request.method, request.path, n, shape)
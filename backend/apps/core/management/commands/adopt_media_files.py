@@ -0,0 +1,29 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.storage import ContentAddressedStorage, adopt
+
+
+class Command(BaseCommand):
+    help = (
+        'Move media files saved under their upload names into content-addressed storage, '
+        'sharing identical ones, and delete the originals. Safe to interrupt and re-run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows updated per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Count the files that would be moved')
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError('The default storage is not content-addressed')
+        stats = adopt(chunk_size=options['chunk_size'], dry_run=options['dry_run'], progress=self.report)
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"Would adopt up to {stats['adopted']} files"))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Adopted {stats['adopted']} files, removed {stats['removed']} originals, "
+            f"{stats['missing']} files were missing"
+        ))
+
+    def report(self, stats):
+        self.stdout.write(f"  {stats['adopted']} adopted")
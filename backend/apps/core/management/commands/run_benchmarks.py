@@ -0,0 +1,228 @@
+import json
+import random
+import subprocess
+import threading
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.core.instrumentation import record_queries
+from apps.core.write_queue import write_queue
+from apps.gallery.models import Design
+
+User = get_user_model()
+
+SEARCH_TERMS = ['floral', 'peacock', 'mandala', 'bridal', 'arabic', 'lotus']
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Scenario:
+    """A named endpoint call; `build(rng)` returns (method, path, data, role)"""
+    def __init__(self, name, build):
+        self.name = name
+        self.build = build
+
+
+class Command(BaseCommand):
+    help = 'Benchmark key endpoints in-process with concurrent clients and report latency percentiles as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per scenario')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--scenarios', default='', help='Comma-separated subset of scenario names')
+        parser.add_argument('--no-response-cache', action='store_true', help='Measure with the response cache disabled')
+        parser.add_argument('--write-queue', action='store_true', help='Batch view/reaction counters through the write-behind queue')
+        parser.add_argument('--fast-serializers', action='store_true', help='Serialize list endpoints from .values() rows (FAST_SERIALIZERS)')
+        parser.add_argument('--throttling', action='store_true', help='Keep request throttling on (off by default, the load would trip it)')
+        parser.add_argument('--output', default='', help='Write JSON results to this file (default: stdout)')
+
+    def handle(self, *args, **options):
+        if options['no_response_cache']:
+            settings.RESPONSE_CACHE['ENABLED'] = False
+        if options['write_queue']:
+            settings.WRITE_QUEUE['ENABLED'] = True
+        if options['fast_serializers']:
+            settings.FAST_SERIALIZERS = True
+        if not options['throttling']:
+            settings.THROTTLING['ENABLED'] = False
+
+        self.tokens = self.load_tokens()
+        self.design_ids = list(Design.objects.filter(status='approved').values_list('pk', flat=True)[:5000])
+        self.designer_ids = list(User.objects.filter(role='designer', is_approved=True).values_list('pk', flat=True)[:5000])
+        if not self.design_ids or not self.designer_ids:
+            raise CommandError('No approved designs/designers found; run seed_benchmark_data first')
+
+        scenarios = self.scenarios()
+        if options['scenarios']:
+            wanted = set(options['scenarios'].split(','))
+            unknown = wanted - {s.name for s in scenarios}
+            if unknown:
+                raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+            scenarios = [s for s in scenarios if s.name in wanted]
+
+        results = {
+            'commit': self.git_commit(),
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'sqlite_production': settings.SQLITE_PRODUCTION,
+            'concurrency': options['concurrency'],
+            'requests_per_scenario': options['requests'],
+            'response_cache': settings.RESPONSE_CACHE['ENABLED'],
+            'write_queue': settings.WRITE_QUEUE['ENABLED'],
+            'fast_serializers': settings.FAST_SERIALIZERS,
+            'throttling': settings.THROTTLING['ENABLED'],
+            'scenarios': {},
+        }
+        for scenario in scenarios:
+            self.stderr.write(f'Running {scenario.name}...')
+            results['scenarios'][scenario.name] = self.run_scenario(scenario, options)
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output)
+            self.stderr.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def load_tokens(self):
+        """One access token per role, for a few sample users"""
+        tokens = {}
+        samples = {
+            'customer': User.objects.filter(role='customer'),
+            'designer': User.objects.filter(role='designer', is_approved=True),
+            'admin': User.objects.filter(is_superuser=True) | User.objects.filter(role='admin'),
+        }
+        for role, queryset in samples.items():
+            tokens[role] = [str(RefreshToken.for_user(user).access_token) for user in queryset[:20]]
+        return tokens
+
+    def scenarios(self):
+        def booking(rng):
+            return 'post', '/api/bookings/', {
+                'designer': rng.choice(self.designer_ids),
+                'booking_date': (date.today() + timedelta(days=rng.randrange(1, 60))).isoformat(),
+                'booking_time': '10:00',
+                'event_type': 'Wedding',
+                'location': 'Benchmark Hall',
+            }, 'customer'
+
+        return [
+            Scenario('gallery_list', lambda rng: ('get', f'/api/gallery/designs/?page={rng.randrange(1, 20)}', None, None)),
+            Scenario('gallery_search', lambda rng: ('get', f'/api/gallery/designs/?search={rng.choice(SEARCH_TERMS)}', None, None)),
+            Scenario('trending', lambda rng: ('get', '/api/gallery/trending/', None, None)),
+            Scenario('design_detail', lambda rng: ('get', f'/api/gallery/designs/{rng.choice(self.design_ids)}/', None, None)),
+            Scenario('designer_list', lambda rng: ('get', '/api/users/designers/', None, None)),
+            Scenario('like_toggle', lambda rng: ('post', f'/api/gallery/designs/{rng.choice(self.design_ids)}/like/', {}, 'customer')),
+            Scenario('booking_create', booking),
+            Scenario('booking_list', lambda rng: ('get', '/api/bookings/', None, 'designer')),
+            Scenario('designer_dashboard', lambda rng: ('get', '/api/bookings/dashboard/stats/', None, 'designer')),
+            Scenario('admin_dashboard', lambda rng: ('get', '/api/admin-panel/dashboard/?refresh=1', None, 'admin')),
+        ]
+
+    def run_scenario(self, scenario, options):
+        rng = random.Random(f"{options['seed']}:{scenario.name}")
+        calls = []
+        for _ in range(options['warmup'] + options['requests']):
+            method, path, data, role = scenario.build(rng)
+            if role and not self.tokens.get(role):
+                return {'skipped': f'no {role} users'}
+            token = rng.choice(self.tokens[role]) if role else None
+            calls.append((method, path, data, token))
+        warmup, measured = calls[:options['warmup']], calls[options['warmup']:]
+        host = next((h for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        samples, statuses = [], {}
+        lock = threading.Lock()
+
+        def call(client, spec, record=True):
+            method, path, data, token = spec
+            headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+            start = time.perf_counter()
+            with record_queries(track_shapes=False) as recorder:
+                if method == 'get':
+                    response = client.get(path, **headers)
+                else:
+                    response = client.post(path, data, content_type='application/json', **headers)
+            elapsed = time.perf_counter() - start
+            if record:
+                with lock:
+                    samples.append((elapsed, recorder.count))
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        def worker(specs):
+            client = Client(HTTP_HOST=host, raise_request_exception=False)
+            try:
+                for spec in specs:
+                    call(client, spec)
+            finally:
+                # Each thread has its own DB connections
+                connections.close_all()
+
+        warmup_client = Client(HTTP_HOST=host)
+        for spec in warmup:
+            call(warmup_client, spec, record=False)
+
+        concurrency = options['concurrency']
+        threads = [
+            threading.Thread(target=worker, args=(measured[i::concurrency],))
+            for i in range(concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Queued counter writes are part of the work being measured
+        write_queue.flush()
+        wall = time.perf_counter() - started
+
+        return summarize(samples, statuses, wall)
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+
+def summarize(samples, statuses, wall):
+    """Scenario results from (seconds, query count) samples; nulls when nothing was measured"""
+    latencies = sorted(elapsed * 1000 for elapsed, _ in samples)
+    queries = [count for _, count in samples]
+    if not samples:
+        latency_ms = dict.fromkeys(('p50', 'p95', 'p99', 'max'))
+        queries_per_request = dict.fromkeys(('mean', 'max'))
+    else:
+        latency_ms = {
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'max': round(latencies[-1], 2),
+        }
+        queries_per_request = {
+            'mean': round(sum(queries) / len(queries), 1),
+            'max': max(queries),
+        }
+    return {
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / wall, 1) if wall > 0 else 0.0,
+        'latency_ms': latency_ms,
+        'queries_per_request': queries_per_request,
+        'status_codes': {str(code): n for code, n in sorted(statuses.items())},
+    }
@@ -0,0 +1,267 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from apps.gallery.models import Category, Design, Like, Favorite, Review
+from apps.bookings.models import Booking, Notification
+from apps.admin_panel.stats import reconcile
+
+User = get_user_model()
+
+PREFIX = 'bench'
+CATEGORIES = ['Bridal', 'Traditional', 'Arabic', 'Modern', 'Indo-Western', 'Festival', 'Minimal', 'Kids']
+WORDS = [
+    'floral', 'peacock', 'paisley', 'mandala', 'lotus', 'vine', 'jaal', 'bridal', 'arabic',
+    'minimal', 'finger', 'palm', 'feet', 'geometric', 'royal', 'leafy', 'dotted', 'bold',
+]
+EVENTS = ['Wedding', 'Engagement', 'Eid', 'Karwa Chauth', 'Diwali', 'Teej', 'Party']
+BOOKING_STATUSES = ['pending', 'confirmed', 'completed', 'cancelled']
+BOOKING_WEIGHTS = [2, 2, 5, 1]
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep the generated created_at/updated_at values"""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic large dataset for benchmarks (bulk inserts, no signals)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--designers', type=int, default=500)
+        parser.add_argument('--customers', type=int, default=5000)
+        parser.add_argument('--designs', type=int, default=10000)
+        parser.add_argument('--likes', type=int, default=200000)
+        parser.add_argument('--favorites', type=int, default=50000)
+        parser.add_argument('--bookings', type=int, default=20000)
+        parser.add_argument('--reviews', type=int, default=5000)
+        parser.add_argument('--notifications', type=int, default=20000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--end-date', default='2025-10-01', help='Latest generated timestamp (YYYY-MM-DD)')
+        parser.add_argument('--days', type=int, default=365, help='Spread timestamps over this many days')
+        parser.add_argument('--flush', action='store_true', help='Delete previously seeded benchmark data first')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.end = datetime.strptime(options['end_date'], '%Y-%m-%d').replace(tzinfo=dt_timezone.utc)
+        self.span = options['days'] * 86400
+
+        if options['flush']:
+            self.log('Flushing previous benchmark data')
+            User.objects.filter(username__startswith=f'{PREFIX}_').delete()
+        elif User.objects.filter(username__startswith=f'{PREFIX}_').exists():
+            raise CommandError('Benchmark data already present; pass --flush to regenerate it')
+
+        started = time.perf_counter()
+        with explicit_timestamps(User, Design, Like, Favorite, Review, Booking, Notification):
+            categories = self.seed_categories()
+            designer_ids = self.seed_users('designer', options['designers'])
+            customer_ids = self.seed_users('customer', options['customers'])
+            design_ids = self.seed_designs(options['designs'], designer_ids, categories)
+            self.seed_pairs(Like, options['likes'], customer_ids, design_ids, reaction=True)
+            self.seed_pairs(Favorite, options['favorites'], customer_ids, design_ids)
+            self.seed_reviews(options['reviews'], customer_ids, designer_ids)
+            booking_ids = self.seed_bookings(options['bookings'], customer_ids, designer_ids)
+            self.seed_notifications(options['notifications'], customer_ids + designer_ids, booking_ids)
+
+        self.log('Recomputing design reaction counters')
+        self.refresh_design_counters(design_ids)
+        reconcile()
+        self.log(f'Done in {time.perf_counter() - started:.1f}s', success=True)
+
+    # Helpers
+
+    def log(self, message, success=False):
+        self.stdout.write(self.style.SUCCESS(message) if success else message)
+
+    def timestamp(self):
+        return self.end - timedelta(seconds=self.rng.randrange(self.span))
+
+    def insert(self, model, rows, total):
+        """bulk_create `rows` (a generator) in batches, returning the new primary keys"""
+        ids = []
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                ids.extend(self._flush(model, batch))
+                batch = []
+                self.stdout.write(f'\r  {model.__name__}: {len(ids)}/{total}', ending='')
+        if batch:
+            ids.extend(self._flush(model, batch))
+        self.stdout.write(f'\r  {model.__name__}: {len(ids)}/{total}')
+        return ids
+
+    def _flush(self, model, batch):
+        with transaction.atomic():
+            created = model.objects.bulk_create(batch)
+        if created and created[0].pk is None:
+            # Backends that don't return ids from bulk inserts
+            last = model.objects.order_by('-pk').values_list('pk', flat=True)[:len(created)]
+            return sorted(last)
+        return [obj.pk for obj in created]
+
+    # Generators
+
+    def seed_categories(self):
+        categories = []
+        for name in CATEGORIES:
+            category, _ = Category.objects.get_or_create(name=name, defaults={'slug': name.lower()})
+            categories.append(category.pk)
+        return categories
+
+    def seed_users(self, role, count):
+        password = make_password(PREFIX, salt=f'{PREFIX}salt')
+        rng = self.rng
+
+        def rows():
+            for i in range(count):
+                created = self.timestamp()
+                yield User(
+                    username=f'{PREFIX}_{role}_{i}',
+                    email=f'{PREFIX}_{role}_{i}@example.com',
+                    password=password,
+                    first_name=rng.choice(WORDS).title(),
+                    last_name=f'{role.title()}{i}',
+                    role=role,
+                    is_approved=role == 'designer' and rng.random() < 0.95,
+                    years_of_experience=rng.randrange(15) if role == 'designer' else 0,
+                    specialization=', '.join(rng.sample(CATEGORIES, 2)) if role == 'designer' else None,
+                    location=f'City {rng.randrange(100)}',
+                    average_rating=Decimal(rng.randrange(250, 501)) / 100 if role == 'designer' else 0,
+                    date_joined=created,
+                    created_at=created,
+                    updated_at=created,
+                )
+        return self.insert(User, rows(), count)
+
+    def seed_designs(self, count, designer_ids, categories):
+        rng = self.rng
+
+        def rows():
+            for i in range(count):
+                created = self.timestamp()
+                tags = rng.sample(WORDS, 3)
+                yield Design(
+                    designer_id=rng.choice(designer_ids),
+                    title=f'{tags[0].title()} {tags[1]} design {i}',
+                    description=f'A {" ".join(tags)} mehndi design.',
+                    image=f'designs/{PREFIX}_{i % 1000}.jpg',
+                    category_id=rng.choice(categories),
+                    status=rng.choices(['approved', 'pending', 'rejected'], [90, 8, 2])[0],
+                    views_count=rng.randrange(5000),
+                    tags=', '.join(tags),
+                    created_at=created,
+                    updated_at=created,
+                )
+        return self.insert(Design, rows(), count)
+
+    def seed_pairs(self, model, count, user_ids, design_ids, reaction=False):
+        """Unique (user, design) rows: each user gets a distinct sample of designs"""
+        rng = self.rng
+        per_user, extra = divmod(count, len(user_ids))
+        per_user = min(per_user, len(design_ids))
+
+        def rows():
+            for n, user_id in enumerate(user_ids):
+                k = min(per_user + (n < extra), len(design_ids))
+                for design_id in rng.sample(design_ids, k):
+                    row = model(user_id=user_id, design_id=design_id, created_at=self.timestamp())
+                    if reaction:
+                        row.reaction_type = 'like' if rng.random() < 0.9 else 'dislike'
+                    yield row
+        return self.insert(model, rows(), count)
+
+    def seed_reviews(self, count, customer_ids, designer_ids):
+        rng = self.rng
+        count = min(count, len(customer_ids) * len(designer_ids))
+
+        def rows():
+            seen = set()
+            while len(seen) < count:
+                pair = (rng.choice(customer_ids), rng.choice(designer_ids))
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                created = self.timestamp()
+                yield Review(
+                    customer_id=pair[0],
+                    designer_id=pair[1],
+                    rating=rng.randrange(1, 6),
+                    comment=f'{rng.choice(WORDS).title()} work, would book again.',
+                    is_reported=rng.random() < 0.01,
+                    created_at=created,
+                    updated_at=created,
+                )
+        return self.insert(Review, rows(), count)
+
+    def seed_bookings(self, count, customer_ids, designer_ids):
+        rng = self.rng
+
+        def rows():
+            for _ in range(count):
+                created = self.timestamp()
+                yield Booking(
+                    customer_id=rng.choice(customer_ids),
+                    designer_id=rng.choice(designer_ids),
+                    booking_date=(created + timedelta(days=rng.randrange(1, 90))).date(),
+                    booking_time=f'{rng.randrange(8, 20):02d}:00',
+                    event_type=rng.choice(EVENTS),
+                    location=f'City {rng.randrange(100)}',
+                    status=rng.choices(BOOKING_STATUSES, BOOKING_WEIGHTS)[0],
+                    estimated_price=Decimal(rng.randrange(20, 500)),
+                    created_at=created,
+                    updated_at=created,
+                )
+        return self.insert(Booking, rows(), count)
+
+    def seed_notifications(self, count, user_ids, booking_ids):
+        rng = self.rng
+
+        def rows():
+            for _ in range(count):
+                yield Notification(
+                    user_id=rng.choice(user_ids),
+                    notification_type='booking_created',
+                    title='New Booking Request',
+                    message='You have a new booking request',
+                    booking_id=rng.choice(booking_ids) if booking_ids else None,
+                    is_read=rng.random() < 0.6,
+                    created_at=self.timestamp(),
+                )
+        return self.insert(Notification, rows(), count)
+
+    def refresh_design_counters(self, design_ids):
+        """Set likes/dislikes counters from the Like rows, one UPDATE per id chunk"""
+        def reactions(kind):
+            counts = Like.objects.filter(design=OuterRef('pk'), reaction_type=kind).order_by().values(
+                'design'
+            ).annotate(n=Count('id')).values('n')
+            return Coalesce(Subquery(counts), Value(0))
+
+        for start in range(0, len(design_ids), self.batch_size):
+            chunk = design_ids[start:start + self.batch_size]
+            Design.objects.filter(pk__in=chunk).update(
+                likes_count=reactions('like'), dislikes_count=reactions('dislike')
+            )
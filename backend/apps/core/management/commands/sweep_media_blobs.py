@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.storage import ContentAddressedStorage, sweep
+
+
+class Command(BaseCommand):
+    help = (
+        'Recount references to content-addressed media files and delete the ones no row uses '
+        '(run periodically, e.g. daily via cron). Works through the blobs in chunks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=24, help='Keep unused blobs touched more recently than this')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Blobs checked per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without changing it')
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError('The default storage is not content-addressed')
+        stats = sweep(
+            timedelta(hours=options['grace_hours']), chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'], progress=self.report,
+        )
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {stats['checked']} blobs, corrected {stats['corrected']} reference counts. "
+            f"{verb} {stats['deleted']} unused blobs ({stats['freed'] / 1048576:.1f}MB)"
+        ))
+
+    def report(self, stats):
+        self.stdout.write(f"  {stats['checked']} checked, {stats['deleted']} unused")
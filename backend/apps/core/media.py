@@ -0,0 +1,199 @@
+"""
+Serving MEDIA_ROOT files in production. Access rules are registered per
+name prefix by the apps owning the files; the transfer itself is handed
+to the front server (X-Accel-Redirect/X-Sendfile) when MEDIA_SERVING
+['ACCEL'] is set, and otherwise streamed from here with single-range
+support. ETags use nginx's format, so they don't change when delegation
+is switched on or off.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .streaming import streaming_response
+
+PUBLIC = 'public'
+PRIVATE = 'private'
+
+# A name containing a content hash never changes contents
+HASHED_NAME = re.compile(r'(?:^|[._-])[0-9a-f]{16,64}(?:[._-]|$)')
+BYTE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+_access_checks = []
+_signer = signing.Signer(salt='apps.core.media')
+
+
+def register_access_check(prefix, check):
+    """
+    Let `check(request, name)` decide who may fetch media under `prefix`.
+    It returns PUBLIC, PRIVATE (this requester only, kept out of shared
+    caches) or None for a 404. Files under no registered prefix are public.
+    """
+    _access_checks.append((prefix, check))
+
+
+def signed_url(name):
+    """URL of media `name` that works without credentials until it expires"""
+    window = settings.MEDIA_SERVING['SIGNED_URL_MAX_AGE']
+    # Rounded up, so the URL (and the browser's cached copy) is stable for a window
+    expires = (int(time.time()) // window + 2) * window
+    signature = _signer.signature(f'{name}:{expires}')
+    return f'{default_storage.url(name)}?expires={expires}&signature={signature}'
+
+
+def has_valid_signature(request, name):
+    try:
+        expires = int(request.GET['expires'])
+    except (KeyError, ValueError):
+        return False
+    return expires > time.time() and constant_time_compare(
+        _signer.signature(f'{name}:{expires}'), request.GET.get('signature', '')
+    )
+
+
+def request_user(request):
+    """The session user, else the user of a valid JWT access token, else None"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def _access(request, name):
+    for prefix, check in _access_checks:
+        if name.startswith(prefix):
+            return check(request, name)
+    return PUBLIC
+
+
+def _byte_range(request, size, etag, last_modified):
+    """
+    (start, end) of a satisfiable single Range, None to send the whole file
+    (no Range, a stale If-Range, or several ranges), False if unsatisfiable.
+    """
+    header = request.META.get('HTTP_RANGE', '').strip()
+    match = BYTE_RANGE.match(header)
+    if not match or match.groups() == ('', ''):
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range != etag and parse_http_date_safe(if_range) != last_modified:
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+        if start >= size:
+            return False
+        return start, end
+    suffix = int(last)
+    if suffix == 0 or size == 0:
+        return False
+    return max(0, size - suffix), size - 1
+
+
+def _read(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            data = f.read(min(CHUNK_SIZE, length))
+            if not data:
+                return
+            length -= len(data)
+            yield data
+
+
+def _file_response(request, name, path, size, etag, last_modified):
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    accel = settings.MEDIA_SERVING['ACCEL']
+    if accel == 'x-accel-redirect':
+        # nginx sends the file and handles Range itself
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_SERVING['ACCEL_PREFIX'] + quote(name)
+        return response
+    if accel == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        return response
+
+    byte_range = _byte_range(request, size, etag, last_modified)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+    elif byte_range is None and not isinstance(request, ASGIRequest):
+        # The WSGI server's file wrapper can use sendfile()
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    else:
+        response = streaming_response(request, _read(path, start, length), content_type=content_type)
+    if byte_range:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = length
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """GET/HEAD of a file under MEDIA_ROOT, subject to registered access checks"""
+    name = posixpath.normpath(path).lstrip('/')
+    # Unknown and forbidden files look the same; dot files are storage temporaries
+    access = None if any(part.startswith('.') for part in name.split('/')) else _access(request, name)
+    if access is None:
+        raise Http404('File not found')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+        info = os.stat(full_path)
+    except (SuspiciousFileOperation, FileNotFoundError, NotADirectoryError):
+        raise Http404('File not found')
+    if not stat.S_ISREG(info.st_mode):
+        raise Http404('File not found')
+
+    last_modified = int(info.st_mtime)
+    etag = quote_etag(f'{last_modified:x}-{info.st_size:x}')
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _file_response(request, name, full_path, info.st_size, etag, last_modified)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if access == PRIVATE:
+        response['Cache-Control'] = f"private, max-age={settings.MEDIA_SERVING['SIGNED_URL_MAX_AGE']}"
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+    elif HASHED_NAME.search(posixpath.basename(name)):
+        response['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        response['Cache-Control'] = f"public, max-age={settings.MEDIA_SERVING['MAX_AGE']}"
+    return response
@@ -0,0 +1,206 @@
+import fcntl
+import ipaddress
+import os
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from .instrumentation import record_queries
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+    from prometheus_client.mmap_dict import MmapedDict
+except ImportError:  # pragma: no cover - optional
+    prometheus_client = None
+
+# Sample files summed across processes, which a dead worker's can be folded into
+ARCHIVED_TYPES = ('counter', 'histogram', 'summary')
+
+# Metrics are written to mmap files under PROMETHEUS_MULTIPROC_DIR when it is
+# set (gunicorn.conf.py does), so every worker's samples add up on /metrics
+if prometheus_client is not None:
+    from prometheus_client import Counter, Gauge, Histogram
+
+    REQUEST_LATENCY = Histogram(
+        'http_request_duration_seconds', 'Request latency by view',
+        ['view', 'method'],
+    )
+    RESPONSES = Counter(
+        'http_responses_total', 'Responses by view and status code',
+        ['view', 'method', 'status'],
+    )
+    DB_QUERIES = Histogram(
+        'db_queries_per_request', 'SQL queries run per request',
+        ['view'], buckets=(0, 1, 2, 3, 5, 8, 13, 20, 50, 100, float('inf')),
+    )
+    DB_TIME = Histogram(
+        'db_query_duration_seconds', 'Total SQL time per request',
+        ['view'], buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, float('inf')),
+    )
+    CACHE_LOOKUPS = Counter(
+        'cache_lookups_total', 'Cache lookups by cache and result (hit/miss)',
+        ['cache', 'result'],
+    )
+    THROTTLE_REJECTIONS = Counter(
+        'throttle_rejections_total', 'Requests rejected by throttling',
+        ['scope', 'kind'],
+    )
+    QUEUE_DEPTH = Gauge(
+        'background_queue_depth', 'Items waiting in a background queue',
+        ['queue'], multiprocess_mode='livesum',
+    )
+
+
+def cache_lookup(cache, hit):
+    if prometheus_client is not None:
+        CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def throttle_rejected(scope, kind):
+    if prometheus_client is not None:
+        THROTTLE_REJECTIONS.labels(scope, kind).inc()
+
+
+def queue_depth(queue, depth):
+    if prometheus_client is not None:
+        QUEUE_DEPTH.labels(queue).set(depth)
+
+
+def view_label(request):
+    """URL name (or route) of the matched view; bounded, unlike raw paths"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status and (under WSGI) SQL query count/time for every
+    request, labelled by view name. Costs two perf_counter calls, a
+    counting execute_wrapper and a few mmap writes per request.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if prometheus_client is None or not settings.METRICS['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.path == settings.METRICS['PATH']:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with record_queries(track_shapes=False) as recorder:
+            response = self.get_response(request)
+        view = self._observe(request, response, time.perf_counter() - start)
+        DB_QUERIES.labels(view).observe(recorder.count)
+        DB_TIME.labels(view).observe(recorder.duration)
+        return response
+
+    async def __acall__(self, request):
+        # Async ORM calls from all requests share one thread, so queries
+        # can't be attributed per request here
+        if request.path == settings.METRICS['PATH']:
+            return await self.get_response(request)
+
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, time.perf_counter() - start)
+        return response
+
+    def _observe(self, request, response, seconds):
+        view = view_label(request)
+        REQUEST_LATENCY.labels(view, request.method).observe(seconds)
+        RESPONSES.labels(view, request.method, str(response.status_code)).inc()
+        return view
+
+
+def _allowed(request):
+    """
+    With METRICS['TOKEN'] set, only `Authorization: Bearer <token>` gets
+    in. Otherwise the client address must be in ALLOWED_NETWORKS, and
+    requests relayed by a proxy never qualify: behind nginx every public
+    request arrives from the proxy's own (private or loopback) address.
+    """
+    token = settings.METRICS['TOKEN']
+    if token:
+        return constant_time_compare(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}')
+    if 'HTTP_X_FORWARDED_FOR' in request.META or 'HTTP_X_REAL_IP' in request.META:
+        return False
+    networks = settings.METRICS['ALLOWED_NETWORKS']
+    if not networks:
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network) for network in networks)
+
+
+def metrics_view(request):
+    """Prometheus text exposition, aggregated over all worker processes"""
+    if prometheus_client is None or not settings.METRICS['ENABLED']:
+        return HttpResponse('Metrics are disabled', status=404, content_type='text/plain')
+    if not _allowed(request):
+        return HttpResponseForbidden('Forbidden', content_type='text/plain')
+
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not directory:
+        return HttpResponse(
+            prometheus_client.generate_latest(prometheus_client.REGISTRY),
+            content_type=prometheus_client.CONTENT_TYPE_LATEST,
+        )
+    registry = prometheus_client.CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    # The collector lists the files, then reads them: keep archiving out of the way
+    with _directory_lock(directory, fcntl.LOCK_SH):
+        output = prometheus_client.generate_latest(registry)
+    return HttpResponse(output, content_type=prometheus_client.CONTENT_TYPE_LATEST)
+
+
+@contextmanager
+def _directory_lock(directory, operation):
+    with open(os.path.join(directory, '.lock'), 'a') as lock:
+        fcntl.flock(lock, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def archive_dead_process(pid):
+    """
+    Fold a dead worker's counter, histogram and summary samples into one
+    <type>_archive.db file per type, and delete its files. Without this
+    every recycled worker leaves files behind that each scrape reads.
+    Called from gunicorn's child_exit (after mark_process_dead).
+    """
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if prometheus_client is None or not directory:
+        return
+    with _directory_lock(directory, fcntl.LOCK_EX):
+        for kind in ARCHIVED_TYPES:
+            path = os.path.join(directory, f'{kind}_{pid}.db')
+            if not os.path.exists(path):
+                continue
+            archive = MmapedDict(os.path.join(directory, f'{kind}_archive.db'))
+            try:
+                for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(path):
+                    total, _ = archive.read_value(key)
+                    archive.write_value(key, total + value, timestamp)
+            finally:
+                archive.close()
+            os.remove(path)
@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class StoredBlob(models.Model):
+    """
+    One file in content-addressed storage (apps.core.storage) and how many
+    rows use it. `references` is kept up to date on save and delete and
+    corrected by sweep_media_blobs, which also removes unused blobs; -1
+    marks a blob the sweeper is deleting.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField()
+    references = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} ({self.references} references)"
@@ -0,0 +1,48 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for very large tables that avoids an exact COUNT(*).
+
+    Unfiltered querysets use the database's own row estimate (pg_class on
+    PostgreSQL, MAX(rowid) on SQLite). Filtered querysets are counted
+    exactly, but only up to `count_limit` rows, so deep pages of a filtered
+    list are reachable through ordering rather than page number.
+    """
+    # Below this estimate an exact count is cheap enough
+    exact_count_threshold = 10000
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return super().count
+
+        if not queryset.query.where:
+            estimate = self._estimated_table_count(queryset)
+            if estimate is not None and estimate >= self.exact_count_threshold:
+                return estimate
+            return queryset.count()
+
+        return queryset[:self.count_limit].count()
+
+    def _estimated_table_count(self, queryset):
+        connection = connections[queryset.db]
+        table = queryset.model._meta.db_table
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+            elif connection.vendor == 'sqlite':
+                # Tables here are append-mostly, so the highest rowid tracks the row count
+                cursor.execute(f'SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}')
+            else:
+                return None
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been analyzed
+        if not row or row[0] is None or row[0] < 0:
+            return None
+        return int(row[0])
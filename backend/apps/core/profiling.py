@@ -0,0 +1,240 @@
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .metrics import view_label
+
+PROFILE_ID = re.compile(r'^\d{13}-\d+-\d+$')
+DATA_SUFFIX = '.speedscope.json'
+META_SUFFIX = '.meta.json'
+
+_sequence = itertools.count()
+
+
+class StackSampler:
+    """
+    Sample one thread's Python stack every `interval` seconds from a
+    background thread. Frames from `root` outward (the server and outer
+    middleware) are left out. Consecutive identical stacks are merged, so
+    `samples` is a timeline of [stack, seconds].
+    """
+    def __init__(self, thread_id, root, interval):
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval
+        self.frames = {}
+        self.samples = []
+        self.count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                self.count += 1
+                self._record(frame, now - last)
+            last = now
+
+    def _record(self, frame, seconds):
+        stack = []
+        while frame is not None and frame is not self.root:
+            code = frame.f_code
+            key = (code.co_name, _short_path(code.co_filename), code.co_firstlineno)
+            index = self.frames.get(key)
+            if index is None:
+                index = self.frames[key] = len(self.frames)
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+        if self.samples and self.samples[-1][0] == stack:
+            self.samples[-1][1] += seconds
+        else:
+            self.samples.append([stack, seconds])
+
+
+def _short_path(filename):
+    base = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base):
+        return filename[len(base):]
+    return filename.rpartition('site-packages' + os.sep)[2]
+
+
+def to_speedscope(sampler, name, duration_ms):
+    """Speedscope 'sampled' profile JSON (https://www.speedscope.app)"""
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name,
+        'exporter': 'mehndi-magic',
+        'activeProfileIndex': 0,
+        'shared': {
+            'frames': [{'name': n, 'file': f, 'line': line} for n, f, line in sampler.frames],
+        },
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'milliseconds',
+            'startValue': 0,
+            'endValue': duration_ms,
+            'samples': [stack for stack, _ in sampler.samples],
+            'weights': [round(seconds * 1000, 3) for _, seconds in sampler.samples],
+        }],
+    }
+
+
+def to_collapsed(profile):
+    """Brendan Gregg's collapsed stacks ('a;b;c <microseconds>' per line), for flamegraph.pl"""
+    frames = [f"{frame['name']} ({frame['file']}:{frame['line']})" for frame in profile['shared']['frames']]
+    totals = Counter()
+    for data in profile['profiles']:
+        for stack, weight in zip(data['samples'], data['weights']):
+            totals[';'.join(frames[index] for index in stack) or '<idle>'] += weight
+    return ''.join(f'{stack} {max(1, round(ms * 1000))}\n' for stack, ms in totals.most_common())
+
+
+def save_profile(profile, meta):
+    """Write a profile and its metadata, then trim the directory to MAX_PROFILES"""
+    options = settings.PROFILING
+    directory = options['DIRECTORY']
+    os.makedirs(directory, exist_ok=True)
+    profile_id = f'{int(time.time() * 1000):013d}-{os.getpid()}-{next(_sequence)}'
+    meta = dict(meta, id=profile_id)
+    # Data first, so a listed profile can always be downloaded
+    for suffix, content in ((DATA_SUFFIX, profile), (META_SUFFIX, meta)):
+        path = os.path.join(directory, profile_id + suffix)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(content, f, separators=(',', ':'))
+        os.replace(path + '.tmp', path)
+    _prune(directory, options['MAX_PROFILES'])
+    return profile_id
+
+
+def _prune(directory, keep):
+    # Ids start with a millisecond timestamp, so name order is age order
+    ids = sorted(name[:-len(META_SUFFIX)] for name in os.listdir(directory) if name.endswith(META_SUFFIX))
+    for profile_id in ids[:-keep] if keep else ids:
+        for suffix in (META_SUFFIX, DATA_SUFFIX):
+            try:
+                os.remove(os.path.join(directory, profile_id + suffix))
+            except FileNotFoundError:
+                # Another worker pruned it first
+                pass
+
+
+def list_profiles(view=None):
+    """Metadata of the stored profiles, newest first, optionally for one view"""
+    directory = settings.PROFILING['DIRECTORY']
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith(META_SUFFIX):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            continue
+        if view is None or meta['view'] == view:
+            profiles.append(meta)
+    return profiles
+
+
+def profile_path(profile_id):
+    """Path of a stored profile's speedscope JSON, or None"""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(settings.PROFILING['DIRECTORY'], profile_id + DATA_SUFFIX)
+    return path if os.path.exists(path) else None
+
+
+def _admin_requested(request):
+    """The profiling header was sent with an admin's access token"""
+    if not request.META.get(settings.PROFILING['HEADER']):
+        return False
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    if result is None:
+        return False
+    user = result[0]
+    return user.role == 'admin' or user.is_superuser
+
+
+class ProfilingMiddleware:
+    """
+    Stack-sample a fraction of requests (PROFILING['SAMPLE_RATE']) and any
+    request an admin sends with the PROFILING['HEADER'] header, storing
+    each as a speedscope profile in a bounded directory (see
+    /api/admin-panel/profiles/). Off unless PROFILING['ENABLED'].
+
+    Under ASGI requests share the event loop thread, so their stacks can't
+    be told apart; requests pass through unprofiled there.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = settings.PROFILING
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.options['ENABLED']:
+            return self.get_response(request)
+        if _admin_requested(request):
+            trigger = 'header'
+        elif random.random() < self.options['SAMPLE_RATE']:
+            trigger = 'sample'
+        else:
+            return self.get_response(request)
+
+        sampler = StackSampler(threading.get_ident(), sys._getframe(), self.options['INTERVAL'])
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        duration_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        name = f'{request.method} {request.path}'
+        save_profile(to_speedscope(sampler, name, duration_ms), {
+            'method': request.method,
+            'path': request.path,
+            'view': view_label(request),
+            'status': response.status_code,
+            'duration_ms': duration_ms,
+            'samples': sampler.count,
+            'trigger': trigger,
+            'created': timezone.now().isoformat(),
+        })
+        return response
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
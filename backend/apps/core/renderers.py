@@ -0,0 +1,43 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+if orjson is not None:
+    # Dates and times go through DRF's encoder so they render exactly as
+    # before ('Z' suffix for UTC, no orjson-specific formatting)
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    _default = JSONEncoder().default
+
+
+def render_json(data):
+    """Compact UTF-8 JSON bytes, identical to DRF's JSONRenderer output"""
+    if orjson is None:
+        return FastJSONRenderer.stdlib.render(data)
+    content = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    # Keep output a strict JavaScript subset, like DRF
+    if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+        content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return content
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson when it is installed. Decimals, datetimes
+    and other non-native types are encoded by DRF's JSONEncoder, so only the
+    speed changes. Indented output (browsable API, `; indent=N`) and
+    installs without orjson use the stdlib renderer.
+    """
+    stdlib = JSONRenderer()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or not self.compact or self.ensure_ascii or (
+            self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        return render_json(data)
@@ -0,0 +1,161 @@
+import asyncio
+import functools
+import hashlib
+import time
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+from .db_router import primary_reads
+from .fast_serializers import wants_stream
+from .metrics import cache_lookup
+
+TAG_PREFIX = 'resp-tag:'
+KEY_PREFIX = 'resp:'
+
+
+def _cache():
+    return caches[settings.RESPONSE_CACHE['ALIAS']]
+
+
+def _new_version():
+    return uuid.uuid4().hex[:12]
+
+
+def tag_versions(tags):
+    """Current version of each tag; unknown tags get a fresh version"""
+    cache = _cache()
+    keys = [TAG_PREFIX + tag for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate_tags(*tags):
+    """Bump the version of each tag, orphaning every cached response that carried it"""
+    if tags:
+        _cache().set_many({TAG_PREFIX + tag: _new_version() for tag in tags}, None)
+
+
+def invalidate_tags_on_commit(*tags):
+    """
+    invalidate_tags() once the current transaction commits (right away
+    outside one). Invalidating earlier lets a concurrent reader re-cache
+    the old rows under the new tag versions, until the TTL.
+    """
+    transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def is_cacheable(request):
+    # Viewer-specific fields (is_liked, own pending designs...) only differ for signed-in users.
+    # Streamed lists have no response data to store.
+    return request.method == 'GET' and not request.user.is_authenticated and not wants_stream(request)
+
+
+def normalized_query(request):
+    """Query string with parameters sorted and empty values dropped"""
+    return urlencode(sorted((k, v) for k, values in request.GET.lists() for v in values if v != ''))
+
+
+def cache_key(request, tags):
+    """Key from the normalized URL (sorted query string) and the current tag versions"""
+    raw = '|'.join([request.build_absolute_uri(request.path), normalized_query(request), *tag_versions(tags)])
+    return KEY_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def get_or_build(key, build):
+    """
+    Return the cached (status, data) for `key`, building it on a miss.
+
+    Only one caller per key rebuilds at a time: the others wait briefly for
+    the winner's result instead of stampeding the database. Builds read from
+    the primary: a lagging replica's rows would be served until the TTL.
+    """
+    cache = _cache()
+    options = settings.RESPONSE_CACHE
+    cached = cache.get(key)
+    if cached is not None:
+        cache_lookup('responses', True)
+        return cached
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, True, options['LOCK_TIMEOUT']):
+        deadline = time.monotonic() + options['WAIT_TIMEOUT']
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            cached = cache.get(key)
+            if cached is not None:
+                cache_lookup('responses', True)
+                return cached
+        # The winner is slow or died; build it ourselves rather than fail
+
+    cache_lookup('responses', False)
+    try:
+        with primary_reads():
+            result = build()
+        if result[0] == 200:
+            cache.set(key, result, options['TIMEOUT'])
+        return result
+    finally:
+        cache.delete(lock_key)
+
+
+def cached_response(tags):
+    """
+    Cache an anonymous GET view's serialized response data.
+
+    `tags` is a list of tag names or a callable taking the view kwargs and
+    returning one. Works on DRF view methods and @api_view functions.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = args[0] if hasattr(args[0], 'query_params') else args[1]
+            if not settings.RESPONSE_CACHE['ENABLED'] or not is_cacheable(request):
+                return view(*args, **kwargs)
+
+            def build():
+                response = view(*args, **kwargs)
+                return response.status_code, response.data
+
+            view_tags = tags(**kwargs) if callable(tags) else tags
+            status_code, data = get_or_build(cache_key(request, view_tags), build)
+            return Response(data, status=status_code)
+        return wrapper
+    return decorator
+
+
+async def aget_or_build(key, build):
+    """Async counterpart of get_or_build; `build` is a coroutine function"""
+    cache = _cache()
+    options = settings.RESPONSE_CACHE
+    cached = await cache.aget(key)
+    if cached is not None:
+        cache_lookup('responses', True)
+        return cached
+
+    lock_key = f'{key}:lock'
+    if not await cache.aadd(lock_key, True, options['LOCK_TIMEOUT']):
+        deadline = time.monotonic() + options['WAIT_TIMEOUT']
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            cached = await cache.aget(key)
+            if cached is not None:
+                cache_lookup('responses', True)
+                return cached
+
+    cache_lookup('responses', False)
+    try:
+        with primary_reads():
+            result = await build()
+        if result[0] == 200:
+            await cache.aset(key, result, options['TIMEOUT'])
+        return result
+    finally:
+        await cache.adelete(lock_key)
@@ -0,0 +1,247 @@
+"""
+Content-addressed file storage. Every saved file is hashed while it is
+streamed to disk and stored once, as <upload_to>/<ab>/<sha256><ext>, so
+the same image uploaded twice takes the space of one and its URL can be
+cached forever. StoredBlob rows count the references to each blob;
+delete() only releases one, and sweep() removes blobs nothing uses.
+
+Files saved before this storage (any other name) are served as usual;
+adopt() moves them in.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import StoredBlob
+
+BLOB_NAME = re.compile(r'^(?:.+/)?[0-9a-f]{2}/[0-9a-f]{64}(?:\.[a-z0-9]{1,10})?$')
+CHUNK_SIZE = 256 * 1024
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files by content and shares identical ones"""
+
+    def get_available_name(self, name, max_length=None):
+        # The name is derived from the content in _save; same name, same bytes
+        return name
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        ext = posixpath.splitext(name)[1].lower()
+        if not re.fullmatch(r'\.[a-z0-9]{1,10}', ext):
+            ext = ''
+        os.makedirs(self.path(directory) if directory else self.location, exist_ok=True)
+
+        # Callers that checked a file's SHA-256 already (chunked uploads) pass it along
+        digest = getattr(content, 'sha256', None)
+        if hasattr(content, 'temporary_file_path'):
+            source, owned = content.temporary_file_path(), False
+            if digest is None:
+                digest = _file_sha256(source)
+        else:
+            source, digest, owned = self._spool(directory, content)
+        size = os.path.getsize(source)
+
+        blob = posixpath.join(directory, digest[:2], digest + ext)
+        full_path = self.path(blob)
+        try:
+            created = add_reference(blob, size)
+            if created or not os.path.exists(full_path):
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                file_move_safe(source, full_path, allow_overwrite=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        finally:
+            if owned and os.path.exists(source):
+                os.remove(source)
+        return blob
+
+    def _spool(self, directory, content):
+        """Copy `content` next to its destination while hashing it"""
+        hasher = hashlib.sha256()
+        handle, path = tempfile.mkstemp(prefix='.upload-', dir=self.path(directory) if directory else self.location)
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    hasher.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path, hasher.hexdigest(), True
+
+    def delete(self, name):
+        if BLOB_NAME.match(name):
+            # The file stays until sweep() finds nothing refers to it
+            release_reference(name)
+        else:
+            super().delete(name)
+
+    def delete_file(self, name):
+        """Remove the file itself, whatever still refers to it"""
+        super().delete(name)
+
+
+def _file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def add_reference(name, size):
+    """Count one more use of blob `name`; True if its row is new (so the file must be written)"""
+    for attempt in range(50):
+        if StoredBlob.objects.filter(name=name, references__gte=0).update(
+            references=F('references') + 1, updated_at=timezone.now()
+        ):
+            return False
+        try:
+            with transaction.atomic():
+                StoredBlob.objects.create(name=name, size=size, references=1)
+            return True
+        except IntegrityError:
+            # Created concurrently, or being swept: try again once that's settled
+            time.sleep(0.01 * (attempt + 1))
+    raise IntegrityError(f'Could not reference blob {name}')
+
+
+def release_reference(name):
+    StoredBlob.objects.filter(name=name, references__gt=0).update(
+        references=F('references') - 1, updated_at=timezone.now()
+    )
+
+
+def blob_fields():
+    """(model, field name) of every file field kept in content-addressed storage"""
+    return [
+        (model, field.name)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def count_references(names):
+    """Rows using each of `names`, over every content-addressed file field"""
+    counts = Counter()
+    for model, field in blob_fields():
+        rows = model._base_manager.filter(**{f'{field}__in': names}).values_list(field).annotate(n=Count('pk'))
+        counts.update(dict(rows))
+    return counts
+
+
+def release_deleted_files(sender, instance, **kwargs):
+    """post_delete: release the blobs a deleted row referred to"""
+    for field in sender._meta.concrete_fields:
+        if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage):
+            name = getattr(instance, field.attname)
+            if name:
+                field.storage.delete(str(name))
+
+
+def sweep(grace, chunk_size=1000, dry_run=False, progress=None):
+    """
+    Walk StoredBlob in pk order, `chunk_size` rows at a time: set each
+    reference count to the number of rows actually using the blob, and
+    delete blobs no row uses that haven't been touched for `grace` (a
+    timedelta; covers uploads whose row isn't committed yet). Rows changed
+    since they were read are left for the next sweep. Returns Counter of
+    checked, corrected, deleted and freed bytes. `progress(stats)` is
+    called after every chunk.
+    """
+    stats = Counter(checked=0, corrected=0, deleted=0, freed=0)
+    cutoff = timezone.now() - grace
+    last_pk = 0
+    while True:
+        blobs = list(StoredBlob.objects.filter(pk__gt=last_pk).order_by('pk')[:chunk_size])
+        if not blobs:
+            return stats
+        last_pk = blobs[-1].pk
+        counts = count_references([blob.name for blob in blobs])
+        for blob in blobs:
+            stats['checked'] += 1
+            used = counts[blob.name]
+            unchanged = StoredBlob.objects.filter(pk=blob.pk, updated_at=blob.updated_at)
+            if used == 0 and blob.updated_at < cutoff:
+                if dry_run:
+                    stats['deleted'] += 1
+                    stats['freed'] += blob.size
+                # Tombstone first: add_reference waits until the file and row are gone
+                elif unchanged.update(references=-1):
+                    default_storage.delete_file(blob.name)
+                    StoredBlob.objects.filter(pk=blob.pk).delete()
+                    stats['deleted'] += 1
+                    stats['freed'] += blob.size
+            elif used != blob.references:
+                stats['corrected'] += 1
+                if not dry_run:
+                    unchanged.update(references=used)
+        if progress:
+            progress(stats)
+
+
+def adopt(chunk_size=500, dry_run=False, progress=None):
+    """
+    Move files saved under other names into content-addressed storage,
+    `chunk_size` rows at a time, and delete the originals once no row
+    refers to them. Returns Counter of adopted rows, missing files and
+    removed originals.
+    """
+    stats = Counter(adopted=0, missing=0, removed=0)
+    storage = default_storage
+    for model, field in blob_fields():
+        legacy = model._base_manager.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).exclude(
+            **{f'{field}__regex': BLOB_NAME.pattern}
+        )
+        adopted, missing = {}, set()
+        last_pk = 0
+        while True:
+            rows = list(legacy.filter(pk__gt=last_pk).order_by('pk').values_list('pk', field)[:chunk_size])
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            originals = set()
+            for pk, name in rows:
+                if dry_run:
+                    stats['adopted'] += 1
+                    continue
+                if name in missing:
+                    stats['missing'] += 1
+                    continue
+                if name in adopted:
+                    blob = adopted[name]
+                    add_reference(blob, storage.size(blob))
+                else:
+                    try:
+                        with storage.open(name, 'rb') as f:
+                            blob = storage.save(name, f)
+                    except FileNotFoundError:
+                        missing.add(name)
+                        stats['missing'] += 1
+                        continue
+                    adopted[name] = blob
+                if model._base_manager.filter(pk=pk, **{field: name}).update(**{field: blob}):
+                    stats['adopted'] += 1
+                    originals.add(name)
+                else:
+                    release_reference(blob)
+            for name in originals:
+                if not count_references([name])[name]:
+                    storage.delete_file(name)
+                    stats['removed'] += 1
+            if progress:
+                progress(stats)
+    return stats
@@ -0,0 +1,67 @@
+import zipfile
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+_DONE = object()
+
+
+async def _in_thread(iterator):
+    # Each chunk is produced in the sync thread, as the ORM requires
+    next_chunk = sync_to_async(next)
+    while True:
+        chunk = await next_chunk(iterator, _DONE)
+        if chunk is _DONE:
+            return
+        yield chunk
+
+
+def streaming_response(request, chunks, **kwargs):
+    """
+    StreamingHttpResponse over a sync iterator that also streams under ASGI,
+    where Django would otherwise read the whole iterator into memory first.
+    """
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        chunks = _in_thread(iter(chunks))
+    return StreamingHttpResponse(chunks, **kwargs)
+
+
+class _Sink:
+    """Write-only, unseekable file object: ZipFile writes, the generator drains"""
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.buffer += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def stream_zip(entries):
+    """
+    Yield a ZIP archive as it is built. `entries` yields (name, chunks,
+    date_time, compress) with `chunks` an iterable of bytes; only one chunk
+    is held in memory at a time. Sizes and CRCs follow each entry's data
+    (data descriptors), so nothing is buffered and no length is known up
+    front. Entries are limited to 2GB each; the archive itself is not.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for name, chunks, date_time, compress in entries:
+            info = zipfile.ZipInfo(name, date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+            with archive.open(info, 'w') as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    if sink.buffer:
+                        yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from .instrumentation import record_queries
+
+
+def _report(recorder):
+    return '\n'.join(f'  {n} x {shape}' for shape, n in recorder.shapes.most_common())
+
+
+@contextmanager
+def assert_max_queries(max_queries):
+    """Fail if the block runs more than `max_queries` SQL queries"""
+    with record_queries() as recorder:
+        yield recorder
+    if recorder.count > max_queries:
+        raise AssertionError(
+            f'{recorder.count} queries run, budget is {max_queries}:\n{_report(recorder)}'
+        )
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin for per-endpoint query budgets, e.g.
+
+        self.assertQueryBudget(3, 'get', '/api/gallery/designs/')
+    """
+    def assertQueryBudget(self, max_queries, method, path, client=None, **kwargs):
+        client = client or self.client
+        with assert_max_queries(max_queries):
+            response = getattr(client, method.lower())(path, **kwargs)
+        return response
+
+
+def clear_caches():
+    """Empty every cache (responses, throttle buckets, tag versions) so tests don't share state"""
+    for alias in settings.CACHES:
+        caches[alias].clear()
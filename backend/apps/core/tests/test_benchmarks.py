@@ -0,0 +1,34 @@
+from django.test import SimpleTestCase
+from apps.core.management.commands.run_benchmarks import percentile, summarize
+
+
+class PercentileTests(SimpleTestCase):
+    def test_empty_sample_has_no_percentile(self):
+        self.assertIsNone(percentile([], 50))
+
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+
+
+class SummarizeTests(SimpleTestCase):
+    def test_no_samples_reports_nulls(self):
+        result = summarize([], {}, 0.5)
+        
+        self.assertEqual(result['requests'], 0)
+        self.assertEqual(result['throughput_rps'], 0.0)
+        self.assertEqual(result['latency_ms'], {'p50': None, 'p95': None, 'p99': None, 'max': None})
+        self.assertEqual(result['queries_per_request'], {'mean': None, 'max': None})
+
+    def test_samples_are_summarized_in_milliseconds(self):
+        samples = [(0.010, 3), (0.020, 5), (0.030, 4)]
+        
+        result = summarize(samples, {200: 2, 404: 1}, 1.5)
+        
+        self.assertEqual(result['throughput_rps'], 2.0)
+        self.assertEqual(result['latency_ms']['p50'], 20.0)
+        self.assertEqual(result['latency_ms']['max'], 30.0)
+        self.assertEqual(result['queries_per_request'], {'mean': 4.0, 'max': 5})
+        self.assertEqual(result['status_codes'], {'200': 2, '404': 1})
@@ -0,0 +1,156 @@
+import asyncio
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.core.checks import check_pin_cache
+from apps.core.db_router import PIN_COOKIE, PrimaryReplicaRouter, ReplicaRoutingMiddleware, primary_reads
+from apps.core.response_cache import aget_or_build, get_or_build
+from apps.core.testing import clear_caches
+from apps.gallery.models import Design
+
+User = get_user_model()
+
+REPLICAS = ['replica_1', 'replica_2']
+
+
+def shared_pin_cache(test):
+    """Point the pin cache at a file-based (cross-process) cache for the test"""
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    caches = {**settings.CACHES, 'pins': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name,
+    }}
+    test.enterContext(override_settings(CACHES=caches))
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class ReplicaRoutingTests(SimpleTestCase):
+    """
+    Routing decisions only: no query runs, and none could reach a replica
+    (TestCase's transaction would keep every read on the primary anyway)
+    """
+    def setUp(self):
+        clear_caches()
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        self.healthy = self.enterContext(
+            mock.patch('apps.core.db_router.healthy_replica', side_effect=['replica_1', 'replica_2', 'replica_1'])
+        )
+
+    def route(self, request, view):
+        """Run `view()` (returning a value to keep) behind the middleware"""
+        seen = {}
+
+        def get_response(request):
+            seen['result'] = view()
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(get_response)(request)
+        return seen['result'], response
+
+    def reads(self, count=3):
+        return lambda: [self.router.db_for_read(Design) for _ in range(count)]
+
+    def test_replica_is_picked_once_per_request(self):
+        aliases, _ = self.route(self.factory.get('/api/gallery/designs/'), self.reads())
+        self.assertEqual(aliases, ['replica_1'] * 3)
+        
+        aliases, _ = self.route(self.factory.get('/api/gallery/designs/'), self.reads())
+        self.assertEqual(aliases, ['replica_2'] * 3)
+        self.assertEqual(self.healthy.call_count, 2)
+
+    def test_no_reads_no_pick(self):
+        self.route(self.factory.get('/api/gallery/designs/'), lambda: None)
+        self.healthy.assert_not_called()
+
+    def test_primary_outside_replica_requests(self):
+        self.assertEqual(self.router.db_for_read(Design), DEFAULT_DB_ALIAS)
+        for request in (
+            self.factory.get('/api/bookings/'),
+            self.factory.post('/api/gallery/designs/'),
+            self.factory.get('/api/gallery/designs/', HTTP_COOKIE=f'{PIN_COOKIE}=1'),
+        ):
+            with self.subTest(path=request.path, method=request.method):
+                aliases, _ = self.route(request, self.reads(1))
+                self.assertEqual(aliases, [DEFAULT_DB_ALIAS])
+        self.healthy.assert_not_called()
+
+    def test_primary_inside_transactions_and_primary_reads(self):
+        def view():
+            with mock.patch.object(connections[DEFAULT_DB_ALIAS], 'in_atomic_block', True):
+                in_transaction = self.router.db_for_read(Design)
+            with primary_reads():
+                forced = self.router.db_for_read(Design)
+            return in_transaction, forced, self.router.db_for_read(Design)
+        
+        aliases, _ = self.route(self.factory.get('/api/gallery/designs/'), view)
+        
+        self.assertEqual(aliases, (DEFAULT_DB_ALIAS, DEFAULT_DB_ALIAS, 'replica_1'))
+
+    def test_cached_responses_are_built_on_the_primary(self):
+        def view():
+            built = get_or_build('key', lambda: (200, self.router.db_for_read(Design)))
+            return built[1], self.router.db_for_read(Design)
+        
+        aliases, _ = self.route(self.factory.get('/api/gallery/designs/'), view)
+        self.assertEqual(aliases, (DEFAULT_DB_ALIAS, 'replica_1'))
+
+    def test_async_cached_responses_are_built_on_the_primary(self):
+        async def build():
+            return 200, self.router.db_for_read(Design)
+
+        def view():
+            return asyncio.run(aget_or_build('async-key', build))[1]
+        
+        alias, _ = self.route(self.factory.get('/api/gallery/designs/'), view)
+        self.assertEqual(alias, DEFAULT_DB_ALIAS)
+
+    def test_writes_set_the_pin_cookie(self):
+        _, response = self.route(self.factory.post('/api/gallery/designs/1/like/'), lambda: None)
+        
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], settings.DATABASE_ROUTING['STICKY_SECONDS'])
+
+    def test_per_process_pin_cache_is_not_used(self):
+        user = User(pk=7, username='customer', role='customer')
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+        
+        with mock.patch('django.core.cache.backends.locmem.LocMemCache.set') as cache_set:
+            self.route(self.factory.post('/api/gallery/designs/1/like/', **auth), lambda: None)
+        cache_set.assert_not_called()
+        # Without the cookie, only the (missing) shared pin could have kept it on the primary
+        aliases, _ = self.route(self.factory.get('/api/gallery/designs/', **auth), self.reads(1))
+        self.assertEqual(aliases, ['replica_1'])
+
+    def test_shared_pin_cache_pins_token_clients(self):
+        shared_pin_cache(self)
+        user = User(pk=7, username='customer', role='customer')
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+        
+        self.route(self.factory.post('/api/gallery/designs/1/like/', **auth), lambda: None)
+        
+        # A fresh token for the same user, no cookie
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+        aliases, _ = self.route(self.factory.get('/api/gallery/designs/', **auth), self.reads(1))
+        self.assertEqual(aliases, [DEFAULT_DB_ALIAS])
+        aliases, _ = self.route(self.factory.get('/api/gallery/designs/'), self.reads(1))
+        self.assertEqual(aliases, ['replica_1'])
+
+
+class PinCacheCheckTests(SimpleTestCase):
+    def test_no_replicas(self):
+        self.assertEqual(check_pin_cache(None), [])
+
+    @override_settings(DATABASE_REPLICAS=REPLICAS)
+    def test_per_process_cache_warns(self):
+        self.assertEqual([warning.id for warning in check_pin_cache(None)], ['core.W002'])
+
+    @override_settings(DATABASE_REPLICAS=REPLICAS)
+    def test_shared_cache_passes(self):
+        shared_pin_cache(self)
+        self.assertEqual(check_pin_cache(None), [])
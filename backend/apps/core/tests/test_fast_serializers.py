@@ -0,0 +1,121 @@
+import datetime
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.bookings.models import Booking, Notification
+from apps.bookings.serializers import NotificationSerializer, fast_notification_list
+from apps.core.renderers import render_json
+from apps.core.testing import clear_caches
+from apps.gallery.models import Category, Design, Favorite, Like
+
+User = get_user_model()
+
+
+@override_settings(THROTTLING={**settings.THROTTLING, 'ENABLED': False})
+class FastSerializerParityTests(TestCase):
+    """The values() fast path must render exactly what the DRF serializers render"""
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user('customer', 'c@example.com', 'pw', role='customer')
+        category = Category.objects.create(name='Bridal', slug='bridal')
+        designers = [
+            User.objects.create_user(
+                f'designer{i}', f'd{i}@example.com', 'pw', role='designer', is_approved=True,
+                average_rating=Decimal('4.25') if i else Decimal('0'), location='Jaipur' if i else '',
+                profile_picture=f'profiles/{i}.jpg' if i else '', specialization='Bridal   Arabic',
+            )
+            for i in range(3)
+        ]
+        for i in range(6):
+            design = Design.objects.create(
+                designer=designers[i % 3], category=category if i % 2 else None, title=f'Design {i}',
+                image=f'designs/{i}.jpg', status='approved', likes_count=i,
+            )
+            if i % 2:
+                Like.objects.create(user=cls.customer, design=design, reaction_type='like')
+            if i % 3:
+                Favorite.objects.create(user=cls.customer, design=design)
+        for i, designer in enumerate(designers):
+            booking = Booking.objects.create(
+                customer=cls.customer, designer=designer, booking_date=datetime.date(2030, 1, i + 1),
+                booking_time='10:30', event_type='Wedding', location='Hall',
+                estimated_price=Decimal('1500.50') if i else None,
+            )
+            Notification.objects.create(
+                user=cls.customer, notification_type='booking_confirmed', title='Confirmed',
+                message='See you there', booking=booking,
+            )
+
+    def setUp(self):
+        self.user_client = APIClient()
+        self.user_client.force_authenticate(self.customer)
+
+    def assertSameOutput(self, path, client=None):
+        client = client or self.client
+        bodies = []
+        for fast in (False, True):
+            clear_caches()
+            with self.settings(FAST_SERIALIZERS=fast):
+                response = client.get(path)
+            self.assertEqual(response.status_code, 200)
+            bodies.append(b''.join(response.streaming_content) if response.streaming else response.content)
+        self.assertEqual(bodies[0], bodies[1])
+        return json.loads(bodies[0])
+
+    def test_designers(self):
+        data = self.assertSameOutput('/api/users/designers/')
+        self.assertEqual(len(data['results']), 3)
+        self.assertSameOutput('/api/users/designers/?fields=id,designs_count,profile_picture')
+
+    def test_trending(self):
+        self.assertSameOutput('/api/gallery/trending/')
+        data = self.assertSameOutput('/api/gallery/trending/', client=self.user_client)
+        self.assertEqual(sum(row['is_liked'] for row in data), 3)
+
+    def test_bookings_and_notifications(self):
+        self.assertSameOutput('/api/bookings/', client=self.user_client)
+        self.assertSameOutput('/api/bookings/?omit=notes,customer_phone', client=self.user_client)
+
+    def test_notifications(self):
+        notifications = Notification.objects.all()
+        fast = fast_notification_list.to_representation(fast_notification_list.values(notifications))
+        self.assertEqual(render_json(fast), render_json(NotificationSerializer(notifications, many=True).data))
+
+    def test_streamed(self):
+        data = self.assertSameOutput('/api/users/designers/?stream=true')
+        self.assertEqual(len(data), 3)
+        self.assertSameOutput('/api/bookings/?stream=true', client=self.user_client)
+
+
+@override_settings(
+    THROTTLING={**settings.THROTTLING, 'ENABLED': False},
+    JSON_STREAMING={**settings.JSON_STREAMING, 'CHUNK_SIZE': 2},
+)
+class StreamingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        designer = User.objects.create_user('designer', 'd@example.com', 'pw', role='designer', is_approved=True)
+        for i in range(5):
+            Design.objects.create(designer=designer, title=f'Design {i}', image=f'designs/{i}.jpg', status='approved')
+
+    def setUp(self):
+        clear_caches()
+
+    def test_design_list_streams_without_fast_serializers(self):
+        self.assertFalse(settings.FAST_SERIALIZERS)
+        response = self.client.get('/api/gallery/designs/?stream=true&ordering=created_at')
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([row['title'] for row in data], [f'Design {i}' for i in range(5)])
+        page = self.client.get('/api/gallery/designs/?ordering=created_at').json()['results']
+        self.assertEqual(data, page)
+
+    def test_streaming_disabled(self):
+        with self.settings(JSON_STREAMING={'ENABLED': False, 'CHUNK_SIZE': 2}):
+            response = self.client.get('/api/gallery/designs/?stream=true')
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.json()['count'], 5)
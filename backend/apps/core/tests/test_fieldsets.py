@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from rest_framework.request import Request
+from apps.core.fieldsets import narrow_queryset, sparse_fields
+from apps.gallery.models import Design, Favorite, Review
+from apps.gallery.serializers import FavoriteSerializer, ReviewSerializer
+
+User = get_user_model()
+
+
+def sparse_request(query):
+    return Request(RequestFactory().get(f'/?{query}'))
+
+
+class SparseFieldsTests(SimpleTestCase):
+    def test_parse(self):
+        self.assertEqual(sparse_fields({'fields': 'id, title,,'}), ({'id', 'title'}, set()))
+        self.assertEqual(sparse_fields({'omit': 'tags'}), (None, {'tags'}))
+        # ?fields= with nothing selected returns no fields, not all of them
+        self.assertEqual(sparse_fields({'fields': ''}), (set(), set()))
+
+
+class NarrowQuerysetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        customer = User.objects.create_user('customer', 'c@example.com', 'pw', role='customer')
+        designer = User.objects.create_user('designer', 'd@example.com', 'pw', role='designer', is_approved=True)
+        Review.objects.create(customer=customer, designer=designer, rating=4, comment='Nice', is_approved=True)
+        design = Design.objects.create(designer=designer, title='Design', image='designs/1.jpg', status='approved')
+        Favorite.objects.create(user=customer, design=design)
+
+    def test_replaces_the_views_joins(self):
+        serializer = ReviewSerializer(context={'request': sparse_request('fields=id,rating')})
+        queryset = narrow_queryset(Review.objects.select_related('customer', 'designer'), serializer)
+        # Joining a relation only() defers would raise
+        with self.assertNumQueries(1):
+            self.assertEqual(list(queryset.values_list('rating', flat=True)), [4])
+        self.assertFalse(queryset.query.select_related)
+
+    def test_keeps_joins_the_fields_need(self):
+        serializer = ReviewSerializer(context={'request': sparse_request('fields=id,customer_name')})
+        queryset = narrow_queryset(Review.objects.select_related('customer', 'designer'), serializer)
+        self.assertEqual(queryset.query.select_related, {'customer': {}})
+        with self.assertNumQueries(1):
+            self.assertEqual([review.customer.username for review in queryset], ['customer'])
+
+    def test_drops_prefetches(self):
+        serializer = FavoriteSerializer(context={'request': sparse_request('fields=id,design')})
+        queryset = narrow_queryset(Favorite.objects.prefetch_related(Prefetch('design')), serializer)
+        with self.assertNumQueries(1):
+            list(queryset)
@@ -0,0 +1,89 @@
+import os
+import tempfile
+
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils.http import http_date
+from apps.core.media import _byte_range
+
+ETAG = '"5f00-400"'
+LAST_MODIFIED = 1700000000
+
+
+class ByteRangeTests(SimpleTestCase):
+    def byte_range(self, size=1000, **headers):
+        request = RequestFactory().get('/media/file.bin', **headers)
+        return _byte_range(request, size, ETAG, LAST_MODIFIED)
+
+    def test_no_range(self):
+        self.assertIsNone(self.byte_range())
+
+    def test_ranges(self):
+        self.assertEqual(self.byte_range(HTTP_RANGE='bytes=0-99'), (0, 99))
+        self.assertEqual(self.byte_range(HTTP_RANGE='bytes=500-'), (500, 999))
+        # End past the file is clamped; suffix ranges count from the end
+        self.assertEqual(self.byte_range(HTTP_RANGE='bytes=900-5000'), (900, 999))
+        self.assertEqual(self.byte_range(HTTP_RANGE='bytes=-100'), (900, 999))
+        self.assertEqual(self.byte_range(HTTP_RANGE='bytes=-5000'), (0, 999))
+
+    def test_ignored(self):
+        # Whole file for anything we don't serve as a single range
+        for header in ('bytes=0-1,5-9', 'bytes=-', 'items=0-9', 'bytes=10-5', 'bytes=a-b'):
+            with self.subTest(header=header):
+                self.assertIsNone(self.byte_range(HTTP_RANGE=header))
+
+    def test_unsatisfiable(self):
+        self.assertIs(self.byte_range(HTTP_RANGE='bytes=1000-'), False)
+        self.assertIs(self.byte_range(HTTP_RANGE='bytes=-0'), False)
+        self.assertIs(self.byte_range(size=0, HTTP_RANGE='bytes=-10'), False)
+
+    def test_if_range(self):
+        self.assertEqual(self.byte_range(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=ETAG), (0, 9))
+        self.assertEqual(self.byte_range(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=http_date(LAST_MODIFIED)), (0, 9))
+        # The file changed since the client's partial copy: send all of it
+        self.assertIsNone(self.byte_range(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"other"'))
+        self.assertIsNone(self.byte_range(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=http_date(LAST_MODIFIED - 60)))
+
+
+class ServeMediaTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name, MEDIA_SERVING={
+            'ACCEL': '', 'ACCEL_PREFIX': '/protected-media/', 'MAX_AGE': 60, 'SIGNED_URL_MAX_AGE': 3600,
+        }))
+        self.content = bytes(range(256)) * 4
+        os.makedirs(os.path.join(media.name, 'files'))
+        with open(os.path.join(media.name, 'files', 'data.bin'), 'wb') as f:
+            f.write(self.content)
+
+    def test_whole_file(self):
+        response = self.client.get('/media/files/data.bin')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+
+    def test_partial(self):
+        response = self.client.get('/media/files/data.bin', HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 100-199/1024')
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(b''.join(response.streaming_content), self.content[100:200])
+
+    def test_stale_if_range(self):
+        response = self.client.get('/media/files/data.bin', HTTP_RANGE='bytes=100-199', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+    def test_unsatisfiable(self):
+        response = self.client.get('/media/files/data.bin', HTTP_RANGE='bytes=2048-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_not_modified(self):
+        etag = self.client.get('/media/files/data.bin')['ETag']
+        self.assertEqual(self.client.get('/media/files/data.bin', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_outside_media_root(self):
+        self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/files/.hidden').status_code, 404)
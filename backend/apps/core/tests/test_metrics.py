@@ -0,0 +1,67 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from prometheus_client import CollectorRegistry, multiprocess
+from prometheus_client.mmap_dict import MmapedDict, mmap_key
+from apps.core.metrics import archive_dead_process
+
+
+def write_sample(directory, kind, pid, value, labels=('detail',)):
+    samples = MmapedDict(os.path.join(directory, f'{kind}_{pid}.db'))
+    key = mmap_key('hits', 'hits_total', ['view'], list(labels), 'Hits')
+    samples.write_value(key, value, 0)
+    samples.close()
+
+
+def totals(directory):
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=directory)
+    return {
+        (sample.name, sample.labels['view']): sample.value
+        for metric in registry.collect() for sample in metric.samples
+    }
+
+
+class ArchiveDeadProcessTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.enterContext(mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': self.directory}))
+
+    def test_totals_survive_recycled_workers(self):
+        write_sample(self.directory, 'counter', 101, 3)
+        write_sample(self.directory, 'counter', 102, 4)
+        write_sample(self.directory, 'counter', 102, 1, labels=('list',))
+        archive_dead_process(101)
+        archive_dead_process(102)
+        write_sample(self.directory, 'counter', 103, 5)
+        self.assertEqual(totals(self.directory), {('hits_total', 'detail'): 12, ('hits_total', 'list'): 1})
+        # One archive instead of a file per dead worker
+        self.assertEqual(sorted(os.listdir(self.directory)), ['.lock', 'counter_103.db', 'counter_archive.db'])
+
+    def test_live_gauges_are_left_alone(self):
+        write_sample(self.directory, 'gauge_livesum', 101, 2)
+        archive_dead_process(101)
+        self.assertIn('gauge_livesum_101.db', os.listdir(self.directory))
+
+    def test_scrape(self):
+        write_sample(self.directory, 'counter', 101, 3)
+        archive_dead_process(101)
+        with override_settings(METRICS={**settings.METRICS, 'ENABLED': True, 'TOKEN': 'secret'}):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'hits_total{view="detail"} 3.0', response.content)
+
+
+@override_settings(METRICS={**settings.METRICS, 'ENABLED': True, 'TOKEN': ''})
+class MetricsAccessTests(SimpleTestCase):
+    def test_proxied_requests_are_refused(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code, 200)
+        response = self.client.get('/metrics', REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='203.0.113.9')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.5').status_code, 403)
@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from apps.core.response_cache import tag_versions
+from apps.core.testing import clear_caches
+from apps.gallery.models import Category, Design
+from apps.gallery.counters import add_reactions
+
+User = get_user_model()
+
+
+class InvalidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.designer = User.objects.create_user('designer', 'd@example.com', 'pw', role='designer', is_approved=True)
+        cls.design = Design.objects.create(designer=cls.designer, title='Design', image='designs/1.jpg', status='approved')
+
+    def setUp(self):
+        clear_caches()
+
+    def versions(self):
+        return tag_versions([f'design:{self.design.pk}', 'design-list', f'designer:{self.designer.pk}', 'categories'])
+
+    def test_after_commit(self):
+        before = self.versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.design.title = 'Renamed'
+            self.design.save()
+            # A reader before the commit would see the old row: keep its entry reachable
+            self.assertEqual(self.versions(), before)
+        after = self.versions()
+        self.assertNotEqual(after[0], before[0])
+        self.assertNotEqual(after[1], before[1])
+        self.assertNotEqual(after[2], before[2])
+        self.assertEqual(after[3], before[3])
+
+    def test_uncommitted_writes_keep_the_cache(self):
+        before = self.versions()
+        with self.captureOnCommitCallbacks() as callbacks:
+            Category.objects.create(name='Arabic', slug='arabic')
+        self.assertEqual(self.versions(), before)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_counters_only_touch_the_design(self):
+        before = self.versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            add_reactions(self.design.pk, likes=1)
+        after = self.versions()
+        self.assertNotEqual(after[0], before[0])
+        self.assertEqual(after[1:], before[1:])
+
+    def test_designer_profile(self):
+        before = self.versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.designer.bio = 'Bridal specialist'
+            self.designer.save()
+        self.assertNotEqual(self.versions()[2], before[2])
@@ -0,0 +1,88 @@
+import io
+import os
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+from apps.core.models import StoredBlob
+from apps.core.storage import BLOB_NAME, sweep
+from apps.gallery.models import Design
+
+User = get_user_model()
+
+
+def png_bytes(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class BlobReferenceTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.designer = User.objects.create_user('designer', 'd@example.com', 'pw', role='designer', is_approved=True)
+
+    def design(self, content, filename='design.png'):
+        design = Design(designer=self.designer, title='Design')
+        design.image.save(filename, ContentFile(content), save=True)
+        return design
+
+    def references(self, name):
+        return StoredBlob.objects.get(name=name).references
+
+    def test_identical_uploads_share_a_blob(self):
+        first = self.design(png_bytes('red'))
+        second = self.design(png_bytes('red'), filename='copy.PNG')
+        other = self.design(png_bytes('blue'))
+        self.assertRegex(first.image.name, BLOB_NAME)
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, other.image.name)
+        self.assertEqual(self.references(first.image.name), 2)
+        self.assertEqual(self.references(other.image.name), 1)
+
+    def test_delete_releases_a_reference(self):
+        first = self.design(png_bytes('red'))
+        second = self.design(png_bytes('red'))
+        name = first.image.name
+        first.delete()
+        self.assertEqual(self.references(name), 1)
+        second.delete()
+        self.assertEqual(self.references(name), 0)
+        # Left for the sweeper
+        self.assertTrue(default_storage.exists(name))
+
+    def test_sweep(self):
+        kept = self.design(png_bytes('red'))
+        self.design(png_bytes('red'))
+        unused = self.design(png_bytes('blue'))
+        unused_name = unused.image.name
+        unused.delete()
+        StoredBlob.objects.filter(name=kept.image.name).update(references=7)
+
+        # Recently touched blobs survive the grace period
+        stats = sweep(timedelta(hours=1))
+        self.assertEqual((stats['corrected'], stats['deleted']), (1, 0))
+        self.assertEqual(self.references(kept.image.name), 2)
+        self.assertTrue(default_storage.exists(unused_name))
+
+        stats = sweep(timedelta(0))
+        self.assertEqual((stats['checked'], stats['corrected'], stats['deleted']), (2, 0, 1))
+        self.assertEqual(stats['freed'], len(png_bytes('blue')))
+        self.assertFalse(StoredBlob.objects.filter(name=unused_name).exists())
+        self.assertFalse(os.path.exists(default_storage.path(unused_name)))
+        self.assertTrue(default_storage.exists(kept.image.name))
+
+    def test_dry_run(self):
+        unused = self.design(png_bytes('blue'))
+        name = unused.image.name
+        unused.delete()
+        stats = sweep(timedelta(0), dry_run=True)
+        self.assertEqual(stats['deleted'], 1)
+        self.assertTrue(StoredBlob.objects.filter(name=name).exists())
+        self.assertTrue(default_storage.exists(name))
@@ -0,0 +1,119 @@
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from apps.core.checks import check_throttle_cache
+from apps.core.testing import clear_caches
+from apps.core.throttling import parse_rate, rejection_counts, take_token
+
+User = get_user_model()
+
+
+class ParseRateTests(SimpleTestCase):
+    def test_rates(self):
+        self.assertEqual(parse_rate('30/m'), (30, 0.5))
+        self.assertEqual(parse_rate('30/min'), (30, 0.5))
+        self.assertEqual(parse_rate('10/5m'), (10, 10 / 300))
+        self.assertEqual(parse_rate('24/d'), (24, 24 / 86400))
+
+
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        clear_caches()
+
+    def test_burst_then_refill(self):
+        for _ in range(3):
+            self.assertEqual(take_token('bucket', 3, 1, now=1000), 0)
+        self.assertEqual(take_token('bucket', 3, 1, now=1000), 1)
+        self.assertAlmostEqual(take_token('bucket', 3, 1, now=1000.5), 0.5)
+        self.assertEqual(take_token('bucket', 3, 1, now=1001), 0)
+        self.assertAlmostEqual(take_token('bucket', 3, 1, now=1001), 1)
+
+    def test_refill_is_capped(self):
+        take_token('bucket', 2, 1, now=1000)
+        # Idle for an hour: full again, but no more than capacity
+        self.assertEqual(take_token('bucket', 2, 1, now=4600), 0)
+        self.assertEqual(take_token('bucket', 2, 1, now=4600), 0)
+        self.assertGreater(take_token('bucket', 2, 1, now=4600), 0)
+
+    def test_buckets_are_separate(self):
+        take_token('a', 1, 1, now=1000)
+        self.assertGreater(take_token('a', 1, 1, now=1000), 0)
+        self.assertEqual(take_token('b', 1, 1, now=1000), 0)
+
+
+class SharedCacheWindowTests(SimpleTestCase):
+    """Caches shared between processes use sliding-window counters"""
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        caches = {**settings.CACHES, 'throttle': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name,
+        }}
+        self.enterContext(override_settings(CACHES=caches))
+
+    def test_window_full(self):
+        # 2 per 60s; windows start on multiples of 60
+        self.assertEqual(take_token('window', 2, 2 / 60, now=120), 0)
+        self.assertEqual(take_token('window', 2, 2 / 60, now=120), 0)
+        # Next window, then half of this one sliding out
+        self.assertAlmostEqual(take_token('window', 2, 2 / 60, now=120), 90)
+        self.assertGreater(take_token('window', 2, 2 / 60, now=200), 0)
+        self.assertEqual(take_token('window', 2, 2 / 60, now=211), 0)
+
+    def test_rejections_dont_count(self):
+        take_token('window', 1, 1 / 60, now=120)
+        for _ in range(5):
+            self.assertGreater(take_token('window', 1, 1 / 60, now=130), 0)
+        # Only the allowed request weighs on the next window
+        self.assertEqual(take_token('window', 1, 1 / 60, now=240), 0)
+
+
+@override_settings(THROTTLING={**settings.THROTTLING, 'RATES': {'login.ip': '2/m'}})
+class ThrottledEndpointTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        User.objects.create_user('customer', 'c@example.com', 'secret-pass', role='customer')
+
+    def login(self):
+        return self.client.post('/api/users/login/', {'username': 'customer', 'password': 'wrong'})
+
+    def test_retry_after(self):
+        self.assertNotEqual(self.login().status_code, 429)
+        self.assertNotEqual(self.login().status_code, 429)
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        # One token back at 2/min takes 30s
+        self.assertIn(int(response['Retry-After']), (29, 30))
+        self.assertEqual(rejection_counts()['login'], {'ip': 1})
+
+    def test_unthrottled_scope(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get('/api/gallery/categories/').status_code, 200)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class DistributedLoginTests(TestCase):
+    def setUp(self):
+        clear_caches()
+
+    def test_many_addresses_dont_lock_out_others(self):
+        # Past what the old 600/m bucket shared by all login clients allowed
+        for i in range(61):
+            for _ in range(10):
+                self.client.post('/api/users/login/', {'username': 'x', 'password': 'y'}, REMOTE_ADDR=f'10.0.{i}.1')
+        response = self.client.post('/api/users/login/', {'username': 'x', 'password': 'y'}, REMOTE_ADDR='10.9.9.9')
+        self.assertNotEqual(response.status_code, 429)
+
+
+class ThrottleCacheCheckTests(SimpleTestCase):
+    def test_local_memory_cache_warns(self):
+        self.assertEqual([warning.id for warning in check_throttle_cache(None)], ['core.W001'])
+
+    def test_shared_cache_passes(self):
+        caches = {**settings.CACHES, 'throttle': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tempfile.gettempdir(),
+        }}
+        with override_settings(CACHES=caches):
+            self.assertEqual(check_throttle_cache(None), [])
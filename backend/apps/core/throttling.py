@@ -0,0 +1,161 @@
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.throttling import BaseThrottle
+from .metrics import throttle_rejected
+
+logger = logging.getLogger('apps.core.throttling')
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Serializes read-modify-write of a bucket between threads of one process.
+# Only used with the (per-process) local-memory cache: shared caches get
+# sliding-window counters updated with atomic incr instead
+_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """'30/min' -> (capacity, refill per second); '10/5m' is 10 per 5 minutes"""
+    count, _, period = rate.partition('/')
+    multiplier, unit = re.fullmatch(r'(\d*)([a-z]+)', period).groups()
+    capacity = int(count)
+    return capacity, capacity / (PERIODS[unit[0]] * int(multiplier or 1))
+
+
+def take_token(key, capacity, refill, now=None):
+    """
+    Take one token from the bucket at `key`. Returns 0 when allowed, else
+    the seconds until a token is available. One cache get and one set,
+    under a process lock; shared caches use _take_window_token.
+    """
+    cache = caches[settings.THROTTLING['CACHE']]
+    now = time.time() if now is None else now
+    if not isinstance(cache, LocMemCache):
+        return _take_window_token(cache, key, capacity, capacity / refill, now)
+    with _lock:
+        state = cache.get(key)
+        tokens = capacity if state is None else min(capacity, state[0] + (now - state[1]) * refill)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # A bucket left alone this long is full again, so it can expire
+        cache.set(key, (tokens, now), int((capacity - tokens) / refill) + 1)
+    return 0 if allowed else (1 - tokens) / refill
+
+
+def _take_window_token(cache, key, capacity, period, now):
+    """
+    Lock-free take_token for caches shared between processes: a count per
+    fixed window of `period`, bumped with the backend's atomic incr. The
+    current count plus the previous window's, weighted by how much of it
+    still falls in the last `period`, must stay within `capacity`, which
+    allows about the same bursts and rate as the token bucket.
+    """
+    window, position = divmod(now / period, 1)
+    current = f'{key}:{int(window)}'
+    try:
+        count = cache.incr(current)
+    except ValueError:
+        # First request of the window (or evicted): create it, then count
+        cache.add(current, 0, int(2 * period) + 1)
+        count = cache.incr(current)
+    previous = cache.get(f'{key}:{int(window) - 1}', 0)
+    if previous * (1 - position) + count <= capacity:
+        return 0
+
+    # Rejected requests don't use up capacity
+    count = cache.decr(current)
+    if count + 1 <= capacity and previous:
+        # Wait for enough of the previous window to slide out
+        needed = 1 - (capacity - count - 1) / previous
+        return max((needed - position) * period, 0.001)
+    # This window is full: wait for the next one, then for it to slide out
+    return (1 - position + max(0, 1 - (capacity - 1) / count)) * period
+
+
+def record_rejection(scope, kind):
+    throttle_rejected(scope, kind)
+    cache = caches[settings.THROTTLING['CACHE']]
+    key = f'throttle-rejected:{scope}:{kind}'
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr
+        cache.set(key, 1, None)
+
+
+def rejection_counts():
+    """{scope: {kind: rejected requests}} for every configured rate"""
+    cache = caches[settings.THROTTLING['CACHE']]
+    counts = {}
+    for name in settings.THROTTLING['RATES']:
+        scope, _, kind = name.rpartition('.')
+        counts.setdefault(scope, {})[kind] = cache.get(f'throttle-rejected:{scope}:{kind}', 0)
+    return counts
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket per (view scope, kind, identity). A rate 'N/period' allows
+    bursts of N requests and refills N tokens per period. The scope is the
+    view's `throttle_scope` ('default' otherwise) and the rate comes from
+    THROTTLING['RATES']['<scope>.<kind>']; scopes without a rate for this
+    kind are not throttled.
+    """
+    kind = None
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        options = settings.THROTTLING
+        if not options['ENABLED']:
+            return True
+        self.scope = getattr(view, 'throttle_scope', None) or 'default'
+        rate = options['RATES'].get(f'{self.scope}.{self.kind}')
+        if rate is None:
+            return True
+
+        capacity, refill = parse_rate(rate)
+        key = f'throttle:{self.scope}:{self.kind}:{self.get_ident_key(request)}'
+        self.delay = take_token(key, capacity, refill)
+        if not self.delay:
+            return True
+        record_rejection(self.scope, self.kind)
+        logger.info('Throttled %s %s (%s.%s)', request.method, request.path, self.scope, self.kind)
+        return False
+
+    def wait(self):
+        return self.delay
+
+
+class UserBucketThrottle(TokenBucketThrottle):
+    """Per authenticated user; anonymous requests are keyed by client IP"""
+    kind = 'user'
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'u{request.user.pk}'
+        return f'ip{self.get_ident(request)}'
+
+
+class IPBucketThrottle(TokenBucketThrottle):
+    """Per client IP (honours REST_FRAMEWORK['NUM_PROXIES'])"""
+    kind = 'ip'
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class EndpointBucketThrottle(TokenBucketThrottle):
+    """One bucket shared by every client of the scope"""
+    kind = 'endpoint'
+
+    def get_ident_key(self, request):
+        return '*'
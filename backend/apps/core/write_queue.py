@@ -0,0 +1,80 @@
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from .metrics import queue_depth
+
+logger = logging.getLogger('apps.core.write_queue')
+
+
+class WriteBehindQueue:
+    """
+    Coalesce small, frequent counter writes and apply them from one thread.
+
+    `submit(func, *args, **deltas)` calls with the same func and args are
+    merged by summing their integer deltas, then applied in a single
+    transaction (a savepoint per call) every FLUSH_INTERVAL seconds (or as soon as MAX_PENDING
+    distinct calls are waiting). Only one writer ever contends for the
+    database lock. Pending deltas are lost if the process is killed, so
+    use it only for best-effort counters.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.pending = {}
+        self.pid = None
+
+    def submit(self, func, *args, **deltas):
+        options = settings.WRITE_QUEUE
+        if not options['ENABLED']:
+            func(*args, **deltas)
+            return
+        with self.lock:
+            self._ensure_writer()
+            self.pending.setdefault((func, args), Counter()).update(deltas)
+            queue_depth('write_behind', len(self.pending))
+            if len(self.pending) >= options['MAX_PENDING']:
+                self.wakeup.set()
+
+    def flush(self):
+        """Apply everything queued so far; returns the number of merged calls"""
+        with self.lock:
+            batch, self.pending = self.pending, {}
+            queue_depth('write_behind', 0)
+        if not batch:
+            return 0
+        close_old_connections()
+        try:
+            with transaction.atomic():
+                for (func, args), deltas in batch.items():
+                    # A savepoint each, so one failing write doesn't take the batch with it
+                    try:
+                        with transaction.atomic():
+                            func(*args, **deltas)
+                    except Exception:
+                        logger.exception('Dropped queued write %s%r %r', func.__name__, args, dict(deltas))
+        except Exception:
+            logger.exception('Dropped %d queued writes', len(batch))
+        return len(batch)
+
+    def _ensure_writer(self):
+        # Started lazily, and again in each forked worker process
+        if self.pid == os.getpid():
+            return
+        self.pid = os.getpid()
+        self.pending = {}
+        threading.Thread(target=self._run, name='write-behind', daemon=True).start()
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(settings.WRITE_QUEUE['FLUSH_INTERVAL'])
+            self.wakeup.clear()
+            self.flush()
+
+
+write_queue = WriteBehindQueue()
+atexit.register(write_queue.flush)
@@ -1,13 +1,18 @@
 from django.contrib import admin
-from .models import Design, Category, Review, Like, Favorite
+from apps.core.paginator import EstimatedCountPaginator
+from .models import Design, Category, Review, Like, Favorite, DesignImport, UploadSession
 
 @admin.register(Design)
 class DesignAdmin(admin.ModelAdmin):
     list_display = ('title', 'designer', 'category', 'status', 'likes_count', 'created_at')
+    list_select_related = ('designer', 'category')
     search_fields = ('title', 'description', 'designer__username')
     list_filter = ('status', 'category')
     list_editable = ('status',)
     ordering = ('-created_at',)
+    autocomplete_fields = ('designer', 'category')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Category)
@@ -20,16 +25,48 @@ class CategoryAdmin(admin.ModelAdmin):
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ('customer', 'designer', 'rating', 'is_reported', 'is_approved', 'created_at')
+    list_select_related = ('customer', 'designer')
     list_filter = ('rating', 'is_reported', 'is_approved')
     search_fields = ('customer__username', 'designer__username', 'comment')
+    autocomplete_fields = ('customer', 'designer')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Like)
 class LikeAdmin(admin.ModelAdmin):
     list_display = ('user', 'design', 'reaction_type', 'created_at')
+    # Design.__str__ reads the designer's username
+    list_select_related = ('user', 'design__designer')
     list_filter = ('reaction_type',)
+    # Newest first by primary key, so pages walk an index instead of sorting
+    ordering = ('-id',)
+    raw_id_fields = ('user', 'design')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Favorite)
 class FavoriteAdmin(admin.ModelAdmin):
     list_display = ('user', 'design', 'created_at')
+    list_select_related = ('user', 'design__designer')
+    ordering = ('-id',)
+    raw_id_fields = ('user', 'design')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(DesignImport)
+class DesignImportAdmin(admin.ModelAdmin):
+    list_display = ('id', 'designer', 'status', 'total', 'imported', 'skipped', 'failed', 'created_at')
+    list_select_related = ('designer',)
+    list_filter = ('status',)
+    raw_id_fields = ('designer', 'created_by')
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'filename', 'size', 'offset', 'status', 'expires_at')
+    list_select_related = ('user',)
+    list_filter = ('status',)
+    raw_id_fields = ('user', 'design')
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+class GalleryConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.gallery'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
+        from apps.core.media import register_access_check
+        from .media import design_image_access
+        
+        register_access_check('designs/', design_image_access)
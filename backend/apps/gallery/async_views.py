@@ -0,0 +1,75 @@
+import functools
+
+from asgiref.sync import sync_to_async
+from rest_framework.response import Response
+from apps.core.async_views import is_anonymous, delegate, cached_data, serve
+from apps.core.conditional import aconditional
+from apps.core.fast_serializers import wants_stream
+from .views import DesignViewSet, design_list_validators, design_validators, trending_data, trending_designs
+
+# Sync DRF views used for writes and for authenticated/streamed reads
+design_list_view = DesignViewSet.as_view({'get': 'list', 'post': 'create'})
+design_detail_view = DesignViewSet.as_view({
+    'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'
+})
+
+
+async def design_list(request):
+    """Async design list for anonymous GETs"""
+    if request.method != 'GET' or not is_anonymous(request) or wants_stream(request):
+        return await delegate(design_list_view, request)
+    
+    async def handler(view, drf_request):
+        def build():
+            # DesignViewSet.list without its @conditional/@cached_response, which run here instead
+            response = super(DesignViewSet, view).list(drf_request)
+            return response.status_code, response.data
+        
+        async def respond():
+            status, data = await cached_data(request, ['design-list'], sync_to_async(build))
+            return Response(data, status=status)
+        
+        validators = functools.partial(sync_to_async(design_list_validators), view, drf_request)
+        return await aconditional(
+            request, validators, ['design-list'], respond, format=drf_request.accepted_renderer.format
+        )
+    
+    return await serve(DesignViewSet, request, handler, {'get': 'list'})
+
+
+async def design_detail(request, pk):
+    """Async design detail for anonymous GETs"""
+    if request.method != 'GET' or not is_anonymous(request):
+        return await delegate(design_detail_view, request, pk=pk)
+    
+    async def handler(view, drf_request):
+        def build():
+            # DesignViewSet._retrieve without its decorators
+            return 200, view.get_serializer(view.get_object()).data
+        
+        async def respond():
+            status, data = await cached_data(request, [f'design:{pk}'], sync_to_async(build))
+            return Response(data, status=status)
+        
+        validators = functools.partial(sync_to_async(design_validators), view, drf_request, pk)
+        response = await aconditional(
+            request, validators, [f'design:{pk}'], respond, format=drf_request.accepted_renderer.format, pk=pk
+        )
+        return await sync_to_async(view.count_view)(response)
+    
+    return await serve(DesignViewSet, request, handler, {'get': 'retrieve'}, pk=pk)
+
+
+async def trending(request):
+    """Async trending designs for anonymous GETs"""
+    if request.method != 'GET' or not is_anonymous(request):
+        return await delegate(trending_designs, request)
+    
+    async def handler(view, drf_request):
+        def build():
+            return 200, trending_data(drf_request)
+        
+        status, data = await cached_data(request, ['design-list'], sync_to_async(build))
+        return Response(data, status=status)
+    
+    return await serve(trending_designs.cls, request, handler)
@@ -0,0 +1,32 @@
+from django.db.models import F
+from django.utils import timezone
+from apps.analytics.rollups import record_design_activity
+from apps.core.response_cache import invalidate_tags_on_commit
+from apps.core.write_queue import write_queue
+from .models import Design
+
+
+def add_views(design_id, views=0):
+    Design.objects.filter(pk=design_id).update(views_count=F('views_count') + views)
+
+
+def add_reactions(design_id, likes=0, dislikes=0):
+    Design.objects.filter(pk=design_id).update(
+        likes_count=F('likes_count') + likes, dislikes_count=F('dislikes_count') + dislikes,
+        updated_at=timezone.now()
+    )
+    # queryset.update() skips the post_save cache invalidation. Lists and
+    # trending keep their counts until RESPONSE_CACHE['TIMEOUT'].
+    invalidate_tags_on_commit(f'design:{design_id}')
+
+
+def count_view(design_id, designer_id):
+    """Record one view of a design (counter and daily rollups)"""
+    write_queue.submit(add_views, design_id, views=1)
+    write_queue.submit(record_design_activity, design_id, designer_id, views=1)
+
+
+def count_reactions(design_id, designer_id, likes=0, dislikes=0):
+    """Record a change in a design's like/dislike counts (counters and daily rollups)"""
+    write_queue.submit(add_reactions, design_id, likes=likes, dislikes=dislikes)
+    write_queue.submit(record_design_activity, design_id, designer_id, likes=likes, dislikes=dislikes)
@@ -0,0 +1,68 @@
+"""
+Image validation and normalization for bulk imports. Runs in worker
+processes, so it only uses Pillow and the standard library: importing it
+must not require Django to be set up.
+"""
+import os
+import zipfile
+from io import BytesIO
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+
+# One open ZipFile per archive per worker process
+_archives = {}
+
+
+def read_member(source, member):
+    """Bytes of `member` from a ZIP archive or directory `source`"""
+    if os.path.isdir(source):
+        with open(os.path.join(source, member), 'rb') as f:
+            return f.read()
+    archive = _archives.get(source)
+    if archive is None:
+        archive = _archives[source] = zipfile.ZipFile(source)
+    return archive.read(member)
+
+
+def normalize_image(task):
+    """
+    Validate an image and re-encode it as a metadata-free progressive JPEG
+    no larger than max_dimension on either side, upright per its EXIF
+    orientation, with any transparency flattened onto white.
+
+    `task` is (source, member, max_dimension, quality). Returns
+    ('ok', jpeg_bytes, width, height) or ('error', message).
+    """
+    source, member, max_dimension, quality = task
+    try:
+        data = read_member(source, member)
+    except (FileNotFoundError, IsADirectoryError, KeyError):
+        return ('error', 'file not found in the source')
+    try:
+        with Image.open(BytesIO(data)) as image:
+            if image.format not in ALLOWED_FORMATS:
+                return ('error', f'unsupported image format {image.format}')
+            image.verify()
+
+        with Image.open(BytesIO(data)) as image:
+            # JPEGs decode straight at a reduced scale (much faster for big photos)
+            image.draft('RGB', (max_dimension, max_dimension))
+            image = ImageOps.exif_transpose(image)
+            if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            elif image.mode != 'RGB':
+                image = image.convert('RGB')
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS, reducing_gap=3.0)
+
+            output = BytesIO()
+            image.save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+            return ('ok', output.getvalue(), image.width, image.height)
+    except UnidentifiedImageError:
+        return ('error', 'not a valid image')
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as exc:
+        return ('error', str(exc) or exc.__class__.__name__)
@@ -0,0 +1,239 @@
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+import posixpath
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from apps.admin_panel.stats import apply_deltas, design_counters
+from apps.core.response_cache import invalidate_tags
+from .image_processing import normalize_image, read_member
+from .models import Category, Design, DesignImport
+
+logger = logging.getLogger('apps.gallery.imports')
+
+MANIFEST_NAMES = ('manifest.csv', 'manifest.json')
+
+# Manifest column -> Design field max length
+LIMITS = {'title': 200, 'tags': 500, 'price_range': 100, 'key': 255}
+
+
+class ManifestError(ValueError):
+    pass
+
+
+def read_manifest(source, manifest=''):
+    """Raw manifest rows from `manifest`, or manifest.csv/.json at the root of `source`"""
+    if manifest:
+        with open(manifest, 'rb') as f:
+            return parse_manifest(f.read(), manifest)
+    for name in MANIFEST_NAMES:
+        try:
+            return parse_manifest(read_member(source, name), name)
+        except (FileNotFoundError, KeyError):
+            continue
+    raise ManifestError('No manifest given and no manifest.csv or manifest.json in the source')
+
+
+def parse_manifest(content, name):
+    """
+    A CSV manifest has a header row; a JSON manifest is a list of objects
+    (or {"designs": [...]}). Columns: file and title (required),
+    description, category (name or slug), tags, price_range, and key (the
+    row's identity for resuming; defaults to file).
+    """
+    try:
+        if name.lower().endswith('.json'):
+            rows = json.loads(content)
+            if isinstance(rows, dict):
+                rows = rows.get('designs')
+        else:
+            rows = list(csv.DictReader(io.StringIO(content.decode('utf-8-sig'))))
+    except (ValueError, csv.Error) as exc:
+        raise ManifestError(f'Unreadable manifest: {exc}')
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ManifestError('A JSON manifest must be a list of objects')
+    return rows
+
+
+def clean_row(row, categories):
+    """Validated Design values for a manifest row; raises ManifestError"""
+    values = {field: str(row.get(field) or '').strip() for field in ('file', 'title', 'description', 'price_range')}
+    if not values['file'] or not values['title']:
+        raise ManifestError('"file" and "title" are required')
+    tags = row.get('tags') or ''
+    values['tags'] = ', '.join(str(tag).strip() for tag in tags) if isinstance(tags, list) else str(tags).strip()
+    values['key'] = str(row.get('key') or values['file']).strip()
+    for field, limit in LIMITS.items():
+        if len(values[field]) > limit:
+            raise ManifestError(f'"{field}" is longer than {limit} characters')
+
+    # Only paths inside the source
+    path = posixpath.normpath(values['file'].replace('\\', '/'))
+    if path.startswith(('/', '../')) or path == '..':
+        raise ManifestError(f'"{values["file"]}" is outside the source')
+    values['file'] = path
+
+    category = str(row.get('category') or '').strip().lower()
+    if category and category not in categories:
+        raise ManifestError(f'Unknown category "{row["category"]}"')
+    values['category_id'] = categories.get(category)
+    return values
+
+
+def _category_lookup():
+    lookup = {}
+    for pk, name, slug in Category.objects.values_list('pk', 'name', 'slug'):
+        lookup[name.lower()] = lookup[slug.lower()] = pk
+    return lookup
+
+
+def _record_error(job, file, message):
+    job.failed += 1
+    if len(job.errors) < settings.DESIGN_IMPORT['MAX_ERRORS']:
+        job.errors.append({'file': file, 'error': message})
+
+
+def throughput(job):
+    """Images processed (imported or failed) per second so far"""
+    if job.started_at is None:
+        return 0.0
+    elapsed = ((job.finished_at or timezone.now()) - job.started_at).total_seconds()
+    return round((job.imported + job.failed) / elapsed, 1) if elapsed > 0 else 0.0
+
+
+def is_stalled(job):
+    """
+    Running with no batch finished for DESIGN_IMPORT['STALL_SECONDS'], or
+    still pending after that long (its worker died before the run started)
+    """
+    stalled_before = timezone.now() - timedelta(seconds=settings.DESIGN_IMPORT['STALL_SECONDS'])
+    return job.status in ('pending', 'running') and job.updated_at < stalled_before
+
+
+def run_import(job, workers=None, batch_size=None, progress=None):
+    """
+    Run (or resume) `job`: validate the manifest, skip rows whose key the
+    designer already has, normalize images in a process pool and insert
+    each batch with one bulk_create. Work finished before a crash is kept,
+    so re-running the same job only does what is left. `progress(job)` is
+    called after every batch.
+    """
+    options = settings.DESIGN_IMPORT
+    workers = workers or options['WORKERS'] or os.cpu_count()
+    batch_size = batch_size or options['BATCH_SIZE']
+
+    job.status = 'running'
+    job.started_at, job.finished_at = timezone.now(), None
+    job.total = job.imported = job.skipped = job.failed = 0
+    job.errors = []
+    job.save()
+    try:
+        categories = _category_lookup()
+        rows = []
+        keys = set()
+        for number, raw in enumerate(read_manifest(job.source, job.manifest), 1):
+            job.total += 1
+            try:
+                row = clean_row(raw, categories)
+                if row['key'] in keys:
+                    raise ManifestError(f'Duplicate key "{row["key"]}"')
+            except ManifestError as exc:
+                _record_error(job, raw.get('file'), f'Row {number}: {exc}')
+                continue
+            keys.add(row['key'])
+            rows.append(row)
+
+        done = set(
+            Design.objects.filter(designer_id=job.designer_id).exclude(import_key=None)
+            .values_list('import_key', flat=True)
+        )
+        todo = [row for row in rows if row['key'] not in done]
+        job.skipped = len(rows) - len(todo)
+        job.save()
+
+        batches = [todo[start:start + batch_size] for start in range(0, len(todo), batch_size)]
+        if batches:
+            # spawn: forking a threaded web worker (or one holding DB connections) isn't safe
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                def submit(batch):
+                    tasks = [(job.source, row['file'], options['MAX_DIMENSION'], options['JPEG_QUALITY']) for row in batch]
+                    return pool.map(normalize_image, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+
+                # Keep the next batch processing while this one is stored
+                results = submit(batches[0])
+                for index, batch in enumerate(batches):
+                    upcoming = submit(batches[index + 1]) if index + 1 < len(batches) else None
+                    _store_batch(job, batch, results)
+                    if progress:
+                        progress(job)
+                    results = upcoming
+        job.status = 'completed'
+    except Exception as exc:
+        job.status = 'failed'
+        _record_error(job, None, str(exc))
+        raise
+    finally:
+        job.finished_at = timezone.now()
+        job.save()
+        if job.imported:
+            invalidate_tags('design-list', 'design-counts', f'designer:{job.designer_id}')
+    return job
+
+
+def _store_batch(job, rows, results):
+    designs = []
+    for row, result in zip(rows, results):
+        if result[0] == 'error':
+            _record_error(job, row['file'], result[1])
+            continue
+        stem = slugify(posixpath.splitext(posixpath.basename(row['file']))[0])[:80] or 'design'
+        image = default_storage.save(f'designs/{stem}.jpg', ContentFile(result[1]))
+        designs.append(Design(
+            designer_id=job.designer_id,
+            title=row['title'],
+            description=row['description'] or None,
+            image=image,
+            category_id=row['category_id'],
+            status=job.design_status,
+            tags=row['tags'] or None,
+            price_range=row['price_range'] or None,
+            import_key=row['key'],
+        ))
+
+    # bulk_create skips the signals that keep platform stats current
+    with transaction.atomic():
+        Design.objects.bulk_create(designs)
+        apply_deltas({field: count * len(designs) for field, count in design_counters(job.design_status).items()})
+        job.imported += len(designs)
+        job.save(update_fields=['imported', 'failed', 'errors', 'updated_at'])
+
+
+def _run_in_background(job_id):
+    try:
+        job = run_import(DesignImport.objects.get(pk=job_id))
+        spool = os.path.abspath(settings.DESIGN_IMPORT['SPOOL_DIR']) + os.sep
+        if job.status == 'completed':
+            # Uploaded archives are only kept around for resuming
+            for path in (job.source, job.manifest):
+                if path and os.path.abspath(path).startswith(spool):
+                    os.remove(path)
+    except Exception:
+        logger.exception('Design import %s failed', job_id)
+    finally:
+        connections.close_all()
+
+
+def start_import(job):
+    """Run `job` in a background thread of this process"""
+    threading.Thread(target=_run_in_background, args=(job.pk,), name=f'design-import-{job.pk}', daemon=True).start()
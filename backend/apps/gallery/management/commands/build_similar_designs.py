@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from apps.gallery.similarity import build
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the "similar designs" table from likes and favorites '
+        '(run periodically, e.g. nightly via cron). Works through the designs in chunks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Designs scored per batch')
+
+    def handle(self, *args, **options):
+        stats = build(chunk_size=options['chunk_size'], progress=self.report)
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {stats['neighbors']} similar designs for {stats['designs']} designs"
+        ))
+
+    def report(self, stats):
+        self.stdout.write(f"  {stats['designs']} designs, {stats['neighbors']} neighbors")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from apps.gallery.uploads import collect_garbage
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete chunked upload sessions past their expiry, with their part files, '
+        'and part files left behind without a session. Run it periodically (e.g. hourly from cron).'
+    )
+
+    def handle(self, *args, **options):
+        sessions, files = collect_garbage()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {sessions} expired upload sessions and {files} part files'))
@@ -0,0 +1,71 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from apps.gallery.imports import ManifestError, run_import, throughput
+from apps.gallery.models import DesignImport
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk import designs for a designer from a directory or ZIP of images plus a CSV/JSON manifest. '
+        'Rows already imported (by manifest key) are skipped, so an interrupted import can simply be re-run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', nargs='?', help='Directory or ZIP file containing the images')
+        parser.add_argument('--designer', help='Username or id of the designer')
+        parser.add_argument('--manifest', default='', help='CSV/JSON manifest (default: manifest.csv/.json inside the source)')
+        parser.add_argument('--status', choices=['pending', 'approved'], default='pending', help='Status of the imported designs')
+        parser.add_argument('--workers', type=int, default=0, help='Image processes (default: DESIGN_IMPORT setting, else CPU count)')
+        parser.add_argument('--batch-size', type=int, default=0, help='Rows per bulk insert (default: DESIGN_IMPORT setting)')
+        parser.add_argument('--resume', type=int, metavar='IMPORT_ID', help='Re-run a previous import with its original source and options')
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            job = DesignImport.objects.filter(pk=options['resume']).first()
+            if job is None:
+                raise CommandError(f"Import #{options['resume']} does not exist")
+        else:
+            job = self.create_job(options)
+
+        self.stdout.write(f'Import #{job.pk}: {job.source} for designer {job.designer_id}')
+        try:
+            run_import(job, workers=options['workers'], batch_size=options['batch_size'], progress=self.report)
+        except ManifestError as exc:
+            raise CommandError(str(exc))
+
+        for error in job.errors:
+            self.stderr.write(f"  {error['file'] or '-'}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {job.imported}, skipped {job.skipped} already imported, failed {job.failed} '
+            f'of {job.total} in {(job.finished_at - job.started_at).total_seconds():.1f}s '
+            f'({throughput(job)} images/s)'
+        ))
+
+    def create_job(self, options):
+        source, designer = options['source'], options['designer']
+        if not source or not designer:
+            raise CommandError('Give a source and --designer (or --resume IMPORT_ID)')
+        if not os.path.exists(source):
+            raise CommandError(f'{source} does not exist')
+        if options['manifest'] and not os.path.isfile(options['manifest']):
+            raise CommandError(f"{options['manifest']} does not exist")
+
+        lookup = Q(username=designer) | Q(pk=int(designer)) if designer.isdigit() else Q(username=designer)
+        user = User.objects.filter(lookup, role='designer').first()
+        if user is None:
+            raise CommandError(f'No designer "{designer}"')
+        return DesignImport.objects.create(
+            designer=user,
+            source=os.path.abspath(source),
+            manifest=os.path.abspath(options['manifest']) if options['manifest'] else '',
+            design_status=options['status'],
+        )
+
+    def report(self, job):
+        done = job.skipped + job.imported + job.failed
+        self.stdout.write(f'  {done}/{job.total} ({job.imported} imported, {job.failed} failed, {throughput(job)} images/s)')
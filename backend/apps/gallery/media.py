@@ -0,0 +1,23 @@
+from apps.core.media import PRIVATE, PUBLIC, has_valid_signature, request_user
+from .models import Design
+
+
+def design_image_access(request, name):
+    """
+    Images of approved designs are public. Any other design image is only
+    served to its designer, admins, or with a signed URL (see
+    DesignImageField); files no design refers to aren't served.
+    """
+    designs = list(Design.objects.filter(image=name).values_list('status', 'designer_id'))
+    if not designs:
+        return None
+    if any(status == 'approved' for status, _ in designs):
+        return PUBLIC
+    if has_valid_signature(request, name):
+        return PRIVATE
+    user = request_user(request)
+    if user is not None and (
+        user.role == 'admin' or user.is_superuser or any(designer_id == user.pk for _, designer_id in designs)
+    ):
+        return PRIVATE
+    return None
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 14:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='design',
+            index=models.Index(fields=['status', 'created_at'], name='gallery_des_status_65c9c3_idx'),
+        ),
+    ]
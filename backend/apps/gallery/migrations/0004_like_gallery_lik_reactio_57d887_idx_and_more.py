@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-19 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0003_design_gallery_des_status_65c9c3_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(fields=['reaction_type', 'id'], name='gallery_lik_reactio_57d887_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_reported', True)), fields=['created_at'], name='review_reported_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0006_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='design',
+            name='image',
+            field=models.ImageField(db_index=True, upload_to='designs/'),
+        ),
+    ]
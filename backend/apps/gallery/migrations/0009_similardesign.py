@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-19 15:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0008_category_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarDesign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('design', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='similar_designs', to='gallery.design')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='gallery.design')),
+            ],
+            options={
+                'ordering': ['design', 'rank'],
+                'unique_together': {('design', 'rank')},
+            },
+        ),
+    ]
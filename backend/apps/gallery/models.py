@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -12,6 +14,7 @@ class Category(models.Model):
     description = models.TextField(blank=True, null=True)
     icon = models.CharField(max_length=50, blank=True, null=True)  # For icon class names
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['name']
@@ -34,7 +37,8 @@ class Design(models.Model):
     designer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='designs')
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
-    image = models.ImageField(upload_to='designs/')
+    # Indexed for the access check on every media request (apps/gallery/media.py)
+    image = models.ImageField(upload_to='designs/', db_index=True)
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name='designs')
     
     # Metadata
@@ -49,11 +53,21 @@ class Design(models.Model):
     # Pricing (optional)
     price_range = models.CharField(max_length=100, blank=True, null=True, help_text="e.g., $50-$100")
     
+    # Manifest key of a bulk-imported design; re-running an import skips keys already present
+    import_key = models.CharField(max_length=255, blank=True, null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Moderation queue: oldest pending first
+            models.Index(fields=['status', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['designer', 'import_key'], name='design_unique_import_key'),
+        ]
     
     def __str__(self):
         return f"{self.title} by {self.designer.username}"
@@ -80,6 +94,10 @@ class Like(models.Model):
     class Meta:
         unique_together = ('user', 'design')
         ordering = ['-created_at']
+        indexes = [
+            # Admin changelist: filter by reaction, newest first
+            models.Index(fields=['reaction_type', 'id']),
+        ]
     
     def __str__(self):
         return f"{self.user.username} {self.reaction_type}s {self.design.title}"
@@ -125,6 +143,102 @@ class Review(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ('customer', 'designer')  # One review per customer-designer pair
+        indexes = [
+            # Reported reviews are a tiny fraction; index only those
+            models.Index(fields=['created_at'], name='review_reported_idx', condition=models.Q(is_reported=True)),
+        ]
+    
+    def __str__(self):
+        return f"Review by {self.customer.username} for {self.designer.username} - {self.rating}★"
+
+
+class DesignImport(models.Model):
+    """
+    A bulk import of designs for one designer from a directory or ZIP plus
+    a CSV/JSON manifest. Progress counters are updated after every batch,
+    so a stalled or failed import can be inspected and resumed.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+    
+    designer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='design_imports')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    source = models.CharField(max_length=500, help_text="Directory or ZIP file on the server")
+    manifest = models.CharField(max_length=500, blank=True, help_text="Manifest path; blank to use the one in the source")
+    design_status = models.CharField(max_length=20, choices=Design.STATUS_CHOICES, default='pending')
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    total = models.IntegerField(default=0)
+    imported = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Import #{self.pk} for {self.designer_id} ({self.status})"
+
+
+class UploadSession(models.Model):
+    """
+    A resumable, chunked upload of one design image. Chunks are appended
+    to a part file on disk; `offset` is how many bytes are stored, so a
+    client that lost its connection asks for it and carries on from there.
+    """
+    STATUS_CHOICES = (
+        ('open', 'Open'),
+        # Claimed by the request finishing it
+        ('completing', 'Completing'),
+        ('complete', 'Complete'),
+    )
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField(help_text="Declared size of the whole file in bytes")
+    offset = models.BigIntegerField(default=0, help_text="Bytes received so far")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
+    design = models.ForeignKey(Design, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    
+    # Pushed back by every chunk; expired sessions are removed by cleanup_uploads
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Upload {self.pk} by {self.user_id} ({self.offset}/{self.size})"
+
+
+class SimilarDesign(models.Model):
+    """
+    Precomputed "similar designs": the top neighbors of each design by
+    co-likes and co-favorites, rebuilt by build_similar_designs
+    """
+    # Served through the (design, rank) unique index; no separate one needed
+    design = models.ForeignKey(Design, on_delete=models.CASCADE, related_name='similar_designs', db_index=False)
+    similar = models.ForeignKey(Design, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    
+    class Meta:
+        unique_together = ('design', 'rank')
+        ordering = ['design', 'rank']
     
     def __str__(self):
-        return f"Review by {self.customer.username} for {self.designer.username} - {self.rating}★"
\ No newline at end of file
+        return f"{self.design_id} -> {self.similar_id} (#{self.rank})"
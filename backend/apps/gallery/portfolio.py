@@ -0,0 +1,81 @@
+import json
+import posixpath
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from apps.core.streaming import stream_zip, streaming_response
+from .models import Design
+
+CHUNK_SIZE = 64 * 1024
+
+MANIFEST_FIELDS = (
+    'id', 'title', 'description', 'category__name', 'tags', 'price_range', 'status',
+    'likes_count', 'dislikes_count', 'views_count', 'created_at', 'image', 'import_key',
+)
+
+
+def _designs(designer):
+    return Design.objects.filter(designer=designer).order_by('pk')
+
+
+def _archive_name(design_id, image):
+    return f'images/{design_id}-{posixpath.basename(image)}' if image else None
+
+
+def _file_chunks(file):
+    with file:
+        yield from file.chunks(CHUNK_SIZE)
+
+
+def _manifest_chunks(designer, missing):
+    """manifest.json, one row at a time; readable by the import_designs command"""
+    yield b'['
+    separator = b'\n'
+    for row in _designs(designer).values(*MANIFEST_FIELDS).iterator(chunk_size=500):
+        file = _archive_name(row['id'], row['image'])
+        yield separator + json.dumps({
+            'file': None if row['id'] in missing else file,
+            'title': row['title'],
+            'description': row['description'],
+            'category': row['category__name'],
+            'tags': row['tags'],
+            'price_range': row['price_range'],
+            'key': row['import_key'] or file,
+            'id': row['id'],
+            'status': row['status'],
+            'likes_count': row['likes_count'],
+            'dislikes_count': row['dislikes_count'],
+            'views_count': row['views_count'],
+            'created_at': row['created_at'].isoformat(),
+        }).encode()
+        separator = b',\n'
+    yield b'\n]\n'
+
+
+def portfolio_entries(designer, manifest=True):
+    """ZIP entries for every design image of `designer`, then manifest.json"""
+    missing = set()
+    designs = _designs(designer).values_list('pk', 'image', 'created_at')
+    for pk, image, created_at in designs.iterator(chunk_size=500):
+        if not image:
+            continue
+        try:
+            file = default_storage.open(image, 'rb')
+        except FileNotFoundError:
+            missing.add(pk)
+            continue
+        created = timezone.localtime(created_at)
+        # JPEG/PNG/WebP are compressed already; storing them saves CPU
+        yield _archive_name(pk, image), _file_chunks(file), created.timetuple()[:6], False
+    if manifest:
+        yield 'manifest.json', _manifest_chunks(designer, missing), timezone.localtime().timetuple()[:6], True
+
+
+def portfolio_response(request, designer):
+    """Stream `designer`'s portfolio as a ZIP; ?manifest=false leaves out manifest.json"""
+    manifest = request.query_params.get('manifest', 'true').lower() not in ('0', 'false')
+    response = streaming_response(
+        request, stream_zip(portfolio_entries(designer, manifest)), content_type='application/zip'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{designer.username}-portfolio.zip"'
+    return response
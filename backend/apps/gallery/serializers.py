@@ -1,23 +1,56 @@
+import os
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Exists, OuterRef
 from rest_framework import serializers
-from .models import Category, Design, Like, Favorite, Review
+from .models import Category, Design, Like, Favorite, Review, UploadSession
 from django.contrib.auth import get_user_model
+from apps.core.fast_serializers import ValuesSerializer
+from apps.core.fieldsets import SparseFieldsetMixin
+from apps.core.media import signed_url
 
 User = get_user_model()
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class DesignImageField(serializers.ImageField):
+    """
+    Design.image. Images of designs that aren't approved are only served
+    with credentials, which <img> tags don't send, so those get a signed URL.
+    """
+    extra_sources = ('status',)
+    
+    def to_representation(self, value):
+        if not value or getattr(value.instance, 'status', 'approved') == 'approved':
+            return super().to_representation(value)
+        url = signed_url(value.name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+
+class DesignImageMixin:
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping, models.ImageField: DesignImageField
+    }
+
+
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     designs_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Category
         fields = ['id', 'name', 'slug', 'description', 'icon', 'designs_count', 'created_at']
         read_only_fields = ['id', 'created_at']
+        method_field_sources = {'designs_count': []}
     
     def get_designs_count(self, obj):
+        # Annotated by CategoryListView; single categories count on their own
+        if hasattr(obj, 'approved_designs'):
+            return obj.approved_designs
         return obj.designs.filter(status='approved').count()
 
 
-class DesignListSerializer(serializers.ModelSerializer):
+class DesignListSerializer(DesignImageMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     designer_name = serializers.CharField(source='designer.username', read_only=True)
     designer_profile_picture = serializers.ImageField(source='designer.profile_picture', read_only=True)
     category_name = serializers.CharField(source='category.name', read_only=True)
@@ -32,21 +65,55 @@ class DesignListSerializer(serializers.ModelSerializer):
             'likes_count', 'dislikes_count', 'views_count',
             'is_liked', 'is_favorited', 'created_at'
         ]
+        method_field_sources = {'is_liked': [], 'is_favorited': []}
     
     def get_is_liked(self, obj):
+        if hasattr(obj, 'viewer_liked'):
+            return obj.viewer_liked
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return Like.objects.filter(user=request.user, design=obj, reaction_type='like').exists()
         return False
     
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'viewer_favorited'):
+            return obj.viewer_favorited
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return Favorite.objects.filter(user=request.user, design=obj).exists()
         return False
 
 
-class DesignDetailSerializer(serializers.ModelSerializer):
+def with_viewer_flags(queryset, request):
+    """Annotate designs with the viewer's is_liked/is_favorited, read by DesignListSerializer"""
+    if not request.user.is_authenticated:
+        return queryset
+    return queryset.annotate(
+        viewer_liked=Exists(Like.objects.filter(user=request.user, design=OuterRef('pk'), reaction_type='like')),
+        viewer_favorited=Exists(Favorite.objects.filter(user=request.user, design=OuterRef('pk'))),
+    )
+
+
+def _viewer_flag(model, **filters):
+    """is_liked/is_favorited for a page of rows with one query"""
+    def prepare(rows, context):
+        request = context.get('request')
+        if not (request and request.user.is_authenticated):
+            return lambda row: False
+        ids = set(model.objects.filter(
+            user=request.user, design_id__in=[row['id'] for row in rows], **filters
+        ).values_list('design_id', flat=True))
+        return lambda row: row['id'] in ids
+    return ('id',), prepare
+
+
+fast_design_list = ValuesSerializer(DesignListSerializer, method_fields={
+    'is_liked': _viewer_flag(Like, reaction_type='like'),
+    'is_favorited': _viewer_flag(Favorite),
+})
+
+
+class DesignDetailSerializer(DesignImageMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     designer_name = serializers.CharField(source='designer.username', read_only=True)
     designer_id = serializers.IntegerField(source='designer.id', read_only=True)
     designer_profile_picture = serializers.ImageField(source='designer.profile_picture', read_only=True)
@@ -60,6 +127,7 @@ class DesignDetailSerializer(serializers.ModelSerializer):
         model = Design
         fields = '__all__'
         read_only_fields = ['designer', 'likes_count', 'dislikes_count', 'views_count', 'created_at', 'updated_at']
+        method_field_sources = {'is_liked': [], 'is_favorited': [], 'tags_list': ['tags']}
     
     def get_is_liked(self, obj):
         request = self.context.get('request')
@@ -79,7 +147,7 @@ class DesignDetailSerializer(serializers.ModelSerializer):
         return []
 
 
-class DesignSerializer(serializers.ModelSerializer):
+class DesignSerializer(DesignImageMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Design
         fields = '__all__'
@@ -92,14 +160,14 @@ class DesignSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class LikeSerializer(serializers.ModelSerializer):
+class LikeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Like
         fields = ['id', 'design', 'reaction_type', 'created_at']
         read_only_fields = ['id', 'created_at']
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
+class FavoriteSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     design_details = DesignListSerializer(source='design', read_only=True)
     
     class Meta:
@@ -108,7 +176,7 @@ class FavoriteSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.username', read_only=True)
     customer_profile_picture = serializers.ImageField(source='customer.profile_picture', read_only=True)
     designer_name = serializers.CharField(source='designer.username', read_only=True)
@@ -122,3 +190,24 @@ class ReviewSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         validated_data['customer'] = request.user
         return super().create(validated_data)
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'size', 'offset', 'status', 'design', 'expires_at', 'created_at']
+        read_only_fields = ['id', 'offset', 'status', 'design', 'expires_at', 'created_at']
+    
+    def validate_filename(self, value):
+        name = os.path.basename(value.replace('\\', '/')).strip()
+        if not name:
+            raise serializers.ValidationError('A file name is required')
+        return name
+    
+    def validate_size(self, value):
+        limit = settings.CHUNKED_UPLOADS['MAX_SIZE']
+        if value <= 0:
+            raise serializers.ValidationError('The file is empty')
+        if value > limit:
+            raise serializers.ValidationError(f'Files can be at most {limit} bytes')
+        return value
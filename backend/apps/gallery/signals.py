@@ -0,0 +1,30 @@
+from django.db.models.signals import post_save, post_delete
+from apps.core.response_cache import invalidate_tags_on_commit
+from .models import Category, Design, Review
+
+# Saves touching only these fields (reactions, views) only affect the design's own page
+DESIGN_COUNTER_FIELDS = {'likes_count', 'dislikes_count', 'views_count'}
+
+
+def invalidate_design(sender, instance, update_fields=None, **kwargs):
+    """Drop cached responses showing this design"""
+    tags = [f'design:{instance.pk}']
+    # Counter-only saves leave lists, counts and designer pages to expire by TTL
+    if not (update_fields and set(update_fields) <= DESIGN_COUNTER_FIELDS):
+        tags += ['design-list', 'design-counts', f'designer:{instance.designer_id}']
+    invalidate_tags_on_commit(*tags)
+
+
+def invalidate_category(sender, instance, **kwargs):
+    """Drop cached category lists and design lists showing category names"""
+    invalidate_tags_on_commit('categories', 'design-list')
+
+
+def invalidate_review(sender, instance, **kwargs):
+    """Drop the cached profile of the reviewed designer"""
+    invalidate_tags_on_commit(f'designer:{instance.designer_id}')
+
+
+for model, handler in ((Design, invalidate_design), (Category, invalidate_category), (Review, invalidate_review)):
+    post_save.connect(handler, sender=model, dispatch_uid=f'response-cache-save-{model.__name__}')
+    post_delete.connect(handler, sender=model, dispatch_uid=f'response-cache-delete-{model.__name__}')
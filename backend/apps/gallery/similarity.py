@@ -0,0 +1,176 @@
+"""
+Item-to-item "similar designs". build() turns likes and favorites on
+approved designs into a sparse users x designs matrix and scores every
+pair of designs by cosine similarity, damped for pairs few users have in
+common. The product is taken a block of designs at a time, so memory
+follows the block rather than designs squared, and each design's best
+neighbors are written to SimilarDesign. similar_design_ids() reads them
+back and tops up designs with few or none (new ones, mostly) with popular
+designs from the same category and tags.
+"""
+import functools
+import operator
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from apps.core.response_cache import invalidate_tags
+from .models import Design, Favorite, Like, SimilarDesign
+
+READ_SIZE = 50000
+FALLBACK_TAGS = 5
+
+
+def _interactions(queryset):
+    """(user id, design id) rows of `queryset` on approved designs, read in pk order"""
+    queryset = queryset.filter(design__status='approved').order_by('pk').values_list('pk', 'user_id', 'design_id')
+    chunks = []
+    last_pk = 0
+    while True:
+        rows = np.array(list(queryset.filter(pk__gt=last_pk)[:READ_SIZE]), dtype=np.int64).reshape(-1, 3)
+        if not len(rows):
+            break
+        last_pk = int(rows[-1, 0])
+        chunks.append(rows[:, 1:])
+    return np.concatenate(chunks) if chunks else np.empty((0, 2), dtype=np.int64)
+
+
+def _matrix():
+    """Weighted users x designs matrix, and the design id of each column"""
+    likes = _interactions(Like.objects.filter(reaction_type='like'))
+    favorites = _interactions(Favorite.objects.all())
+    pairs = np.concatenate([likes, favorites])
+    weights = np.concatenate([
+        np.ones(len(likes)), np.full(len(favorites), settings.SIMILAR_DESIGNS['FAVORITE_WEIGHT'])
+    ])
+    user_ids, rows = np.unique(pairs[:, 0], return_inverse=True)
+    design_ids, columns = np.unique(pairs[:, 1], return_inverse=True)
+    # A design both liked and favorited by someone gets both weights
+    matrix = sparse.csr_matrix((weights, (rows, columns)), shape=(len(user_ids), len(design_ids)))
+    return matrix, design_ids.tolist()
+
+
+def _same_pattern(a, b):
+    return a.shape == b.shape and np.array_equal(a.indptr, b.indptr) and np.array_equal(a.indices, b.indices)
+
+
+def _on_pattern(values, pattern):
+    """`values` read at the stored entries of `pattern` (CSR, sorted indices), zero where it has none"""
+    rows = np.repeat(np.arange(pattern.shape[0]), np.diff(pattern.indptr))
+    aligned = pattern.astype(np.float64)
+    aligned.data = np.asarray(values[rows, pattern.indices], dtype=np.float64).ravel()
+    return aligned
+
+
+def _top_neighbors(scores, common, offset):
+    """
+    (row, column, rank, score) arrays of the best columns of each row of a
+    block of the design x design product starting at design `offset`.
+    `scores` and `common` must share a sparsity pattern.
+    """
+    if not _same_pattern(scores, common):
+        raise ValueError('scores and common users must have the same sparsity pattern')
+    options = settings.SIMILAR_DESIGNS
+    rows = np.repeat(np.arange(scores.shape[0]), np.diff(scores.indptr))
+    columns = scores.indices
+    values = scores.data * common.data / (common.data + options['SHRINKAGE'])
+    keep = (common.data >= options['MIN_COMMON_USERS']) & (columns != rows + offset)
+    rows, columns, values = rows[keep], columns[keep], values[keep]
+
+    # By row, best first; ties go to the older design
+    order = np.lexsort((columns, -values, rows))
+    rows, columns, values = rows[order], columns[order], values[order]
+    ranks = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    keep = ranks < options['NEIGHBORS']
+    return rows[keep], columns[keep], ranks[keep], values[keep]
+
+
+def build(chunk_size=1000, progress=None):
+    """
+    Recompute SimilarDesign from likes and favorites, `chunk_size` designs
+    at a time. Each chunk replaces its designs' rows in one transaction, so
+    the table stays readable throughout. Returns Counter of designs and
+    neighbors stored. `progress(stats)` is called after every chunk.
+    """
+    matrix, design_ids = _matrix()
+    stats = Counter(designs=0, neighbors=0)
+    if not design_ids:
+        SimilarDesign.objects.all().delete()
+        invalidate_tags('similar-designs')
+        return stats
+
+    # Every column has an entry, so no norm is zero
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    normalized = (matrix @ sparse.diags(1 / norms)).tocsr()
+    binary = matrix.copy()
+    binary.data[:] = 1
+    normalized_t, binary_t = normalized.T.tocsr(), binary.T.tocsr()
+
+    for start in range(0, len(design_ids), chunk_size):
+        end = min(start + chunk_size, len(design_ids))
+        scores = (normalized_t[start:end] @ normalized).tocsr()
+        common = (binary_t[start:end] @ binary).tocsr()
+        scores.sort_indices()
+        common.sort_indices()
+        # All weights are positive, so the patterns match unless a score underflowed
+        # to zero and was dropped; then read the scores at every pair with users in common
+        if not _same_pattern(scores, common):
+            scores = _on_pattern(scores, common)
+        rows, columns, ranks, values = _top_neighbors(scores, common, start)
+
+        # The chunk owns ids from its first design up to the next chunk's, so rows
+        # of designs that lost their likes or approval go too
+        stale = SimilarDesign.objects.all()
+        if start:
+            stale = stale.filter(design_id__gte=design_ids[start])
+        if end < len(design_ids):
+            stale = stale.filter(design_id__lt=design_ids[end])
+        with transaction.atomic():
+            stale.delete()
+            SimilarDesign.objects.bulk_create([
+                SimilarDesign(design_id=design_ids[start + row], similar_id=design_ids[column], rank=rank, score=score)
+                for row, column, rank, score in zip(rows.tolist(), columns.tolist(), ranks.tolist(), values.tolist())
+            ], batch_size=1000)
+        stats['designs'] += len(np.unique(rows))
+        stats['neighbors'] += len(rows)
+        if progress:
+            progress(stats)
+    invalidate_tags('similar-designs')
+    return stats
+
+
+def tag_list(tags):
+    return [tag.strip() for tag in (tags or '').split(',') if tag.strip()]
+
+
+def similar_design_ids(design, limit):
+    """
+    Ids of up to `limit` approved designs similar to `design`, best first:
+    its stored neighbors, then popular designs sharing its category and a
+    tag, its category, or (without a category) a tag.
+    """
+    ids = list(
+        SimilarDesign.objects.filter(design=design, similar__status='approved')
+        .order_by('rank').values_list('similar_id', flat=True)[:limit]
+    )
+    if len(ids) >= limit:
+        return ids
+
+    popular = Design.objects.filter(status='approved').exclude(pk=design.pk).order_by('-likes_count', '-created_at')
+    tags = tag_list(design.tags)[:FALLBACK_TAGS]
+    shares_tag = functools.reduce(operator.or_, (Q(tags__icontains=tag) for tag in tags)) if tags else None
+    fallbacks = []
+    if design.category_id:
+        if shares_tag:
+            fallbacks.append(popular.filter(shares_tag, category_id=design.category_id))
+        fallbacks.append(popular.filter(category_id=design.category_id))
+    elif shares_tag:
+        fallbacks.append(popular.filter(shares_tag))
+    for queryset in fallbacks:
+        ids.extend(queryset.exclude(pk__in=ids).values_list('pk', flat=True)[:limit - len(ids)])
+        if len(ids) >= limit:
+            break
+    return ids
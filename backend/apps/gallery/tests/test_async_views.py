@@ -0,0 +1,119 @@
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from apps.core.testing import clear_caches
+from apps.gallery.async_views import design_detail, design_list, trending
+from apps.gallery.models import Category, Design
+from apps.users.async_views import designer_list
+
+User = get_user_model()
+
+
+@override_settings(THROTTLING={**settings.THROTTLING, 'ENABLED': False}, WRITE_QUEUE={**settings.WRITE_QUEUE, 'ENABLED': False})
+class AsyncReadViewTests(TestCase):
+    """The async views answer exactly as the sync DRF views they stand in for"""
+    @classmethod
+    def setUpTestData(cls):
+        designers = [
+            User.objects.create_user(f'designer{i}', f'd{i}@example.com', 'pw', role='designer', is_approved=True)
+            for i in range(2)
+        ]
+        cls.category = Category.objects.create(name='Bridal', slug='bridal')
+        cls.designs = [
+            Design.objects.create(
+                designer=designers[i % 2], category=cls.category if i % 3 else None, title=f'Design {i}',
+                image=f'designs/{i}.jpg', tags='peacock, floral' if i % 2 else 'lotus',
+                likes_count=i * 7 % 10, status='approved' if i != 3 else 'pending',
+            )
+            for i in range(15)
+        ]
+
+    def setUp(self):
+        clear_caches()
+        self.factory = AsyncRequestFactory()
+
+    def get(self, view, path, **kwargs):
+        return async_to_sync(view)(self.factory.get(path), **kwargs)
+
+    def assertSameResponse(self, view, path, **kwargs):
+        expected = self.client.get(path)
+        clear_caches()
+        response = self.get(view, path, **kwargs)
+        self.assertEqual(response.status_code, expected.status_code, path)
+        self.assertEqual(response['Content-Type'], expected['Content-Type'], path)
+        self.assertEqual(response.content, expected.content, path)
+        self.assertEqual(response.get('ETag'), expected.get('ETag'), path)
+        return response
+
+    def test_design_list_matches_the_drf_view(self):
+        for query in (
+            '', '?page=2', '?page=9', '?page=x', '?search=peacock lotus', '?search=floral&ordering=-likes_count',
+            f'?category={self.category.pk}', '?ordering=title', '?fields=id,title', '?omit=designer_name',
+            '?status=pending', '?category=x',
+        ):
+            with self.subTest(query=query):
+                self.assertSameResponse(design_list, f'/api/gallery/designs/{query}')
+
+    def test_design_detail_matches_the_drf_view(self):
+        design = self.designs[4]
+        for path in (f'/api/gallery/designs/{design.pk}/', f'/api/gallery/designs/{design.pk}/?fields=id,title,views_count'):
+            with self.subTest(path=path):
+                expected = self.client.get(path)
+                clear_caches()
+                response = self.get(design_detail, path, pk=design.pk)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['ETag'], expected['ETag'])
+                # Each counted its own view
+                self.assertEqual(json.loads(response.content), {**expected.json(), 'views_count': expected.json()['views_count'] + 1})
+        # Pending and missing designs are 404s
+        self.assertSameResponse(design_detail, f'/api/gallery/designs/{self.designs[3].pk}/', pk=self.designs[3].pk)
+        self.assertSameResponse(design_detail, '/api/gallery/designs/999/', pk=999)
+
+    def test_detail_counts_views_and_answers_304(self):
+        design = self.designs[4]
+        path = f'/api/gallery/designs/{design.pk}/'
+        etag = self.get(design_detail, path, pk=design.pk)['ETag']
+        
+        response = async_to_sync(design_detail)(self.factory.get(path, headers={'If-None-Match': etag}), pk=design.pk)
+        
+        self.assertEqual(response.status_code, 304)
+        design.refresh_from_db()
+        self.assertEqual(design.views_count, 2)
+
+    def test_trending_and_designers_match_the_drf_views(self):
+        self.assertSameResponse(trending, '/api/gallery/trending/')
+        for query in ('', '?search=designer1', '?ordering=username', '?page=2'):
+            with self.subTest(query=query):
+                self.assertSameResponse(designer_list, f'/api/users/designers/{query}')
+
+    def test_cached_responses_are_shared_with_the_drf_view(self):
+        self.client.get('/api/gallery/designs/')
+        Design.objects.filter(pk=self.designs[0].pk).update(title='Changed behind the cache')
+        
+        response = self.get(design_list, '/api/gallery/designs/')
+        
+        self.assertNotIn(b'Changed behind the cache', response.content)
+
+    def test_throttles_apply(self):
+        with override_settings(THROTTLING={**settings.THROTTLING, 'ENABLED': True}), \
+                mock.patch('apps.core.throttling.IPBucketThrottle.allow_request', return_value=False), \
+                mock.patch('apps.core.throttling.IPBucketThrottle.wait', return_value=30):
+            for view, path, kwargs in (
+                (design_list, '/api/gallery/designs/', {}),
+                (design_detail, f'/api/gallery/designs/{self.designs[4].pk}/', {'pk': self.designs[4].pk}),
+                (trending, '/api/gallery/trending/', {}),
+                (designer_list, '/api/users/designers/', {}),
+            ):
+                with self.subTest(path=path):
+                    response = self.get(view, path, **kwargs)
+                    self.assertEqual(response.status_code, 429)
+                    self.assertEqual(response['Retry-After'], '30')
+
+    def test_sparse_fieldsets(self):
+        response = self.get(design_list, '/api/gallery/designs/?fields=id,title')
+        
+        self.assertEqual(set(json.loads(response.content)['results'][0]), {'id', 'title'})
@@ -0,0 +1,131 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.core.testing import assert_max_queries, clear_caches
+from apps.gallery.models import Category, Design
+
+User = get_user_model()
+
+
+@override_settings(THROTTLING={**settings.THROTTLING, 'ENABLED': False}, CONDITIONAL_GET=True)
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user('customer', 'c@example.com', 'pw', role='customer')
+        cls.other = User.objects.create_user('other', 'o@example.com', 'pw', role='customer')
+        cls.designer = User.objects.create_user('designer', 'd@example.com', 'pw', role='designer', is_approved=True)
+        cls.category = Category.objects.create(name='Bridal', slug='bridal')
+        cls.design = Design.objects.create(
+            designer=cls.designer, category=cls.category, title='Peacock',
+            image='designs/peacock.jpg', status='approved',
+        )
+
+    def setUp(self):
+        clear_caches()
+        self.user_client = APIClient()
+        self.user_client.force_authenticate(self.customer)
+
+    def detail(self):
+        return f'/api/gallery/designs/{self.design.pk}/'
+
+    def test_matching_etag_gets_304(self):
+        first = self.client.get(self.detail())
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first['ETag'].startswith('W/"'))
+        self.assertIn('Last-Modified', first)
+        
+        second = self.client.get(self.detail(), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.content, b'')
+
+    def test_if_modified_since_gets_304(self):
+        first = self.client.get(self.detail())
+        
+        second = self.client.get(self.detail(), HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(second.status_code, 304)
+
+    def test_stale_etag_gets_the_body(self):
+        response = self.client.get(self.detail(), HTTP_IF_NONE_MATCH='W/"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'Peacock')
+
+    def test_update_changes_etag(self):
+        before = self.client.get(self.detail())['ETag']
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.design.title = 'Peacock feather'
+            self.design.save()
+        response = self.client.get(self.detail(), HTTP_IF_NONE_MATCH=before)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], before)
+        self.assertEqual(response.json()['title'], 'Peacock feather')
+
+    def test_reaction_changes_etag(self):
+        before = self.client.get(self.detail())['ETag']
+        # Anonymous lists keep their counts until RESPONSE_CACHE['TIMEOUT']; viewers' are validated live
+        list_before = self.user_client.get('/api/gallery/designs/')['ETag']
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.user_client.post(f'{self.detail()}like/', {'reaction_type': 'like'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        
+        detail = self.client.get(self.detail(), HTTP_IF_NONE_MATCH=before)
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(detail.json()['likes_count'], 1)
+        listing = self.user_client.get('/api/gallery/designs/', HTTP_IF_NONE_MATCH=list_before)
+        self.assertEqual(listing.status_code, 200)
+
+    def test_etag_differs_per_viewer(self):
+        other_client = APIClient()
+        other_client.force_authenticate(self.other)
+        
+        anonymous = self.client.get(self.detail())['ETag']
+        customer = self.user_client.get(self.detail())['ETag']
+        other = other_client.get(self.detail())['ETag']
+        
+        self.assertEqual(len({anonymous, customer, other}), 3)
+        # is_liked/is_favorited are per viewer, so one viewer's ETag can't revalidate another's copy
+        self.assertEqual(other_client.get(self.detail(), HTTP_IF_NONE_MATCH=customer).status_code, 200)
+        self.assertEqual(self.user_client.get(self.detail(), HTTP_IF_NONE_MATCH=customer).status_code, 304)
+
+    def test_etag_differs_per_query(self):
+        full = self.client.get('/api/gallery/designs/')['ETag']
+        sparse = self.client.get('/api/gallery/designs/?fields=id,title')['ETag']
+        searched = self.client.get('/api/gallery/designs/?search=peacock')['ETag']
+        
+        self.assertEqual(len({full, sparse, searched}), 3)
+        response = self.client.get('/api/gallery/designs/?fields=id,title', HTTP_IF_NONE_MATCH=full)
+        self.assertEqual(response.status_code, 200)
+
+    def test_anonymous_validators_come_from_the_cache(self):
+        etag = self.client.get('/api/gallery/designs/')['ETag']
+        
+        with assert_max_queries(0):
+            response = self.client.get('/api/gallery/designs/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        
+        # A write drops the cached validators along with the cached body
+        with self.captureOnCommitCallbacks(execute=True):
+            Design.objects.create(
+                designer=self.designer, category=self.category, title='Lotus',
+                image='designs/lotus.jpg', status='approved',
+            )
+        response = self.client.get('/api/gallery/designs/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 2)
+
+    def test_authenticated_validators_are_not_cached(self):
+        etag = self.user_client.get('/api/gallery/designs/')['ETag']
+        
+        with assert_max_queries(1) as recorder:
+            response = self.user_client.get('/api/gallery/designs/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(recorder.count, 1)
+
+    @override_settings(CONDITIONAL_GET=False)
+    def test_disabled(self):
+        response = self.client.get(self.detail())
+        self.assertNotIn('ETag', response)
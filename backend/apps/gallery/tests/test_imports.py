@@ -0,0 +1,297 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import zipfile
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+from apps.admin_panel.models import PlatformStats
+from apps.admin_panel.stats import STATS_PK, compute_counters, reconcile
+from apps.core.testing import clear_caches
+from apps.gallery.imports import ManifestError, _store_batch, clean_row, parse_manifest, run_import
+from apps.gallery.models import Category, Design, DesignImport
+
+User = get_user_model()
+
+
+def jpeg_bytes(size=(40, 30)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 80, 40)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def csv_manifest(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=['file', 'title', 'category', 'tags', 'key'])
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+class ManifestTests(SimpleTestCase):
+    categories = {'bridal': 1, 'bridal-mehndi': 1}
+
+    def test_csv_and_json(self):
+        rows = parse_manifest(csv_manifest([{'file': 'a.jpg', 'title': 'A'}]), 'manifest.csv')
+        self.assertEqual(rows[0]['file'], 'a.jpg')
+        
+        rows = parse_manifest(json.dumps({'designs': [{'file': 'a.jpg', 'title': 'A'}]}).encode(), 'manifest.json')
+        self.assertEqual(rows, [{'file': 'a.jpg', 'title': 'A'}])
+
+    def test_unreadable_manifest(self):
+        with self.assertRaises(ManifestError):
+            parse_manifest(b'{not json', 'manifest.json')
+        with self.assertRaises(ManifestError):
+            parse_manifest(b'["a.jpg"]', 'manifest.json')
+        with self.assertRaises(ManifestError):
+            parse_manifest(b'{"items": []}', 'manifest.json')
+
+    def test_clean_row(self):
+        row = clean_row(
+            {'file': 'photos\\a.jpg', 'title': ' Peacock ', 'category': 'Bridal-Mehndi', 'tags': ['floral', ' bridal']},
+            self.categories,
+        )
+        
+        self.assertEqual(row['file'], 'photos/a.jpg')
+        self.assertEqual(row['title'], 'Peacock')
+        self.assertEqual(row['category_id'], 1)
+        self.assertEqual(row['tags'], 'floral, bridal')
+        # The file is the row's identity unless a key is given
+        self.assertEqual(row['key'], 'photos\\a.jpg')
+
+    def test_invalid_rows(self):
+        invalid = [
+            {'file': 'a.jpg'},
+            {'title': 'No file'},
+            {'file': '../etc/passwd', 'title': 'Outside'},
+            {'file': '/etc/passwd', 'title': 'Absolute'},
+            {'file': 'a/../../b.jpg', 'title': 'Outside'},
+            {'file': 'a.jpg', 'title': 'x' * 201},
+            {'file': 'a.jpg', 'title': 'A', 'category': 'Arabic'},
+        ]
+        for row in invalid:
+            with self.subTest(row=row), self.assertRaises(ManifestError):
+                clean_row(row, self.categories)
+
+
+class RunImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.designer = User.objects.create_user('designer', 'd@example.com', 'pw', role='designer', is_approved=True)
+        cls.category = Category.objects.create(name='Bridal', slug='bridal')
+
+    def setUp(self):
+        clear_caches()
+        media = tempfile.TemporaryDirectory()
+        source = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.addCleanup(source.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.source = source.name
+        reconcile(snapshot=False)
+
+    def write_source(self, files, manifest):
+        for name, content in files.items():
+            path = os.path.join(self.source, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(content)
+        with open(os.path.join(self.source, 'manifest.csv'), 'wb') as f:
+            f.write(csv_manifest(manifest))
+
+    def job(self, source=None, design_status='approved'):
+        return DesignImport.objects.create(designer=self.designer, source=source or self.source, design_status=design_status)
+
+    def assertStatsCurrent(self):
+        stats = PlatformStats.objects.get(pk=STATS_PK)
+        for field, value in compute_counters().items():
+            self.assertEqual(getattr(stats, field), value, field)
+
+    def test_directory_import(self):
+        self.write_source(
+            {'a.jpg': jpeg_bytes(), 'sub/b.jpg': jpeg_bytes(), 'c.jpg': jpeg_bytes(), 'broken.jpg': b'not an image'},
+            [
+                {'file': 'a.jpg', 'title': 'A', 'category': 'bridal', 'tags': 'floral'},
+                {'file': 'sub/b.jpg', 'title': 'B'},
+                {'file': 'c.jpg', 'title': 'C', 'key': 'c-1'},
+                {'file': 'broken.jpg', 'title': 'Broken'},
+                {'file': 'missing.jpg', 'title': 'Missing'},
+                {'file': 'a.jpg', 'title': 'No key of its own'},
+                {'file': '', 'title': 'No file'},
+            ],
+        )
+        batches = []
+        
+        job = run_import(self.job(), workers=1, batch_size=2, progress=lambda job: batches.append(job.imported))
+        
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual((job.total, job.imported, job.skipped, job.failed), (7, 3, 0, 4))
+        self.assertEqual(batches, [2, 3, 3])
+        self.assertEqual(
+            sorted(Design.objects.filter(designer=self.designer).values_list('import_key', flat=True)),
+            ['a.jpg', 'c-1', 'sub/b.jpg'],
+        )
+        design = Design.objects.get(import_key='a.jpg')
+        self.assertEqual((design.category, design.tags, design.status), (self.category, 'floral', 'approved'))
+        with Image.open(design.image) as image:
+            self.assertEqual((image.format, image.size), ('JPEG', (40, 30)))
+        self.assertEqual({error['file'] for error in job.errors}, {'broken.jpg', 'missing.jpg', 'a.jpg', ''})
+
+    def test_zip_import(self):
+        archive = os.path.join(self.source, 'designs.zip')
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('one.jpg', jpeg_bytes())
+            zf.writestr('two.jpg', jpeg_bytes())
+            zf.writestr('manifest.json', json.dumps([
+                {'file': 'one.jpg', 'title': 'One', 'tags': ['bridal', 'lotus']},
+                {'file': 'two.jpg', 'title': 'Two'},
+            ]))
+        
+        job = run_import(self.job(source=archive), workers=1)
+        
+        self.assertEqual((job.status, job.imported, job.failed), ('completed', 2, 0))
+        self.assertEqual(Design.objects.get(import_key='one.jpg').tags, 'bridal, lotus')
+
+    def test_missing_manifest_fails_the_job(self):
+        with self.assertRaises(ManifestError):
+            run_import(self.job(), workers=1)
+        
+        job = DesignImport.objects.get()
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNotNone(job.finished_at)
+
+    def test_resume_skips_imported_keys(self):
+        self.write_source(
+            {'a.jpg': jpeg_bytes(), 'b.jpg': jpeg_bytes()},
+            [{'file': 'a.jpg', 'title': 'A'}, {'file': 'b.jpg', 'title': 'B'}],
+        )
+        # What a crashed run left behind
+        Design.objects.create(designer=self.designer, title='A', image='designs/a.jpg', status='approved', import_key='a.jpg')
+        # Another designer's keys don't count
+        other = User.objects.create_user('other', 'o@example.com', 'pw', role='designer', is_approved=True)
+        Design.objects.create(designer=other, title='B', image='designs/b.jpg', status='approved', import_key='b.jpg')
+        reconcile(snapshot=False)
+        job = self.job()
+        
+        run_import(job, workers=1)
+        self.assertEqual((job.imported, job.skipped), (1, 1))
+        
+        # Running the same job again does nothing new
+        run_import(job, workers=1)
+        self.assertEqual((job.status, job.imported, job.skipped), ('completed', 0, 2))
+        self.assertEqual(Design.objects.filter(designer=self.designer).count(), 2)
+
+    def test_stats_follow_bulk_create(self):
+        self.write_source(
+            {'a.jpg': jpeg_bytes(), 'b.jpg': jpeg_bytes()},
+            [{'file': 'a.jpg', 'title': 'A'}, {'file': 'b.jpg', 'title': 'B'}],
+        )
+        before = PlatformStats.objects.get(pk=STATS_PK)
+        
+        run_import(self.job(design_status='pending'), workers=1)
+        
+        stats = PlatformStats.objects.get(pk=STATS_PK)
+        self.assertEqual(stats.total_designs, before.total_designs + 2)
+        self.assertEqual(stats.pending_designs, before.pending_designs + 2)
+        self.assertEqual(stats.approved_designs, before.approved_designs)
+        self.assertStatsCurrent()
+
+    def test_store_batch_records_failures(self):
+        job = self.job()
+        job.errors = []
+        rows = [
+            clean_row({'file': 'a.jpg', 'title': 'A'}, {}),
+            clean_row({'file': 'b.jpg', 'title': 'B'}, {}),
+        ]
+        
+        _store_batch(job, rows, [('ok', jpeg_bytes(), 40, 30), ('error', 'unsupported image format GIF')])
+        
+        job.refresh_from_db()
+        self.assertEqual((job.imported, job.failed), (1, 1))
+        self.assertEqual(job.errors, [{'file': 'b.jpg', 'error': 'unsupported image format GIF'}])
+        self.assertEqual(Design.objects.get().import_key, 'a.jpg')
+        self.assertStatsCurrent()
+
+
+@override_settings(THROTTLING={**settings.THROTTLING, 'ENABLED': False})
+class ResumeImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.designer = User.objects.create_user('designer', 'd@example.com', 'pw', role='designer', is_approved=True)
+        cls.admin = User.objects.create_user('admin', 'a@example.com', 'pw', role='admin', is_staff=True)
+
+    def setUp(self):
+        clear_caches()
+        source = tempfile.TemporaryDirectory()
+        self.addCleanup(source.cleanup)
+        self.source = source.name
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.start_import = self.enterContext(mock.patch('apps.admin_panel.views.start_import'))
+
+    def job(self, status, age=0):
+        job = DesignImport.objects.create(designer=self.designer, source=self.source, status=status)
+        DesignImport.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(seconds=age))
+        return job
+
+    def resume(self, job):
+        return self.client.post(f'/api/admin-panel/designs/import/{job.pk}/resume/')
+
+    def test_stalled_job_is_claimed_once(self):
+        job = self.job('running', age=settings.DESIGN_IMPORT['STALL_SECONDS'] + 60)
+        
+        response = self.resume(job)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], 'pending')
+        self.start_import.assert_called_once()
+        
+        # The claim refreshed updated_at, so the job isn't stalled any more
+        self.assertEqual(self.resume(job).status_code, 409)
+        self.start_import.assert_called_once()
+
+    def test_concurrent_claim_loses(self):
+        job = self.job('failed')
+        stale = DesignImport.objects.get(pk=job.pk)
+        # Another request claimed it between our read and our update
+        DesignImport.objects.filter(pk=job.pk).update(status='pending', updated_at=timezone.now())
+        
+        rows = DesignImport.objects.filter
+        
+        def filter_(**kwargs):
+            queryset = rows(**kwargs)
+            # The view reads the job as it was before that claim
+            queryset.first = lambda: stale
+            return queryset
+        
+        with mock.patch.object(DesignImport.objects, 'filter', filter_):
+            response = self.resume(job)
+        
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['error'], 'Import was resumed already')
+        self.start_import.assert_not_called()
+
+    def test_active_or_finished_jobs_are_not_resumed(self):
+        for status in ('running', 'pending', 'completed'):
+            with self.subTest(status=status):
+                self.assertEqual(self.resume(self.job(status)).status_code, 409)
+        self.start_import.assert_not_called()
+
+    def test_failed_job_is_resumed(self):
+        self.assertEqual(self.resume(self.job('failed')).status_code, 202)
+        self.start_import.assert_called_once()
+
+    def test_missing_source(self):
+        job = self.job('failed')
+        DesignImport.objects.filter(pk=job.pk).update(source=os.path.join(self.source, 'gone.zip'))
+        
+        response = self.resume(job)
+        self.assertEqual(response.status_code, 409)
+        self.start_import.assert_not_called()
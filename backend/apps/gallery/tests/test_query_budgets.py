@@ -0,0 +1,90 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.conf import settings
+from rest_framework.test import APIClient
+from apps.bookings.models import Booking
+from apps.core.testing import QueryBudgetMixin, clear_caches
+from apps.gallery.models import Category, Design, Favorite, Like, Review
+
+User = get_user_model()
+
+
+@override_settings(THROTTLING={**settings.THROTTLING, 'ENABLED': False})
+class ListQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """
+    List endpoints run a fixed number of queries however many rows they
+    return; a budget overrun means something is fetched per row.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user('customer', 'c@example.com', 'pw', role='customer')
+        cls.designers = [
+            User.objects.create_user(f'designer{i}', f'd{i}@example.com', 'pw', role='designer', is_approved=True)
+            for i in range(3)
+        ]
+        categories = [Category.objects.create(name=f'Category {i}', slug=f'category-{i}') for i in range(3)]
+        for i in range(12):
+            design = Design.objects.create(
+                designer=cls.designers[i % 3], category=categories[i % 3], title=f'Design {i}',
+                image=f'designs/{i}.jpg', tags='bridal, floral', status='approved',
+            )
+            Like.objects.create(user=cls.customer, design=design, reaction_type='like')
+            Favorite.objects.create(user=cls.customer, design=design)
+        for designer in cls.designers:
+            Review.objects.create(customer=cls.customer, designer=designer, rating=5, comment='Lovely', is_approved=True)
+            Booking.objects.create(
+                customer=cls.customer, designer=designer, booking_date=datetime.date.today(),
+                booking_time='10:00', event_type='Wedding', location='Hall',
+            )
+
+    def setUp(self):
+        clear_caches()
+        self.user_client = APIClient()
+        self.user_client.force_authenticate(self.customer)
+
+    def test_design_list(self):
+        # Validators, count, page
+        self.assertQueryBudget(3, 'get', '/api/gallery/designs/')
+        self.assertQueryBudget(3, 'get', '/api/gallery/designs/', client=self.user_client)
+
+    def test_design_list_cached(self):
+        self.client.get('/api/gallery/designs/')
+        response = self.assertQueryBudget(0, 'get', '/api/gallery/designs/')
+        self.assertEqual(len(response.json()['results']), 12)
+
+    def test_design_list_sparse(self):
+        response = self.assertQueryBudget(3, 'get', '/api/gallery/designs/?fields=id,title')
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'title'})
+
+    def test_category_list(self):
+        response = self.assertQueryBudget(4, 'get', '/api/gallery/categories/')
+        self.assertEqual([row['designs_count'] for row in response.json()['results']], [4, 4, 4])
+
+    def test_trending(self):
+        self.assertQueryBudget(1, 'get', '/api/gallery/trending/')
+        response = self.assertQueryBudget(1, 'get', '/api/gallery/trending/', client=self.user_client)
+        self.assertTrue(all(row['is_liked'] and row['is_favorited'] for row in response.json()))
+
+    def test_favorites(self):
+        response = self.assertQueryBudget(3, 'get', '/api/gallery/favorites/', client=self.user_client)
+        self.assertTrue(all(row['design_details']['is_favorited'] for row in response.json()['results']))
+
+    def test_favorites_sparse(self):
+        self.assertQueryBudget(2, 'get', '/api/gallery/favorites/?fields=id,design', client=self.user_client)
+
+    def test_designer_reviews(self):
+        self.assertQueryBudget(2, 'get', f'/api/gallery/designers/{self.designers[0].pk}/reviews/')
+
+    def test_designer_list(self):
+        self.assertQueryBudget(2, 'get', '/api/users/designers/')
+
+    def test_bookings(self):
+        self.assertQueryBudget(2, 'get', '/api/bookings/', client=self.user_client)
+
+    def test_fast_serializers(self):
+        with self.settings(FAST_SERIALIZERS=True):
+            self.assertQueryBudget(1, 'get', '/api/gallery/trending/')
+            self.assertQueryBudget(3, 'get', '/api/gallery/trending/', client=self.user_client)
+            self.assertQueryBudget(2, 'get', '/api/users/designers/')
@@ -0,0 +1,190 @@
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from apps.core.testing import clear_caches
+from apps.gallery.models import Category, Design, Favorite, Like, SimilarDesign
+from apps.gallery.similarity import _on_pattern, _top_neighbors, build, similar_design_ids
+
+User = get_user_model()
+
+SIMILAR = {**settings.SIMILAR_DESIGNS, 'NEIGHBORS': 3, 'MIN_COMMON_USERS': 2, 'SHRINKAGE': 10.0}
+
+
+@override_settings(SIMILAR_DESIGNS=SIMILAR)
+class TopNeighborsTests(SimpleTestCase):
+    def test_mismatched_patterns_are_rejected(self):
+        scores = sparse.csr_matrix(np.array([[0.0, 0.5, 0.0]]))
+        common = sparse.csr_matrix(np.array([[0, 3, 2]]))
+        
+        with self.assertRaises(ValueError):
+            _top_neighbors(scores, common, 0)
+
+    def test_scores_read_onto_the_common_pattern(self):
+        scores = sparse.csr_matrix(np.array([[1.0, 0.5, 0.0], [0.5, 1.0, 0.25]]))
+        common = sparse.csr_matrix(np.array([[3, 3, 2], [3, 4, 2]]))
+        
+        aligned = _on_pattern(scores, common)
+        
+        self.assertEqual(aligned.indices.tolist(), common.indices.tolist())
+        self.assertEqual(aligned.data.tolist(), [1.0, 0.5, 0.0, 0.5, 1.0, 0.25])
+        rows, columns, ranks, values = _top_neighbors(aligned, common, 0)
+        self.assertEqual(list(zip(rows.tolist(), columns.tolist(), ranks.tolist())), [(0, 1, 0), (0, 2, 1), (1, 0, 0), (1, 2, 1)])
+
+
+@override_settings(SIMILAR_DESIGNS=SIMILAR)
+class BuildTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.designer = User.objects.create_user('designer', 'd@example.com', 'pw', role='designer', is_approved=True)
+        cls.users = [
+            User.objects.create_user(f'user{i}', f'u{i}@example.com', 'pw', role='customer') for i in range(6)
+        ]
+        cls.designs = [
+            Design.objects.create(designer=cls.designer, title=f'Design {i}', image=f'designs/{i}.jpg', status='approved')
+            for i in range(6)
+        ]
+
+    def setUp(self):
+        clear_caches()
+
+    def like(self, user, *designs):
+        for design in designs:
+            Like.objects.create(user=self.users[user], design=self.designs[design], reaction_type='like')
+
+    def neighbors(self, design):
+        return list(
+            SimilarDesign.objects.filter(design=self.designs[design]).order_by('rank').values_list('similar_id', flat=True)
+        )
+
+    def ids(self, *indexes):
+        return [self.designs[index].pk for index in indexes]
+
+    def test_ranking(self):
+        # 0 and 1 share three users, 0 and 2 two; 0 and 3 only one
+        self.like(0, 0, 1, 2)
+        self.like(1, 0, 1, 2)
+        self.like(2, 0, 1, 3)
+        
+        stats = build()
+        
+        self.assertEqual(self.neighbors(0), self.ids(1, 2))
+        self.assertEqual(self.neighbors(2), self.ids(0, 1))
+        self.assertEqual(self.neighbors(3), [])
+        self.assertEqual(stats, {'designs': 3, 'neighbors': 6})
+        scores = list(SimilarDesign.objects.filter(design=self.designs[0]).order_by('rank').values_list('score', flat=True))
+        self.assertGreater(scores[0], scores[1])
+
+    def test_favorites_outweigh_likes(self):
+        # 1 and 2 share as many users with 0, but 2's are favorites
+        for user in (0, 1):
+            self.like(user, 0, 1)
+            Like.objects.create(user=self.users[user + 2], design=self.designs[0], reaction_type='like')
+            Favorite.objects.create(user=self.users[user + 2], design=self.designs[0])
+            Favorite.objects.create(user=self.users[user + 2], design=self.designs[2])
+        
+        build()
+        
+        self.assertEqual(self.neighbors(0), self.ids(2, 1))
+
+    def test_min_common_users(self):
+        self.like(0, 0, 1)
+        self.like(1, 0, 1)
+        self.like(2, 0, 2)
+        
+        build()
+        self.assertEqual(self.neighbors(0), self.ids(1))
+        
+        with override_settings(SIMILAR_DESIGNS={**SIMILAR, 'MIN_COMMON_USERS': 1}):
+            build()
+        self.assertEqual(self.neighbors(0), self.ids(1, 2))
+
+    def test_neighbors_are_capped(self):
+        for user in range(3):
+            self.like(user, 0, 1, 2, 3, 4, 5)
+        
+        build()
+        
+        self.assertEqual(len(self.neighbors(0)), SIMILAR['NEIGHBORS'])
+        self.assertNotIn(self.designs[0].pk, self.neighbors(0))
+
+    def test_dislikes_and_unapproved_designs_are_ignored(self):
+        self.like(0, 0, 1)
+        self.like(1, 0, 1)
+        for user in (0, 1):
+            Like.objects.create(user=self.users[user], design=self.designs[2], reaction_type='dislike')
+        Design.objects.filter(pk=self.designs[1].pk).update(status='pending')
+        
+        build()
+        
+        self.assertFalse(SimilarDesign.objects.exists())
+
+    def test_chunks_replace_stale_rows(self):
+        for user in range(3):
+            self.like(user, 0, 1, 2, 4)
+        # Rows for designs that have since lost their likes, before, between and after the liked ones
+        for stale in (3, 5):
+            SimilarDesign.objects.create(design=self.designs[stale], similar=self.designs[0], rank=0, score=1.0)
+        SimilarDesign.objects.create(design=self.designs[0], similar=self.designs[5], rank=5, score=9.0)
+        
+        chunks = []
+        build(chunk_size=1, progress=lambda stats: chunks.append(stats['designs']))
+        by_one = list(SimilarDesign.objects.values_list('design_id', 'similar_id', 'rank'))
+        
+        self.assertEqual(chunks, [1, 2, 3, 4])
+        self.assertEqual(set(SimilarDesign.objects.values_list('design_id', flat=True)), set(self.ids(0, 1, 2, 4)))
+        self.assertEqual(self.neighbors(0), self.ids(1, 2, 4))
+        
+        build(chunk_size=1000)
+        self.assertEqual(list(SimilarDesign.objects.values_list('design_id', 'similar_id', 'rank')), by_one)
+
+    def test_no_interactions_clears_the_table(self):
+        SimilarDesign.objects.create(design=self.designs[0], similar=self.designs[1], rank=0, score=1.0)
+        
+        self.assertEqual(build(), {'designs': 0, 'neighbors': 0})
+        self.assertFalse(SimilarDesign.objects.exists())
+
+
+@override_settings(SIMILAR_DESIGNS=SIMILAR)
+class FallbackTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        designer = User.objects.create_user('designer', 'd@example.com', 'pw', role='designer', is_approved=True)
+        bridal = Category.objects.create(name='Bridal', slug='bridal')
+        arabic = Category.objects.create(name='Arabic', slug='arabic')
+
+        def design(title, category, tags, likes=0, status='approved'):
+            return Design.objects.create(
+                designer=designer, title=title, image=f'designs/{title}.jpg', category=category,
+                tags=tags, likes_count=likes, status=status,
+            )
+
+        cls.design = design('Peacock', bridal, 'peacock, floral')
+        cls.neighbor = design('Neighbor', arabic, '', likes=1)
+        cls.same_tag = design('Same tag', bridal, 'Floral', likes=5)
+        cls.popular_same_category = design('Popular', bridal, 'mandala', likes=50)
+        cls.other_category = design('Other', arabic, 'floral', likes=100)
+        cls.pending = design('Pending', bridal, 'floral', likes=500, status='pending')
+        SimilarDesign.objects.create(design=cls.design, similar=cls.neighbor, rank=0, score=0.5)
+
+    def test_neighbors_then_category_and_tag_then_category(self):
+        ids = similar_design_ids(self.design, 10)
+        
+        self.assertEqual(ids, [self.neighbor.pk, self.same_tag.pk, self.popular_same_category.pk])
+
+    def test_limit(self):
+        self.assertEqual(similar_design_ids(self.design, 1), [self.neighbor.pk])
+        self.assertEqual(similar_design_ids(self.design, 2), [self.neighbor.pk, self.same_tag.pk])
+
+    def test_tags_only_without_a_category(self):
+        loose = Design.objects.create(
+            designer=self.design.designer, title='Loose', image='designs/loose.jpg', tags='floral', status='approved',
+        )
+        
+        self.assertEqual(similar_design_ids(loose, 10), [self.other_category.pk, self.same_tag.pk, self.design.pk])
+
+    def test_unapproved_neighbors_are_skipped(self):
+        Design.objects.filter(pk=self.neighbor.pk).update(status='rejected')
+        
+        self.assertEqual(similar_design_ids(self.design, 10), [self.same_tag.pk, self.popular_same_category.pk])
@@ -0,0 +1,144 @@
+import hashlib
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+from apps.core.testing import clear_caches
+from apps.gallery.models import Design, UploadSession
+from apps.gallery.uploads import file_sha256, part_path
+
+User = get_user_model()
+
+
+def png_bytes():
+    # Noise doesn't compress, so the file is big enough to split up
+    buffer = io.BytesIO()
+    Image.frombytes('RGB', (64, 64), os.urandom(64 * 64 * 3)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        media = tempfile.TemporaryDirectory()
+        parts = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.addCleanup(parts.cleanup)
+        self.enterContext(override_settings(
+            MEDIA_ROOT=media.name, CHUNKED_UPLOADS={**settings.CHUNKED_UPLOADS, 'DIRECTORY': parts.name},
+        ))
+        designer = User.objects.create_user('designer', 'd@example.com', 'pw', role='designer', is_approved=True)
+        self.client = APIClient()
+        self.client.force_authenticate(designer)
+        self.content = png_bytes()
+
+    def start(self):
+        response = self.client.post('/api/gallery/uploads/', {'filename': 'design.png', 'size': len(self.content)})
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def put(self, session_id, offset, chunk):
+        return self.client.put(
+            f'/api/gallery/uploads/{session_id}/', chunk,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def complete(self, session_id, checksum):
+        return self.client.post(
+            f'/api/gallery/uploads/{session_id}/complete/', {'sha256': checksum, 'title': 'Uploaded'}
+        )
+
+    def test_resume_after_interruption(self):
+        session_id = self.start()
+        half = len(self.content) // 2
+        response = self.put(session_id, 0, self.content[:half])
+        self.assertEqual(response.json(), {'offset': half, 'size': len(self.content)})
+
+        # The client lost track: the server says where to resume
+        self.assertEqual(self.client.get(f'/api/gallery/uploads/{session_id}/').json()['offset'], half)
+        self.assertEqual(self.put(session_id, half, self.content[half:]).json()['offset'], len(self.content))
+
+        response = self.complete(session_id, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(response.status_code, 201)
+        design = Design.objects.get()
+        self.assertEqual(design.status, 'pending')
+        with design.image.open('rb') as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertEqual(UploadSession.objects.get().status, 'complete')
+
+    def test_offset_conflict(self):
+        session_id = self.start()
+        self.put(session_id, 0, self.content[:100])
+        # A retried chunk that was already stored
+        response = self.put(session_id, 0, self.content[:100])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 100)
+        # Skipping ahead
+        response = self.put(session_id, 200, self.content[200:300])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 100)
+        self.assertEqual(UploadSession.objects.get().offset, 100)
+
+    def test_offset_required(self):
+        session_id = self.start()
+        response = self.client.put(
+            f'/api/gallery/uploads/{session_id}/', self.content, content_type='application/offset+octet-stream'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_chunk_past_declared_size(self):
+        session_id = self.start()
+        response = self.put(session_id, 0, self.content + b'extra')
+        self.assertEqual(response.status_code, 400)
+
+    def test_incomplete(self):
+        session_id = self.start()
+        self.put(session_id, 0, self.content[:100])
+        response = self.complete(session_id, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 100)
+
+    def test_checksum_mismatch(self):
+        session_id = self.start()
+        self.put(session_id, 0, self.content)
+        response = self.complete(session_id, hashlib.sha256(b'something else').hexdigest())
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Design.objects.exists())
+        # Discarded: the client has to start over
+        self.assertEqual(self.client.get(f'/api/gallery/uploads/{session_id}/').status_code, 404)
+
+    def test_concurrent_completion(self):
+        session_id = self.start()
+        self.put(session_id, 0, self.content)
+        checksum = hashlib.sha256(self.content).hexdigest()
+        retries = []
+
+        def retry_meanwhile(session):
+            # A retried request arriving while the first one is finishing
+            retries.append(self.complete(session_id, checksum))
+            return file_sha256(part_path(session))
+
+        with mock.patch('apps.gallery.views.sha256', side_effect=retry_meanwhile):
+            response = self.complete(session_id, checksum)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(retries[0].status_code, 409)
+        self.assertEqual(Design.objects.count(), 1)
+        # And once it is done
+        self.assertEqual(self.complete(session_id, checksum).status_code, 409)
+
+    def test_invalid_fields_reopen_the_session(self):
+        session_id = self.start()
+        self.put(session_id, 0, self.content)
+        checksum = hashlib.sha256(self.content).hexdigest()
+        response = self.client.post(
+            f'/api/gallery/uploads/{session_id}/complete/', {'sha256': checksum, 'title': 'x' * 500}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadSession.objects.get().status, 'open')
+        self.assertEqual(self.complete(session_id, checksum).status_code, 201)
@@ -0,0 +1,183 @@
+"""
+Storage side of resumable chunked uploads. Each UploadSession has a part
+file in CHUNKED_UPLOADS['DIRECTORY'] that chunks are streamed into while
+being hashed; completing the session hands that file to the Design's
+storage, which moves it into place instead of reading it back.
+"""
+import fcntl
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
+from .models import UploadSession
+
+READ_SIZE = 256 * 1024
+
+# Running SHA-256 of sessions whose chunks this process received in order:
+# session id -> (offset hashed up to, hasher). hashlib state can't be
+# stored, so sessions whose chunks went to several workers are hashed from
+# disk on completion instead.
+MAX_HASHERS = 256
+_hashers = OrderedDict()
+_hashers_lock = threading.Lock()
+
+
+class ChunkConflict(Exception):
+    """The chunk doesn't start at the stored offset, or another chunk is being written"""
+    def __init__(self, offset):
+        super().__init__(offset)
+        self.offset = offset
+
+
+def part_path(session):
+    return os.path.join(settings.CHUNKED_UPLOADS['DIRECTORY'], f'{session.pk}.part')
+
+
+def expiry():
+    return timezone.now() + timedelta(seconds=settings.CHUNKED_UPLOADS['EXPIRE_SECONDS'])
+
+
+def create_part(session):
+    os.makedirs(settings.CHUNKED_UPLOADS['DIRECTORY'], exist_ok=True)
+    open(part_path(session), 'xb').close()
+
+
+def discard(session):
+    """Delete `session` and its part file"""
+    with _hashers_lock:
+        _hashers.pop(session.pk, None)
+    try:
+        os.remove(part_path(session))
+    except FileNotFoundError:
+        pass
+    session.delete()
+
+
+def _take_hasher(session_id, offset):
+    with _hashers_lock:
+        entry = _hashers.pop(session_id, None)
+    if offset == 0:
+        return hashlib.sha256()
+    if entry is not None and entry[0] == offset:
+        return entry[1]
+    return None
+
+
+def _keep_hasher(session_id, offset, hasher):
+    with _hashers_lock:
+        _hashers[session_id] = (offset, hasher)
+        while len(_hashers) > MAX_HASHERS:
+            _hashers.popitem(last=False)
+
+
+def write_chunk(session, offset, stream, length):
+    """
+    Stream `length` bytes from `stream` into the part file at `offset`,
+    which must be the session's stored offset. Bytes that arrived before a
+    dropped connection are kept (and the read error re-raised), so the
+    client resumes from wherever the upload got to. Returns the new offset.
+    """
+    with open(part_path(session), 'r+b') as part:
+        try:
+            fcntl.flock(part, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise ChunkConflict(session.offset)
+        # Under the lock, the stored offset is current
+        session.refresh_from_db(fields=['offset', 'status'])
+        if offset != session.offset or session.status != 'open':
+            raise ChunkConflict(session.offset)
+
+        hasher = _take_hasher(session.pk, offset)
+        # Drop whatever an interrupted write left past the stored offset
+        part.seek(offset)
+        part.truncate()
+        written = 0
+        try:
+            while written < length:
+                data = stream.read(min(READ_SIZE, length - written))
+                if not data:
+                    break
+                part.write(data)
+                if hasher is not None:
+                    hasher.update(data)
+                written += len(data)
+        finally:
+            # On disk before the offset that promises it is stored
+            part.flush()
+            os.fsync(part.fileno())
+            session.offset = offset + written
+            session.expires_at = expiry()
+            session.save(update_fields=['offset', 'expires_at', 'updated_at'])
+            if hasher is not None:
+                _keep_hasher(session.pk, session.offset, hasher)
+    return session.offset
+
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(READ_SIZE), b''):
+            hasher.update(data)
+    return hasher.hexdigest()
+
+
+def sha256(session):
+    """Hex SHA-256 of everything received for `session`"""
+    with _hashers_lock:
+        entry = _hashers.get(session.pk)
+    if entry is not None and entry[0] == session.offset:
+        return entry[1].hexdigest()
+    return file_sha256(part_path(session))
+
+
+class PartFile(UploadedFile):
+    """
+    A finished part file as an upload. Like TemporaryUploadedFile it has a
+    temporary_file_path(), so image validation opens it by path and the
+    storage moves it rather than copying its contents. `sha256`, once
+    verified, spares content-addressed storage hashing it again.
+    """
+    def __init__(self, session, sha256=None):
+        self.path = part_path(session)
+        self.sha256 = sha256
+        super().__init__(open(self.path, 'rb'), session.filename, None, session.size)
+
+    def temporary_file_path(self):
+        return self.path
+
+    def close(self):
+        try:
+            return self.file.close()
+        except FileNotFoundError:
+            pass
+
+
+def collect_garbage(now=None):
+    """
+    Delete expired sessions (finished ones only keep their row until then)
+    with their part files, and part files no session refers to. Returns
+    (sessions, files) deleted.
+    """
+    now = now or timezone.now()
+    expired = list(UploadSession.objects.filter(expires_at__lt=now))
+    files = 0
+    for session in expired:
+        if os.path.exists(part_path(session)):
+            files += 1
+        discard(session)
+
+    directory = settings.CHUNKED_UPLOADS['DIRECTORY']
+    if os.path.isdir(directory):
+        cutoff = (now - timedelta(seconds=settings.CHUNKED_UPLOADS['EXPIRE_SECONDS'])).timestamp()
+        known = {str(pk) for pk in UploadSession.objects.values_list('pk', flat=True)}
+        for entry in os.scandir(directory):
+            name, ext = os.path.splitext(entry.name)
+            if ext == '.part' and name not in known and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                files += 1
+    return len(expired), files
@@ -1,8 +1,10 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     CategoryListView, DesignViewSet, FavoriteListView,
-    ReviewListCreateView, trending_designs
+    PortfolioExportView, ReviewListCreateView, UploadCompleteView, UploadSessionCreateView,
+    UploadSessionView, trending_designs
 )
 
 router = DefaultRouter()
@@ -21,6 +23,25 @@ urlpatterns = [
     # Favorites
     path('favorites/', FavoriteListView.as_view(), name='favorite-list'),
     
+    # Portfolio export (ZIP)
+    path('portfolio/export/', PortfolioExportView.as_view(), name='portfolio-export'),
+    
+    # Resumable chunked uploads
+    path('uploads/', UploadSessionCreateView.as_view(), name='upload-create'),
+    path('uploads/<uuid:session_id>/', UploadSessionView.as_view(), name='upload-detail'),
+    path('uploads/<uuid:session_id>/complete/', UploadCompleteView.as_view(), name='upload-complete'),
+    
     # Reviews
     path('designers/<int:designer_id>/reviews/', ReviewListCreateView.as_view(), name='designer-reviews'),
-]
\ No newline at end of file
+]
+
+if settings.ASYNC_READ_VIEWS:
+    from .async_views import design_list, design_detail, trending
+    
+    # Async read paths take precedence; they hand writes and authenticated
+    # requests back to the regular views
+    urlpatterns = [
+        path('designs/', design_list, name='design-list-async'),
+        path('designs/<int:pk>/', design_detail, name='design-detail-async'),
+        path('trending/', trending, name='trending-designs-async'),
+    ] + urlpatterns
@@ -1,23 +1,76 @@
-from rest_framework import generics, status, permissions, filters, viewsets
+import os
+
+from rest_framework import exceptions, generics, status, permissions, filters, viewsets
+from rest_framework.generics import get_object_or_404
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Q
+from django.conf import settings
+from django.db.models import Case, Count, Max, Prefetch, Q, Value, When
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Category, Design, Like, Favorite, Review
+from apps.core.conditional import conditional
+from apps.core.fast_serializers import FastListMixin
+from apps.core.fieldsets import SparseQuerysetMixin
+from apps.core.response_cache import cached_response
+from .counters import count_reactions, count_view
+from .models import Category, Design, Like, Favorite, Review, UploadSession
+from .portfolio import portfolio_response
+from .similarity import similar_design_ids
+from .uploads import ChunkConflict, PartFile, create_part, discard, expiry, part_path, sha256, write_chunk
 from .serializers import (
     CategorySerializer, DesignListSerializer, DesignDetailSerializer,
-    DesignSerializer, LikeSerializer, FavoriteSerializer, ReviewSerializer
+    DesignSerializer, LikeSerializer, FavoriteSerializer, ReviewSerializer, UploadSessionSerializer,
+    fast_design_list, with_viewer_flags
 )
 
 
-class CategoryListView(generics.ListCreateAPIView):
-    queryset = Category.objects.all()
+def check_can_upload(user):
+    if user.role != 'designer':
+        raise exceptions.PermissionDenied('Only designers can upload designs')
+    if not user.is_approved:
+        raise exceptions.PermissionDenied('Designer account not approved yet')
+
+
+def category_validators(view, request, **kwargs):
+    categories = Category.objects.aggregate(count=Count('pk'), changed=Max('updated_at'))
+    # Every category's designs_count, in one grouped query
+    counts = Design.objects.filter(status='approved').values_list('category').annotate(n=Count('pk')).order_by('category')
+    return (categories['count'], categories['changed'], *counts), None
+
+
+def design_list_validators(view, request, **kwargs):
+    # Deleting a design doesn't move max(updated_at), so lists get no Last-Modified
+    designs = view.filter_queryset(view.get_queryset()).aggregate(count=Count('pk'), changed=Max('updated_at'))
+    return (designs['count'], designs['changed']), None
+
+
+def design_validators(view, request, pk, **kwargs):
+    try:
+        row = view.get_queryset().filter(pk=pk).values_list('updated_at', 'status').first()
+    except ValueError:
+        return None
+    # Unapproved designs carry signed image URLs, which change over time
+    if row is None or row[1] != 'approved':
+        return None
+    return (row[0].isoformat(),), row[0]
+
+
+class CategoryListView(SparseQuerysetMixin, generics.ListCreateAPIView):
+    # Meta.ordering isn't applied to aggregating queries
+    queryset = Category.objects.annotate(
+        approved_designs=Count('designs', filter=Q(designs__status='approved'))
+    ).order_by('name')
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    
+    @conditional(category_validators, tags=['categories', 'design-counts'])
+    @cached_response(tags=['categories', 'design-counts'])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
 
-class DesignViewSet(viewsets.ModelViewSet):
+class DesignViewSet(FastListMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = Design.objects.all()
     serializer_class = DesignSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -33,36 +86,62 @@ class DesignViewSet(viewsets.ModelViewSet):
             queryset = Design.objects.filter(Q(status='approved') | Q(designer=self.request.user))
         return queryset
     
+    @conditional(design_list_validators, tags=['design-list'])
+    @cached_response(tags=['design-list'])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        instance.views_count += 1
-        instance.save()
-        serializer = self.get_serializer(instance)
+        return self.count_view(self._retrieve(request, *args, **kwargs))
+    
+    def count_view(self, response):
+        """Count a view of the design for a detail response, even one from the response cache, or a 304"""
+        if response.status_code not in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            return response
+        data = getattr(response, 'data', None) or {}
+        designer_id = data.get('designer')
+        if designer_id is None:
+            # Left out by ?fields= / ?omit=, or a 304
+            designer_id = Design.objects.filter(pk=self.kwargs['pk']).values_list('designer_id', flat=True).first()
+        count_view(int(self.kwargs['pk']), designer_id)
+        if 'views_count' in data:
+            response.data['views_count'] += 1
+        return response
+    
+    @conditional(design_validators, tags=lambda pk, **kwargs: [f'design:{pk}'])
+    @cached_response(tags=lambda pk, **kwargs: [f'design:{pk}'])
+    def _retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object())
         return Response(serializer.data)
     
     def perform_create(self, serializer):
-        if self.request.user.role != 'designer':
-            raise permissions.PermissionDenied('Only designers can upload designs')
-        if not self.request.user.is_approved:
-            raise permissions.PermissionDenied('Designer account not approved yet')
+        check_can_upload(self.request.user)
         serializer.save(designer=self.request.user, status='pending')
     
+    def get_throttles(self):
+        if self.action == 'like':
+            self.throttle_scope = 'like'
+        return super().get_throttles()
+    
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def like(self, request, pk=None):
         design = self.get_object()
         reaction_type = request.data.get('reaction_type', 'like')
         
         existing = Like.objects.filter(user=request.user, design=design).first()
+        deltas = {'likes': 0, 'dislikes': 0}
         
         if existing:
             if existing.reaction_type == 'like':
                 design.likes_count = max(0, design.likes_count - 1)
+                deltas['likes'] -= 1
             else:
                 design.dislikes_count = max(0, design.dislikes_count - 1)
+                deltas['dislikes'] -= 1
             
             if existing.reaction_type == reaction_type:
                 existing.delete()
-                design.save()
+                count_reactions(design.pk, design.designer_id, **deltas)
                 return Response({'message': 'Reaction removed', 'liked': False})
             
             existing.reaction_type = reaction_type
@@ -72,10 +151,12 @@ class DesignViewSet(viewsets.ModelViewSet):
         
         if reaction_type == 'like':
             design.likes_count += 1
+            deltas['likes'] += 1
         else:
             design.dislikes_count += 1
+            deltas['dislikes'] += 1
         
-        design.save()
+        count_reactions(design.pk, design.designer_id, **deltas)
         
         return Response({
             'message': f'{reaction_type.capitalize()} recorded',
@@ -84,6 +165,31 @@ class DesignViewSet(viewsets.ModelViewSet):
             'dislikes_count': design.dislikes_count
         })
     
+    @action(detail=True, methods=['get'])
+    @cached_response(tags=lambda pk, **kwargs: [f'design:{pk}', 'similar-designs'])
+    def similar(self, request, pk=None):
+        """Designs liked/favorited by the same people, else from the same category and tags"""
+        design = get_object_or_404(self.get_queryset().only('pk', 'category_id', 'tags'), pk=pk)
+        options = settings.SIMILAR_DESIGNS
+        try:
+            limit = min(max(int(request.query_params.get('limit', options['DEFAULT_LIMIT'])), 1), options['NEIGHBORS'])
+        except ValueError:
+            return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        ids = similar_design_ids(design, limit)
+        if not ids:
+            return Response([])
+        designs = Design.objects.filter(pk__in=ids).order_by(
+            Case(*[When(pk=design_id, then=Value(position)) for position, design_id in enumerate(ids)])
+        )
+        if settings.FAST_SERIALIZERS:
+            return Response(fast_design_list.to_representation(
+                fast_design_list.values(designs, request), {'request': request}
+            ))
+        designs = with_viewer_flags(designs.select_related('designer', 'category'), request)
+        serializer = DesignListSerializer(designs, many=True, context={'request': request})
+        return Response(serializer.data)
+    
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def favorite(self, request, pk=None):
         design = self.get_object()
@@ -97,21 +203,174 @@ class DesignViewSet(viewsets.ModelViewSet):
             return Response({'message': 'Added to favorites', 'favorited': True})
 
 
-class FavoriteListView(generics.ListAPIView):
+class FavoriteListView(SparseQuerysetMixin, generics.ListAPIView):
     serializer_class = FavoriteSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Favorite.objects.filter(user=self.request.user)
+        designs = with_viewer_flags(Design.objects.select_related('designer', 'category'), self.request)
+        return Favorite.objects.filter(user=self.request.user).prefetch_related(Prefetch('design', queryset=designs))
+
+
+class PortfolioExportView(APIView):
+    """Download all of the current designer's designs as a streamed ZIP"""
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'export'
+    
+    def get(self, request):
+        if request.user.role != 'designer':
+            return Response({'error': 'Only designers have a portfolio'}, status=status.HTTP_403_FORBIDDEN)
+        return portfolio_response(request, request.user)
+
 
+class UploadSessionCreateView(APIView):
+    """Start a resumable upload: POST {filename, size}"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        check_can_upload(request.user)
+        open_sessions = UploadSession.objects.filter(user=request.user, status='open').count()
+        if open_sessions >= settings.CHUNKED_UPLOADS['MAX_OPEN_SESSIONS']:
+            return Response(
+                {'error': 'Too many unfinished uploads; finish or cancel one first'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = UploadSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = serializer.save(user=request.user, expires_at=expiry())
+        create_part(session)
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+
+class UploadSessionView(APIView):
+    """
+    GET: the session, including the offset to resume from.
+    PUT: the next chunk as the raw request body, with an Upload-Offset
+    header that must equal the stored offset (409 with the right one if not).
+    DELETE: cancel the upload.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_session(self, request, session_id):
+        session = UploadSession.objects.filter(pk=session_id, user=request.user).first()
+        if session is None:
+            raise exceptions.NotFound('Upload not found')
+        return session
+    
+    def get(self, request, session_id):
+        return Response(UploadSessionSerializer(self.get_session(request, session_id)).data)
+    
+    def put(self, request, session_id):
+        session = self.get_session(request, session_id)
+        if session.status != 'open':
+            return Response({'error': 'Upload already completed'}, status=status.HTTP_409_CONFLICT)
+        try:
+            offset = int(request.META['HTTP_UPLOAD_OFFSET'])
+        except (KeyError, ValueError):
+            return Response({'error': 'Upload-Offset header required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            length = int(request.META['CONTENT_LENGTH'])
+        except (KeyError, ValueError):
+            return Response({'error': 'Content-Length required'}, status=status.HTTP_411_LENGTH_REQUIRED)
+        
+        if length > settings.CHUNKED_UPLOADS['MAX_CHUNK_SIZE']:
+            return Response(
+                {'error': f"Chunks can be at most {settings.CHUNKED_UPLOADS['MAX_CHUNK_SIZE']} bytes"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        if offset + length > session.size:
+            return Response({'error': 'Chunk runs past the declared size'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            # Straight from the request stream; request.data would buffer it
+            write_chunk(session, offset, request.stream, length)
+        except ChunkConflict as exc:
+            return Response(
+                {'error': 'Chunk does not start at the current offset', 'offset': exc.offset},
+                status=status.HTTP_409_CONFLICT
+            )
+        except OSError:
+            return Response(
+                {'error': 'Upload interrupted', 'offset': session.offset}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'offset': session.offset, 'size': session.size})
+    
+    def delete(self, request, session_id):
+        discard(self.get_session(request, session_id))
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
-class ReviewListCreateView(generics.ListCreateAPIView):
+
+class UploadCompleteView(APIView):
+    """
+    Finish an upload: POST {sha256, title, ...design fields}. The checksum
+    must match the received file, which then becomes a pending Design.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request, session_id):
+        check_can_upload(request.user)
+        session = UploadSession.objects.filter(pk=session_id, user=request.user).first()
+        if session is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        if session.status != 'open':
+            return Response({'error': 'Upload already completed'}, status=status.HTTP_409_CONFLICT)
+        if session.offset != session.size:
+            return Response(
+                {'error': 'Upload incomplete', 'offset': session.offset, 'size': session.size},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        checksum = str(request.data.get('sha256', '')).strip().lower()
+        if not checksum:
+            return Response({'error': 'sha256 of the file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        # Claim the session, so a retried request can't finish it a second time
+        claimed = UploadSession.objects.filter(pk=session.pk, status='open').update(
+            status='completing', expires_at=expiry(), updated_at=timezone.now()
+        )
+        if not claimed:
+            return Response({'error': 'Upload already completed'}, status=status.HTTP_409_CONFLICT)
+        if sha256(session) != checksum:
+            discard(session)
+            return Response(
+                {'error': 'Checksum mismatch; the upload was discarded, start it again'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        fields = ('title', 'description', 'category', 'tags', 'price_range')
+        image = PartFile(session, sha256=checksum)
+        try:
+            serializer = DesignSerializer(
+                data={**{field: request.data[field] for field in fields if field in request.data}, 'image': image},
+                context={'request': request}
+            )
+            serializer.is_valid(raise_exception=True)
+            design = serializer.save(designer=request.user, status='pending')
+        except BaseException:
+            if os.path.exists(part_path(session)):
+                # The file wasn't taken: the client can fix the fields and try again
+                UploadSession.objects.filter(pk=session.pk).update(status='open', updated_at=timezone.now())
+            else:
+                discard(session)
+            raise
+        finally:
+            image.close()
+        
+        session.status = 'complete'
+        session.design = design
+        session.save(update_fields=['status', 'design', 'updated_at'])
+        # Storages that can't move the part file copied it
+        if os.path.exists(image.temporary_file_path()):
+            os.remove(image.temporary_file_path())
+        return Response(DesignSerializer(design, context={'request': request}).data, status=status.HTTP_201_CREATED)
+
+
+class ReviewListCreateView(SparseQuerysetMixin, generics.ListCreateAPIView):
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
     def get_queryset(self):
         designer_id = self.kwargs.get('designer_id')
-        return Review.objects.filter(designer_id=designer_id, is_approved=True)
+        return Review.objects.filter(designer_id=designer_id, is_approved=True).select_related('customer', 'designer')
     
     def perform_create(self, serializer):
         designer_id = self.kwargs.get('designer_id')
@@ -120,8 +379,15 @@ class ReviewListCreateView(generics.ListCreateAPIView):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@cached_response(tags=['design-list'])
 def trending_designs(request):
     """Get trending designs"""
-    designs = Design.objects.filter(status='approved').order_by('-likes_count', '-views_count')[:12]
-    serializer = DesignListSerializer(designs, many=True, context={'request': request})
-    return Response(serializer.data)
+    return Response(trending_data(request))
+
+
+def trending_data(request):
+    designs = Design.objects.filter(status='approved').order_by('-likes_count', '-views_count')
+    if settings.FAST_SERIALIZERS:
+        return fast_design_list.to_representation(fast_design_list.values(designs, request)[:12], {'request': request})
+    designs = with_viewer_flags(designs.select_related('designer', 'category'), request)[:12]
+    return DesignListSerializer(designs, many=True, context={'request': request}).data
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from apps.core.paginator import EstimatedCountPaginator
 from .models import User
 
 @admin.register(User)
@@ -8,3 +9,5 @@ class UserAdmin(admin.ModelAdmin):
     list_filter = ('role', 'is_approved', 'date_joined')
     list_editable = ('is_approved',)
     ordering = ('-date_joined',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,24 @@
+from asgiref.sync import sync_to_async
+from rest_framework.response import Response
+from apps.core.async_views import is_anonymous, delegate, cached_data, serve
+from apps.core.fast_serializers import wants_stream
+from .views import DesignerListView
+
+designer_list_view = DesignerListView.as_view()
+
+
+async def designer_list(request):
+    """Async approved-designer list for anonymous GETs"""
+    if request.method != 'GET' or not is_anonymous(request) or wants_stream(request):
+        return await delegate(designer_list_view, request)
+    
+    async def handler(view, drf_request):
+        def build():
+            # DesignerListView.list without its @cached_response, which runs here instead
+            response = super(DesignerListView, view).list(drf_request)
+            return response.status_code, response.data
+        
+        status, data = await cached_data(request, ['designer-list', 'design-counts'], sync_to_async(build))
+        return Response(data, status=status)
+    
+    return await serve(DesignerListView, request, handler)
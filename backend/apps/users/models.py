@@ -34,6 +34,10 @@ class User(AbstractUser):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Moderation queue: oldest pending designers first
+            models.Index(fields=['role', 'is_approved', 'created_at']),
+        ]
         verbose_name = 'User'
         verbose_name_plural = 'Users'
     
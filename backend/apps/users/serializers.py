@@ -1,11 +1,14 @@
+from operator import itemgetter
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from apps.core.fast_serializers import ValuesSerializer
+from apps.core.fieldsets import SparseFieldsetMixin
 
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for User model - general purpose
     """
@@ -75,7 +78,7 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Detailed serializer for designer profiles
     """
@@ -92,6 +95,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'designs_count', 'reviews_count', 'created_at'
         ]
         read_only_fields = ['id', 'total_bookings', 'average_rating', 'created_at']
+        method_field_sources = {'designs_count': [], 'reviews_count': []}
     
     def get_designs_count(self, obj):
         if hasattr(obj, 'designs'):
@@ -104,7 +108,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return 0
 
 
-class DesignerListSerializer(serializers.ModelSerializer):
+class DesignerListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Minimal serializer for designer listings
     """
@@ -117,11 +121,21 @@ class DesignerListSerializer(serializers.ModelSerializer):
             'profile_picture', 'location', 'specialization',
             'average_rating', 'designs_count', 'years_of_experience'
         ]
+        method_field_sources = {'designs_count': []}
     
     def get_designs_count(self, obj):
+        # Annotated by DesignerListView to avoid one COUNT per designer
+        if hasattr(obj, 'approved_designs_count'):
+            return obj.approved_designs_count
         return obj.designs.filter(status='approved').count()
 
 
+# Requires the approved_designs_count annotation from designer_queryset()
+fast_designer_list = ValuesSerializer(DesignerListSerializer, method_fields={
+    'designs_count': (('approved_designs_count',), lambda rows, context: itemgetter('approved_designs_count')),
+})
+
+
 class ProfileUpdateSerializer(serializers.ModelSerializer):
     """
     Serializer for user profile updates
@@ -0,0 +1,17 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from apps.core.response_cache import invalidate_tags_on_commit
+
+User = get_user_model()
+
+
+def invalidate_designer(sender, instance, update_fields=None, **kwargs):
+    """Drop cached designer pages when a designer's profile changes"""
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    if instance.role == 'designer':
+        invalidate_tags_on_commit(f'designer:{instance.pk}', 'designer-list')
+
+
+post_save.connect(invalidate_designer, sender=User, dispatch_uid='response-cache-save-user')
+post_delete.connect(invalidate_designer, sender=User, dispatch_uid='response-cache-delete-user')
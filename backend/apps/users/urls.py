@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
+from apps.analytics.views import designer_analytics
 from .views import (
     RegisterView, LoginView, ProfileView,
     UserListView, UserDetailView,
@@ -21,5 +23,14 @@ urlpatterns = [
     
     # Designers
     path('designers/', DesignerListView.as_view(), name='designer-list'),
+    path('designers/me/analytics/', designer_analytics, name='designer-analytics'),
     path('designers/<int:pk>/', DesignerDetailView.as_view(), name='designer-detail'),
-]
\ No newline at end of file
+]
+
+if settings.ASYNC_READ_VIEWS:
+    from .async_views import designer_list
+    
+    # Async read path takes precedence; it hands authenticated requests back
+    urlpatterns = [
+        path('designers/', designer_list, name='designer-list-async'),
+    ] + urlpatterns
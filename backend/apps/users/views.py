@@ -4,10 +4,14 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate, get_user_model
-from django.db.models import Q
+from django.db.models import Count, Q
+from apps.core.conditional import conditional
+from apps.core.fast_serializers import FastListMixin
+from apps.core.fieldsets import SparseQuerysetMixin, is_selected
+from apps.core.response_cache import cached_response
 from .serializers import (
     UserSerializer, UserRegisterSerializer, UserProfileSerializer,
-    DesignerListSerializer, ProfileUpdateSerializer
+    DesignerListSerializer, ProfileUpdateSerializer, fast_designer_list
 )
 
 User = get_user_model()
@@ -18,6 +22,7 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserRegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'register'
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -39,6 +44,7 @@ class RegisterView(generics.CreateAPIView):
 class LoginView(APIView):
     """User login endpoint"""
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'login'
     
     def post(self, request):
         username = request.data.get('username')
@@ -74,7 +80,7 @@ class ProfileView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        serializer = UserProfileSerializer(request.user)
+        serializer = UserProfileSerializer(request.user, context={'request': request})
         return Response(serializer.data)
     
     def put(self, request):
@@ -88,45 +94,79 @@ class ProfileView(APIView):
         return self.put(request)
 
 
-class UserListView(generics.ListCreateAPIView):
+class UserListView(SparseQuerysetMixin, generics.ListCreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
+class UserDetailView(SparseQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class DesignerListView(generics.ListAPIView):
+def designer_queryset(params):
+    """Approved designers matching the list's search/ordering query params"""
+    queryset = User.objects.filter(role='designer', is_approved=True)
+    if is_selected('designs_count', params):
+        queryset = queryset.annotate(
+            approved_designs_count=Count('designs', filter=Q(designs__status='approved'))
+        )
+    
+    search = params.get('search', None)
+    if search:
+        queryset = queryset.filter(
+            Q(username__icontains=search) |
+            Q(first_name__icontains=search) |
+            Q(last_name__icontains=search) |
+            Q(specialization__icontains=search)
+        )
+    
+    ordering = params.get('ordering', '-average_rating')
+    queryset = queryset.order_by(ordering)
+    
+    return queryset
+
+
+class DesignerListView(FastListMixin, SparseQuerysetMixin, generics.ListAPIView):
     """List all approved designers"""
     serializer_class = DesignerListSerializer
+    fast_serializer = fast_designer_list
     permission_classes = [permissions.AllowAny]
     
     def get_queryset(self):
-        queryset = User.objects.filter(role='designer', is_approved=True)
-        
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(username__icontains=search) |
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(specialization__icontains=search)
-            )
-        
-        ordering = self.request.query_params.get('ordering', '-average_rating')
-        queryset = queryset.order_by(ordering)
-        
-        return queryset
+        return designer_queryset(self.request.query_params)
+    
+    @cached_response(tags=['designer-list', 'design-counts'])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
 
-class DesignerDetailView(generics.RetrieveAPIView):
+def designer_validators(view, request, pk, **kwargs):
+    try:
+        designer = view.get_queryset().filter(pk=pk).only('updated_at').first()
+    except ValueError:
+        return None
+    if designer is None:
+        return None
+    # The counts move without touching the user row, so no Last-Modified
+    return (
+        designer.updated_at.isoformat(),
+        designer.designs.filter(status='approved').count(),
+        designer.reviews_received.filter(is_approved=True).count(),
+    ), None
+
+
+class DesignerDetailView(SparseQuerysetMixin, generics.RetrieveAPIView):
     """Get detailed designer profile"""
     serializer_class = UserProfileSerializer
     permission_classes = [permissions.AllowAny]
     
     def get_queryset(self):
         return User.objects.filter(role='designer', is_approved=True)
+    
+    @conditional(designer_validators, tags=lambda pk, **kwargs: [f'designer:{pk}'])
+    @cached_response(tags=lambda pk, **kwargs: [f'designer:{pk}'])
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
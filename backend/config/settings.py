@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from corsheaders.defaults import default_headers as default_cors_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,13 +28,20 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'corsheaders',
+    'apps.core',
     'apps.users',
     'apps.gallery',
     'apps.bookings',
     'apps.admin_panel',
+    'apps.analytics',
 ]
 
 MIDDLEWARE = [
+    'apps.core.metrics.MetricsMiddleware',
+    'apps.core.instrumentation.QueryInstrumentationMiddleware',
+    'apps.core.profiling.ProfilingMiddleware',
+    'apps.core.compression.CompressionMiddleware',
+    'apps.core.db_router.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -63,30 +71,263 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
+
+# Serve the hot anonymous read endpoints with async views (set automatically
+# by gunicorn.conf.py when SERVER_MODE=asgi)
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', 'False') == 'True'
+
+# ETag/Last-Modified validators (304 Not Modified) on design, designer and
+# category reads; see apps.core.conditional
+CONDITIONAL_GET = os.getenv('CONDITIONAL_GET', 'True') == 'True'
 
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
 # Use SQLite for local development (easier on Windows)
-# For production, use PostgreSQL
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# For production, set DB_ENGINE=postgresql and the DB_* variables below, or
+# SQLITE_PRODUCTION=True for small deployments that stay on SQLite (WAL,
+# tuned pragmas and BEGIN IMMEDIATE transactions, see apps/core/backends).
+# Connections persist for DB_CONN_MAX_AGE seconds and are health-checked
+# before being reused by a new request.
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+SQLITE_PRODUCTION = os.getenv('SQLITE_PRODUCTION', 'False') == 'True'
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', 'mehndi_management'),
+            'USER': os.getenv('DB_USER', 'your_db_user'),
+            'PASSWORD': os.getenv('DB_PASSWORD', 'your_db_password'),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'apps.core.backends.sqlite3' if SQLITE_PRODUCTION else 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+
+# Read replicas: comma-separated hosts (PostgreSQL, host or host:port) or
+# database files (SQLite). They are added as replica_1, replica_2, ... and
+# share every other setting with the primary.
+DATABASE_REPLICAS = []
+for index, location in enumerate(filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1):
+    replica = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if DB_ENGINE == 'postgresql':
+        host, _, port = location.strip().partition(':')
+        replica.update(HOST=host, PORT=port or replica['PORT'])
+    else:
+        replica['NAME'] = BASE_DIR / location.strip()
+    DATABASES[f'replica_{index}'] = replica
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+DATABASE_ROUTERS = ['apps.core.db_router.PrimaryReplicaRouter']
+
+DATABASE_ROUTING = {
+    # Safe requests under these paths may read from a replica
+    'REPLICA_PATHS': ['/api/gallery/', '/api/users/designers/'],
+    # After a write, the same client reads from the primary for this long
+    'STICKY_SECONDS': int(os.getenv('DB_STICKY_SECONDS', '10')),
+    # Cache holding the per-client pins of token clients. Only used when it is
+    # shared between workers; otherwise clients are pinned by cookie alone
+    'PIN_CACHE': 'pins',
+    # A replica that fails to connect is skipped for this long
+    'RETRY_SECONDS': 30,
+}
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mehndi-magic',
+    },
+    # Public response cache; point at a file-based or shared (Redis/Memcached)
+    # backend to share entries between worker processes
+    'responses': {
+        'BACKEND': os.getenv('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', 'mehndi-magic-responses'),
+    },
+    # Throttle buckets; per process unless pointed at a shared backend
+    'throttle': {
+        'BACKEND': os.getenv('THROTTLE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('THROTTLE_CACHE_LOCATION', 'mehndi-magic-throttle'),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    # Read-your-writes pins for token clients (DATABASE_ROUTING); per process
+    # (so unused) unless pointed at a shared backend
+    'pins': {
+        'BACKEND': os.getenv('DB_PIN_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('DB_PIN_CACHE_LOCATION', 'mehndi-magic-pins'),
+    },
+}
+
+# Anonymous GET responses for public gallery/designer endpoints, invalidated by tag
+RESPONSE_CACHE = {
+    'ENABLED': os.getenv('RESPONSE_CACHE_ENABLED', 'True') == 'True',
+    'ALIAS': 'responses',
+    'TIMEOUT': int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300')),
+    # Single-flight: how long a rebuild holds the lock / others wait for it
+    'LOCK_TIMEOUT': 10,
+    'WAIT_TIMEOUT': 2,
+}
+
+# Admin dashboard snapshot: served from cache for DASHBOARD_CACHE_TTL seconds,
+# then served stale for up to DASHBOARD_CACHE_STALE_TTL while it is rebuilt.
+# Set DASHBOARD_CACHE_TTL=0 to always compute live.
+DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', '30'))
+DASHBOARD_CACHE_STALE_TTL = int(os.getenv('DASHBOARD_CACHE_STALE_TTL', '300'))
+
+# Moderation queue leases (seconds)
+MODERATION_LEASE_SECONDS = int(os.getenv('MODERATION_LEASE_SECONDS', '600'))
+MODERATION_LEASE_MAX_SECONDS = 3600
+
+# Bulk design imports (import_designs command, admin bulk upload). Images are
+# validated and re-encoded as JPEG in WORKERS processes (0 = one per CPU) and
+# inserted BATCH_SIZE at a time. Uploaded archives wait in SPOOL_DIR.
+DESIGN_IMPORT = {
+    'WORKERS': int(os.getenv('DESIGN_IMPORT_WORKERS', '0')),
+    'BATCH_SIZE': 200,
+    'MAX_DIMENSION': 2048,
+    'JPEG_QUALITY': 85,
+    'MAX_ERRORS': 100,
+    'SPOOL_DIR': os.getenv('DESIGN_IMPORT_SPOOL_DIR', os.path.join(BASE_DIR, 'imports')),
+    # A running import with no finished batch for this long can be resumed
+    'STALL_SECONDS': 300,
+}
+
+# Resumable chunked design uploads (/api/gallery/uploads/). Part files are
+# moved into MEDIA_ROOT on completion, so keep DIRECTORY on the same
+# filesystem to make that a rename rather than a copy.
+CHUNKED_UPLOADS = {
+    'DIRECTORY': os.getenv('CHUNKED_UPLOAD_DIR', os.path.join(BASE_DIR, 'uploads')),
+    'MAX_SIZE': int(os.getenv('CHUNKED_UPLOAD_MAX_SIZE', str(100 * 1024 * 1024))),
+    'MAX_CHUNK_SIZE': 8 * 1024 * 1024,
+    # Unfinished sessions untouched for this long are garbage collected
+    'EXPIRE_SECONDS': 24 * 60 * 60,
+    'MAX_OPEN_SESSIONS': 10,
+}
+
+# "Similar designs" on design pages (/api/gallery/designs/<id>/similar/),
+# precomputed from co-likes and co-favorites by build_similar_designs
+SIMILAR_DESIGNS = {
+    # Neighbors stored per design; ?limit= can ask for up to this many
+    'NEIGHBORS': int(os.getenv('SIMILAR_DESIGNS_NEIGHBORS', '20')),
+    'DEFAULT_LIMIT': 12,
+    # A favorite says more than a like
+    'FAVORITE_WEIGHT': 2.0,
+    # Pairs need this many users in common, and scores are damped by
+    # n / (n + SHRINKAGE) so pairs seen by few users rank lower
+    'MIN_COMMON_USERS': 2,
+    'SHRINKAGE': 10.0,
 }
 
-# PostgreSQL configuration (uncomment for production)
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.postgresql',
-#         'NAME': os.getenv('DB_NAME', 'mehndi_management'),
-#         'USER': os.getenv('DB_USER', 'your_db_user'),
-#         'PASSWORD': os.getenv('DB_PASSWORD', 'your_db_password'),
-#         'HOST': os.getenv('DB_HOST', 'localhost'),
-#         'PORT': os.getenv('DB_PORT', '5432'),
-#     }
-# }
+# Write-behind queue for view and reaction counters: increments are merged
+# and applied by one background thread per process. Up to FLUSH_INTERVAL
+# seconds of counts can be lost if a worker is killed.
+WRITE_QUEUE = {
+    'ENABLED': os.getenv('WRITE_QUEUE_ENABLED', 'False') == 'True',
+    'FLUSH_INTERVAL': float(os.getenv('WRITE_QUEUE_FLUSH_INTERVAL', '0.5')),
+    'MAX_PENDING': 1000,
+}
+
+# Opt-in: read-only list endpoints (designers, trending, bookings,
+# notifications) serialize from .values() rows instead of model instances
+FAST_SERIALIZERS = os.getenv('FAST_SERIALIZERS', 'False') == 'True'
+
+# ?stream=true on those lists streams every row as one JSON array
+JSON_STREAMING = {
+    'ENABLED': os.getenv('JSON_STREAMING_ENABLED', 'True') == 'True',
+    'CHUNK_SIZE': 500,
+}
+
+# Response compression, negotiated from Accept-Encoding (brotli needs the
+# `brotli` package; gzip is always available)
+COMPRESSION = {
+    'ENABLED': os.getenv('COMPRESSION_ENABLED', 'True') == 'True',
+    'MIN_SIZE': int(os.getenv('COMPRESSION_MIN_SIZE', '1024')),
+    'BROTLI_QUALITY': 5,
+    'CONTENT_TYPES': ['application/json', 'text/', 'application/javascript', 'image/svg+xml'],
+    # Responses carrying tokens stay uncompressed (BREACH)
+    'EXCLUDE_PATHS': ['/api/users/login/', '/api/users/register/', '/api/users/token/refresh/'],
+}
+
+# Token-bucket throttling. RATES maps '<scope>.<kind>' to 'N/period'
+# (s, m, h, d, optionally with a count such as '5/10m'): bursts of N, refilled
+# at N per period. Scopes are set by views with `throttle_scope`; kinds are
+# user (anonymous falls back to IP), ip, and endpoint (all clients together).
+# With the default local-memory 'throttle' cache every worker process has its
+# own buckets, so each limit is multiplied by the number of workers; set
+# THROTTLE_CACHE_BACKEND to Redis/Memcached in production (check warns).
+THROTTLING = {
+    'ENABLED': os.getenv('THROTTLING_ENABLED', 'True') == 'True',
+    'CACHE': 'throttle',
+    'RATES': {
+        'default.user': '1200/m',
+        'default.ip': '2400/m',
+        'like.user': '30/m',
+        'like.ip': '120/m',
+        # No endpoint-wide login/register caps: a single shared bucket would
+        # let anyone with enough addresses lock every user out
+        'login.ip': '10/m',
+        'register.ip': '10/h',
+        'booking.user': '20/h',
+        'booking.ip': '60/h',
+        # Portfolio ZIPs read every image file
+        'export.user': '10/h',
+    },
+}
+
+# Prometheus metrics on PATH (needs prometheus_client). Under gunicorn every
+# worker writes to PROMETHEUS_MULTIPROC_DIR and the endpoint sums them.
+# Only clients in ALLOWED_NETWORKS may scrape; an empty list allows anyone.
+METRICS = {
+    'ENABLED': os.getenv('METRICS_ENABLED', 'True') == 'True',
+    'PATH': '/metrics',
+    # Scrapers send `Authorization: Bearer <token>`; when set, addresses don't matter
+    'TOKEN': os.getenv('METRICS_TOKEN', ''),
+    # Without a token: direct (unproxied) clients from these networks. Private
+    # ranges are not trusted by default, since a local proxy's address is one
+    'ALLOWED_NETWORKS': [
+        network.strip() for network in os.getenv('METRICS_ALLOWED_NETWORKS', '127.0.0.0/8,::1/128').split(',')
+        if network.strip()
+    ],
+}
+
+# Opt-in stack-sampling profiler. Profiles SAMPLE_RATE of requests, plus any
+# request an admin sends with an `X-Profile: 1` header, and keeps the newest
+# MAX_PROFILES as speedscope JSON in DIRECTORY (WSGI only).
+PROFILING = {
+    'ENABLED': os.getenv('PROFILING_ENABLED', 'False') == 'True',
+    'SAMPLE_RATE': float(os.getenv('PROFILING_SAMPLE_RATE', '0.0')),
+    'HEADER': 'HTTP_X_PROFILE',
+    # Seconds between stack samples
+    'INTERVAL': float(os.getenv('PROFILING_INTERVAL', '0.005')),
+    'DIRECTORY': os.getenv('PROFILING_DIRECTORY', os.path.join(BASE_DIR, 'profiles')),
+    'MAX_PROFILES': int(os.getenv('PROFILING_MAX_PROFILES', '200')),
+}
+
+# Per-request SQL instrumentation (Server-Timing header, budget and N+1 logging)
+SQL_INSTRUMENTATION = {
+    'ENABLED': os.getenv('SQL_INSTRUMENTATION_ENABLED', 'True') == 'True',
+    # Fraction of requests instrumented; lower it in production
+    'SAMPLE_RATE': float(os.getenv('SQL_INSTRUMENTATION_SAMPLE_RATE', '1.0')),
+    'QUERY_BUDGET': int(os.getenv('SQL_QUERY_BUDGET', '20')),
+    'LATENCY_BUDGET_MS': int(os.getenv('SQL_LATENCY_BUDGET_MS', '500')),
+    'DETECT_N_PLUS_ONE': True,
+    'N_PLUS_ONE_THRESHOLD': 5,
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -136,9 +377,33 @@ AUTH_USER_MODEL = 'users.User'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Uploads are stored once per content under <upload_to>/<ab>/<sha256>.<ext>
+# (apps.core.storage); run sweep_media_blobs periodically to delete unused
+# ones and adopt_media_files once to move older files in.
+STORAGES = {
+    'default': {'BACKEND': 'apps.core.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Media is served by apps.core.media in every environment (Range, ETag,
+# Cache-Control). Images of designs that aren't approved only go to their
+# designer and admins, or to holders of the signed URLs the API gives them.
+# Behind nginx set ACCEL to 'x-accel-redirect' with ACCEL_PREFIX an
+# `internal` location aliased to MEDIA_ROOT; behind Apache's mod_xsendfile,
+# 'x-sendfile'. The front server then sends the file itself.
+MEDIA_SERVING = {
+    'ACCEL': os.getenv('MEDIA_ACCEL', ''),
+    'ACCEL_PREFIX': os.getenv('MEDIA_ACCEL_PREFIX', '/protected-media/'),
+    # Cache lifetime of public files; content-hashed names are cached for a year
+    'MAX_AGE': int(os.getenv('MEDIA_MAX_AGE', '86400')),
+    # Signed URLs stay the same for this long and are valid for up to twice that
+    'SIGNED_URL_MAX_AGE': 3600,
+}
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS', 'http://localhost:3000').split(',')
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_cors_headers, 'upload-offset')
 
 # JWT settings
 from datetime import timedelta
@@ -155,6 +420,15 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'apps.core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'apps.core.throttling.UserBucketThrottle',
+        'apps.core.throttling.IPBucketThrottle',
+        'apps.core.throttling.EndpointBucketThrottle',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 12,
 }
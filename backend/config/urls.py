@@ -1,7 +1,11 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
+from apps.core.media import serve_media
+from apps.core.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -9,9 +13,11 @@ urlpatterns = [
     path('api/gallery/', include('apps.gallery.urls')),
     path('api/bookings/', include('apps.bookings.urls')),
     path('api/admin-panel/', include('apps.admin_panel.urls')),
+    path('metrics', metrics_view, name='metrics'),
+    # Design images and profile pictures, with access checks (see MEDIA_SERVING)
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
 ]
 
-# Serve media files in development
+# Serve static files in development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
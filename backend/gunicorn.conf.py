@@ -0,0 +1,75 @@
+"""
+Production serving profile: gunicorn -c gunicorn.conf.py
+
+SERVER_MODE=wsgi (default) runs threaded sync workers on config.wsgi.
+SERVER_MODE=asgi runs uvicorn workers on config.asgi, which also turns on
+the async read views (ASYNC_READ_VIEWS) so slow clients don't hold a worker.
+"""
+import multiprocessing
+import os
+import shutil
+
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+
+bind = os.getenv('BIND', '0.0.0.0:8000')
+
+# (2 x cores) + 1 is gunicorn's recommended starting point
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    os.environ.setdefault('ASYNC_READ_VIEWS', 'True')
+else:
+    wsgi_app = 'config.wsgi:application'
+    worker_class = 'gthread'
+    threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Workers write Prometheus samples to files here so /metrics can sum them.
+# Cleared on every start: samples from a previous run must not leak in.
+metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/mehndi-metrics')
+shutil.rmtree(metrics_dir, ignore_errors=True)
+os.makedirs(metrics_dir, exist_ok=True)
+
+# Load Django once in the master and fork warm workers from it
+preload_app = True
+
+# Recycle workers periodically to cap slow memory growth; jitter avoids
+# every worker restarting at once. GUNICORN_MAX_REQUESTS=0 turns it off.
+# child_exit folds a recycled worker's metric files into archive files.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    # Build the URL resolver and import every view module in the master, so
+    # forked workers share it copy-on-write instead of paying for it on
+    # their first request.
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+
+
+def post_fork(server, worker):
+    # Never share a DB connection opened in the master with the workers
+    from django.db import connections
+    connections.close_all()
+
+
+def child_exit(server, worker):
+    # Drop the dead worker's live gauges (queue depths) from /metrics and
+    # fold its counters and histograms into the archive files
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    from apps.core.metrics import archive_dead_process
+    multiprocess.mark_process_dead(worker.pid)
+    archive_dead_process(worker.pid)